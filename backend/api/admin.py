@@ -1,16 +1,17 @@
 from django.contrib import admin
-from .models import BlogPost, Projects, HealthWeight, Novels, ShortStories, WorkExperience
+from .models import BlogPost, Projects, HealthWeight, HealthWeightStats, HealthMetric, ImportWatermark, Novels, ShortStories, WorkExperience
+from .search import FullTextSearchMixin
 
 
 @admin.register(BlogPost)
-class BlogPostAdmin(admin.ModelAdmin):
-    list_display = ['title', 'created_at']
+class BlogPostAdmin(FullTextSearchMixin, admin.ModelAdmin):
+    list_display = ['title', 'reading_time', 'created_at']
     search_fields = ['title', 'content']
-    readonly_fields = ['created_at']
+    readonly_fields = ['created_at', 'word_count', 'reading_time']  # rendered on save
     list_per_page = 20
 
 @admin.register(Projects)
-class ProjectsAdmin(admin.ModelAdmin):
+class ProjectsAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ['name', 'created_at']
     search_fields = ['name', 'description']
     readonly_fields = ['created_at']
@@ -24,22 +25,42 @@ class HealthWeightAdmin(admin.ModelAdmin):
     date_hierarchy = 'date'
     list_per_page = 50
 
+@admin.register(HealthWeightStats)
+class HealthWeightStatsAdmin(admin.ModelAdmin):
+    list_display = ['date', 'weight', 'ma_7', 'ma_30', 'rate_of_change', 'running_min', 'running_max']
+    date_hierarchy = 'date'
+    list_per_page = 50
+
+@admin.register(HealthMetric)
+class HealthMetricAdmin(admin.ModelAdmin):
+    list_display = ['metric', 'date', 'value', 'unit', 'created_at']
+    list_filter = ['metric', 'date']
+    search_fields = ['metric']
+    readonly_fields = ['created_at']
+    date_hierarchy = 'date'
+    list_per_page = 50
+
+@admin.register(ImportWatermark)
+class ImportWatermarkAdmin(admin.ModelAdmin):
+    list_display = ['source', 'last_date', 'fingerprint', 'updated_at']
+    readonly_fields = ['updated_at']
+
 @admin.register(Novels)
-class NovelsAdmin(admin.ModelAdmin):
+class NovelsAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ['title', 'author', 'created_at']
     search_fields = ['title', 'author', 'description']
     readonly_fields = ['created_at']
     list_per_page = 20
 
 @admin.register(ShortStories)
-class ShortStoriesAdmin(admin.ModelAdmin):
+class ShortStoriesAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ['title', 'author', 'created_at']
     search_fields = ['title', 'author', 'description']
     readonly_fields = ['created_at']
     list_per_page = 20
 
 @admin.register(WorkExperience)
-class WorkExperienceAdmin(admin.ModelAdmin):
+class WorkExperienceAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ['company', 'position', 'start_date', 'end_date', 'created_at']
     search_fields = ['company', 'position', 'description']
     readonly_fields = ['created_at']
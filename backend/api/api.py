@@ -1,10 +1,34 @@
-from ninja import NinjaAPI, Schema, Field
-from typing import List, Optional
+from ninja import NinjaAPI, Schema, Field, Query
+from ninja.pagination import paginate
+from typing import Annotated, Generic, List, Literal, Optional, TypeVar
 from datetime import datetime, date
-from django.shortcuts import get_object_or_404
-from .models import BlogPost, HealthWeight, Projects, Novels, ShortStories, WorkExperience
-
-api = NinjaAPI()
+from asgiref.sync import sync_to_async
+from pydantic import AfterValidator
+from django.http import HttpResponse
+from django.shortcuts import aget_object_or_404, get_object_or_404
+from ninja.errors import HttpError
+from .models import BlogPost, HealthWeight, HealthWeightStats, HealthMetric, Projects, Novels, ShortStories, WorkExperience
+from .async_support import async_variant
+from .caching import cache_stats, cached
+from .conditional import conditional
+from .crud import CrudRouter
+from .fieldsets import MediaUrl, checked_names, parse_fields, sparse_values
+from .images import image_variants
+from .metrics import PROMETHEUS_CONTENT_TYPE, operator_only, render_metrics
+from .pagination import KeysetPagination
+from .renderers import FastJSONRenderer, trusted_output
+from .search import SEARCH_INDEXES, search
+from .timeseries import adownsample_weights, downsample_weights
+
+api = NinjaAPI(renderer=FastJSONRenderer())
+
+
+# srcsets of an image's resized copies, e.g. webp="/media/variants/...-320w.webp 320w, ..."
+class ImageVariantsOut(Schema):
+    width: int
+    avif: Optional[str] = None
+    webp: Optional[str] = None
+    jpeg: Optional[str] = None
 
 
 # Schemas for BlogPost
@@ -14,13 +38,44 @@ class BlogPostIn(Schema):
     image: Optional[str] = None
 
 
+# content_html, excerpt, word_count and reading_time are rendered from content on write
 class BlogPostOut(Schema):
     id: int
     title: str
     content: str
+    content_html: str
+    excerpt: str
+    word_count: int
+    reading_time: int  # minutes
     image: Optional[str]
+    image_variants: Optional[ImageVariantsOut] = None
     created_at: datetime
 
+    @staticmethod
+    def resolve_image_variants(obj):
+        return image_variants(obj, 'image')
+
+
+# Listing schemas: list endpoints return only the columns asked for with fields=
+class BlogPostListOut(Schema):
+    id: int
+    title: Optional[str] = None
+    excerpt: Optional[str] = None
+    reading_time: Optional[int] = None
+    word_count: Optional[int] = None
+    content: Optional[str] = None
+    content_html: Optional[str] = None
+    image: MediaUrl = None
+    image_variants: Optional[ImageVariantsOut] = None
+    created_at: Optional[datetime] = None
+
+    @staticmethod
+    def resolve_image_variants(obj):
+        return image_variants(obj, 'image')
+
+
+BLOG_LIST_FIELDS = ['id', 'title', 'excerpt', 'reading_time', 'image', 'image_variants', 'created_at']
+
 
 class ProjectIn(Schema):
     name: str
@@ -37,8 +92,28 @@ class ProjectOut(Schema):
     languages: Optional[str]
     link: Optional[str]
     image: Optional[str]
+    image_variants: Optional[ImageVariantsOut] = None
     created_at: datetime
 
+    @staticmethod
+    def resolve_image_variants(obj):
+        return image_variants(obj, 'image')
+
+
+class ProjectListOut(Schema):
+    id: int
+    name: Optional[str] = None
+    description: Optional[str] = None
+    languages: Optional[str] = None
+    link: Optional[str] = None
+    image: MediaUrl = None
+    image_variants: Optional[ImageVariantsOut] = None
+    created_at: Optional[datetime] = None
+
+    @staticmethod
+    def resolve_image_variants(obj):
+        return image_variants(obj, 'image')
+
 
 class NovelIn(Schema):
     title: str
@@ -53,8 +128,27 @@ class NovelOut(Schema):
     author: str
     description: Optional[str]
     cover_image: Optional[str]
+    cover_image_variants: Optional[ImageVariantsOut] = None
     created_at: datetime
 
+    @staticmethod
+    def resolve_cover_image_variants(obj):
+        return image_variants(obj, 'cover_image')
+
+
+class NovelListOut(Schema):
+    id: int
+    title: Optional[str] = None
+    author: Optional[str] = None
+    description: Optional[str] = None
+    cover_image: MediaUrl = None
+    cover_image_variants: Optional[ImageVariantsOut] = None
+    created_at: Optional[datetime] = None
+
+    @staticmethod
+    def resolve_cover_image_variants(obj):
+        return image_variants(obj, 'cover_image')
+
 
 class ShortStoryIn(Schema):
     title: str
@@ -69,8 +163,16 @@ class ShortStoryOut(Schema):
     author: str
     description: Optional[str]
     cover_image: Optional[str]
+    cover_image_variants: Optional[ImageVariantsOut] = None
     created_at: datetime
 
+    @staticmethod
+    def resolve_cover_image_variants(obj):
+        return image_variants(obj, 'cover_image')
+
+class ShortStoryListOut(NovelListOut):
+    pass
+
 class WorkExperienceIn(Schema):
     company: str
     logo: Optional[str] = None
@@ -83,87 +185,90 @@ class WorkExperienceOut(Schema):
     id: int
     company: str
     logo: Optional[str]
+    logo_variants: Optional[ImageVariantsOut] = None
     position: str
     start_date: date
     end_date: Optional[date]
     description: Optional[str]
     created_at: datetime
 
+    @staticmethod
+    def resolve_logo_variants(obj):
+        return image_variants(obj, 'logo')
 
-# Blog endpoints
-@api.get("/blog", response=List[BlogPostOut])
-def list_blog_posts(request):
-    """Get all blog posts"""
-    return BlogPost.objects.all()
-
+class WorkExperienceListOut(Schema):
+    id: int
+    company: Optional[str] = None
+    logo: MediaUrl = None
+    logo_variants: Optional[ImageVariantsOut] = None
+    position: Optional[str] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    description: Optional[str] = None
+    created_at: Optional[datetime] = None
 
-@api.get("/blog/{post_id}", response=BlogPostOut)
-def get_blog_post(request, post_id: int):
-    """Get a specific blog post by ID"""
-    return get_object_or_404(BlogPost, id=post_id)
+    @staticmethod
+    def resolve_logo_variants(obj):
+        return image_variants(obj, 'logo')
 
 
-@api.post("/blog", response=BlogPostOut)
-def create_blog_post(request, payload: BlogPostIn):
-    """Create a new blog post"""
-    post = BlogPost.objects.create(**payload.dict())
-    return post
+# Blog endpoints. Each content type's router brings its writes: POST, PUT, PATCH,
+# DELETE and the /bulk routes; the reads are declared on it here.
+blog_router = CrudRouter(BlogPost, BlogPostIn, BlogPostOut, 'post_id', 'blog_post')
+api.add_router("/blog", blog_router)
 
 
-@api.put("/blog/{post_id}", response=BlogPostOut)
-def update_blog_post(request, post_id: int, payload: BlogPostIn):
-    """Update a blog post"""
-    post = get_object_or_404(BlogPost, id=post_id)
-    for attr, value in payload.dict().items():
-        setattr(post, attr, value)
-    post.save()
-    return post
+@blog_router.get("", response=List[BlogPostListOut], exclude_unset=True)
+@cached('blog')
+@conditional(BlogPost)
+@paginate(KeysetPagination)
+@async_variant()
+def list_blog_posts(request, fields: checked_names(BlogPostListOut.model_fields) = None):
+    """Get blog posts (id, title, excerpt, reading_time, image, created_at unless fields= says otherwise)"""
+    allowed = list(BlogPostListOut.model_fields)
+    return sparse_values(BlogPost.objects.all(), fields, allowed, BLOG_LIST_FIELDS)
 
 
-@api.delete("/blog/{post_id}")
-def delete_blog_post(request, post_id: int):
-    """Delete a blog post"""
-    post = get_object_or_404(BlogPost, id=post_id)
-    post.delete()
-    return {"success": True}
+async def aget_blog_post(request, post_id: int):
+    return await aget_object_or_404(BlogPost, id=post_id)
 
 
-# Project endpoints
-@api.get("/projects", response=List[ProjectOut])
-def list_projects(request):
-    """Get all projects"""
-    return Projects.objects.all()
+@blog_router.get("/{post_id}", response=BlogPostOut)
+@cached('blog', lookup='post_id')
+@conditional(BlogPost, lookup={'pk': 'post_id'})
+@async_variant(aget_blog_post)
+def get_blog_post(request, post_id: int):
+    """Get a specific blog post by ID"""
+    return get_object_or_404(BlogPost, id=post_id)
 
 
-@api.get("/projects/{project_id}", response=ProjectOut)
-def get_project(request, project_id: int):
-    """Get a specific project by ID"""
-    return get_object_or_404(Projects, id=project_id)
+# Project endpoints
+projects_router = CrudRouter(Projects, ProjectIn, ProjectOut, 'project_id', 'project')
+api.add_router("/projects", projects_router)
 
 
-@api.post("/projects", response=ProjectOut)
-def create_project(request, payload: ProjectIn):
-    """Create a new project"""
-    project = Projects.objects.create(**payload.dict())
-    return project
+@projects_router.get("", response=List[ProjectListOut], exclude_unset=True)
+@cached('projects')
+@conditional(Projects)
+@paginate(KeysetPagination)
+@async_variant()
+def list_projects(request, fields: checked_names(ProjectListOut.model_fields) = None):
+    """Get all projects, optionally only the given comma separated fields"""
+    allowed = list(ProjectListOut.model_fields)
+    return sparse_values(Projects.objects.all(), fields, allowed, allowed)
 
 
-@api.put("/projects/{project_id}", response=ProjectOut)
-def update_project(request, project_id: int, payload: ProjectIn):
-    """Update a project"""
-    project = get_object_or_404(Projects, id=project_id)
-    for attr, value in payload.dict().items():
-        setattr(project, attr, value)
-    project.save()
-    return project
+async def aget_project(request, project_id: int):
+    return await aget_object_or_404(Projects, id=project_id)
 
 
-@api.delete("/projects/{project_id}")
-def delete_project(request, project_id: int):
-    """Delete a project"""
-    project = get_object_or_404(Projects, id=project_id)
-    project.delete()
-    return {"success": True}
+@projects_router.get("/{project_id}", response=ProjectOut)
+@cached('projects', lookup='project_id')
+@conditional(Projects, lookup={'pk': 'project_id'})
+@async_variant(aget_project)
+def get_project(request, project_id: int):
+    """Get a specific project by ID"""
+    return get_object_or_404(Projects, id=project_id)
 
 
 # Health Weight endpoints
@@ -171,102 +276,392 @@ class HealthWeightOut(Schema):
     date: date
     weight: float
     unit: str
+    # Only present for week/month resolutions
+    min_weight: Optional[float] = Field(None, exclude_if=lambda value: value is None)
+    max_weight: Optional[float] = Field(None, exclude_if=lambda value: value is None)
+    count: Optional[int] = Field(None, exclude_if=lambda value: value is None)
 
 
-@api.get("/health/weight", response=List[HealthWeightOut])
-def get_weight_data(request, days: int = 90):
-    """Get weight data for last N days (default: 90)"""
+def weight_rows():
+    return HealthWeight.objects.values('date', 'weight', 'unit')
+
+
+def recent(queryset, days):
+    """Rows dated within the last N days"""
     from datetime import timedelta
-    
+
     cutoff = datetime.now().date() - timedelta(days=days)
-    weights = HealthWeight.objects.filter(date__gte=cutoff)
-    
-    return weights
+    return queryset.filter(date__gte=cutoff)
+
+
+async def aget_weight_data(
+    request,
+    days: int = 90,
+    resolution: Literal['day', 'week', 'month'] = 'day',
+    max_points: Optional[int] = Query(None, ge=3),
+):
+    points = await adownsample_weights(recent(weight_rows(), days), resolution, max_points)
+    if isinstance(points, list):
+        return points
+    # Unpaginated, so the rows are read here: response validation runs in the event loop
+    return [row async for row in points]
+
+
+@api.get("/health/weight", response=List[HealthWeightOut])
+@cached('health-weight', per_day=True)
+@conditional(HealthWeight, per_day=True)
+@trusted_output
+@async_variant(aget_weight_data)
+def get_weight_data(
+    request,
+    days: int = 90,
+    resolution: Literal['day', 'week', 'month'] = 'day',
+    max_points: Optional[int] = Query(None, ge=3),
+):
+    """Get weight data for last N days (default: 90), optionally bucketed or downsampled to max_points"""
+    return downsample_weights(recent(weight_rows(), days), resolution, max_points)
+
+
+async def aget_all_weight_data(
+    request,
+    resolution: Literal['day', 'week', 'month'] = 'day',
+    max_points: Optional[int] = Query(None, ge=3),
+):
+    return await adownsample_weights(weight_rows(), resolution, max_points)
 
 
 @api.get("/health/weight/all", response=List[HealthWeightOut])
-def get_all_weight_data(request):
-    """Get all weight data"""
-    return HealthWeight.objects.all()
+@cached('health-weight')
+@conditional(HealthWeight)
+@trusted_output
+@paginate(KeysetPagination, default_limit=1000, max_limit=5000)
+@async_variant(aget_all_weight_data)
+def get_all_weight_data(
+    request,
+    resolution: Literal['day', 'week', 'month'] = 'day',
+    max_points: Optional[int] = Query(None, ge=3),
+):
+    """Get all weight data a page at a time, or bucketed/downsampled to max_points in one page"""
+    return downsample_weights(weight_rows(), resolution, max_points)
+
+
+class HealthWeightStatsOut(Schema):
+    date: date
+    weight: float
+    ma_7: float
+    ma_30: float
+    rate_of_change: Optional[float]
+    running_min: float
+    running_max: float
+    unit: str
 
 
-# Novels endpoints
-@api.get("/novels", response=List[NovelOut])
-def list_novels(request):
-    """Get all novels"""
-    return Novels.objects.all()
+def weight_stats_rows():
+    return HealthWeightStats.objects.values(*HealthWeightStatsOut.model_fields)
 
 
-@api.get("/novels/{novel_id}", response=NovelOut)
-def get_novel(request, novel_id: int):
-    """Get a specific novel by ID"""
-    return get_object_or_404(Novels, id=novel_id)
+async def aget_weight_stats(request, days: int = 90):
+    return [row async for row in recent(weight_stats_rows(), days)]
 
 
-@api.post("/novels", response=NovelOut)
-def create_novel(request, payload: NovelIn):
-    """Create a new novel"""
-    novel = Novels.objects.create(**payload.dict())
-    return novel
+@api.get("/health/weight/stats", response=List[HealthWeightStatsOut])
+@cached('health-weight-stats', per_day=True)
+@conditional(HealthWeightStats, per_day=True)
+@trusted_output
+@async_variant(aget_weight_stats)
+def get_weight_stats(request, days: int = 90):
+    """Get precomputed moving averages and trends for last N days (default: 90)"""
+    return recent(weight_stats_rows(), days)
 
 
-@api.put("/novels/{novel_id}", response=NovelOut)
-def update_novel(request, novel_id: int, payload: NovelIn):
-    """Update a novel"""
-    novel = get_object_or_404(Novels, id=novel_id)
-    for attr, value in payload.dict().items():
-        setattr(novel, attr, value)
-    novel.save()
-    return novel
+# Health Metric endpoints
+class HealthMetricSummaryOut(Schema):
+    metric: str
+    unit: str
+    count: int
+    first_date: date
+    last_date: date
 
 
-@api.delete("/novels/{novel_id}")
-def delete_novel(request, novel_id: int):
-    """Delete a novel"""
-    novel = get_object_or_404(Novels, id=novel_id)
-    novel.delete()
-    return {"success": True}
+class HealthMetricOut(Schema):
+    date: date
+    value: float
+    unit: str
 
 
-# Short Stories endpoints
-@api.get("/shortstories", response=List[ShortStoryOut])
-def list_short_stories(request):
-    """Get all short stories"""
-    return ShortStories.objects.all()
+def metric_summaries():
+    from django.db.models import Count, Max, Min
 
+    return (
+        HealthMetric.objects.values('metric')
+        .annotate(unit=Max('unit'), count=Count('id'), first_date=Min('date'), last_date=Max('date'))
+        .order_by('metric')
+    )
 
-@api.get("/shortstories/{shortstory_id}", response=ShortStoryOut)
-def get_short_story(request, shortstory_id: int):
-    """Get a specific short story by ID"""
-    return get_object_or_404(ShortStories, id=shortstory_id)
+
+async def alist_health_metrics(request):
+    return [row async for row in metric_summaries()]
+
+
+@api.get("/health/metrics", response=List[HealthMetricSummaryOut])
+@cached('health-metrics')
+@conditional(HealthMetric)
+@trusted_output
+@async_variant(alist_health_metrics)
+def list_health_metrics(request):
+    """Get the available health metrics with their date ranges"""
+    return metric_summaries()
+
+
+def metric_rows(metric):
+    return HealthMetric.objects.filter(metric=metric).values(*HealthMetricOut.model_fields)
 
 
-@api.post("/shortstories", response=ShortStoryOut)
-def create_short_story(request, payload: ShortStoryIn):
-    """Create a new short story"""
-    short_story = ShortStories.objects.create(**payload.dict())
-    return short_story
+async def aget_health_metric(request, metric: str, days: int = 90):
+    return [row async for row in recent(metric_rows(metric), days)]
 
 
-@api.put("/shortstories/{shortstory_id}", response=ShortStoryOut)
-def update_short_story(request, shortstory_id: int, payload: ShortStoryIn):
-    """Update a short story"""
-    short_story = get_object_or_404(ShortStories, id=shortstory_id)
-    for attr, value in payload.dict().items():
-        setattr(short_story, attr, value)
-    short_story.save()
-    return short_story
+@api.get("/health/metrics/{metric}", response=List[HealthMetricOut])
+@cached('health-metrics', lookup='metric', per_day=True)
+@conditional(HealthMetric, lookup={'metric': 'metric'}, per_day=True)
+@trusted_output
+@async_variant(aget_health_metric)
+def get_health_metric(request, metric: str, days: int = 90):
+    """Get daily values of one health metric for last N days (default: 90)"""
+    return recent(metric_rows(metric), days)
 
 
-@api.delete("/shortstories/{shortstory_id}")
-def delete_short_story(request, shortstory_id: int):
-    """Delete a short story"""
-    short_story = get_object_or_404(ShortStories, id=shortstory_id)
-    short_story.delete()
-    return {"success": True}
+# Novels endpoints
+novels_router = CrudRouter(Novels, NovelIn, NovelOut, 'novel_id', 'novel')
+api.add_router("/novels", novels_router)
+
+
+@novels_router.get("", response=List[NovelListOut], exclude_unset=True)
+@cached('novels')
+@conditional(Novels)
+@paginate(KeysetPagination)
+@async_variant()
+def list_novels(request, fields: checked_names(NovelListOut.model_fields) = None):
+    """Get all novels, optionally only the given comma separated fields"""
+    allowed = list(NovelListOut.model_fields)
+    return sparse_values(Novels.objects.all(), fields, allowed, allowed)
+
+
+async def aget_novel(request, novel_id: int):
+    return await aget_object_or_404(Novels, id=novel_id)
+
 
-@api.get("/work-experience", response=List[WorkExperienceOut])
-def list_work_experience(request):
-    """Get all work experience entries"""
-    return WorkExperience.objects.all()
+@novels_router.get("/{novel_id}", response=NovelOut)
+@cached('novels', lookup='novel_id')
+@conditional(Novels, lookup={'pk': 'novel_id'})
+@async_variant(aget_novel)
+def get_novel(request, novel_id: int):
+    """Get a specific novel by ID"""
+    return get_object_or_404(Novels, id=novel_id)
+
+
+# Short Stories endpoints
+shortstories_router = CrudRouter(ShortStories, ShortStoryIn, ShortStoryOut, 'shortstory_id', 'short_story', 'short_stories')
+api.add_router("/shortstories", shortstories_router)
 
+
+@shortstories_router.get("", response=List[ShortStoryListOut], exclude_unset=True)
+@cached('shortstories')
+@conditional(ShortStories)
+@paginate(KeysetPagination)
+@async_variant()
+def list_short_stories(request, fields: checked_names(ShortStoryListOut.model_fields) = None):
+    """Get all short stories, optionally only the given comma separated fields"""
+    allowed = list(ShortStoryListOut.model_fields)
+    return sparse_values(ShortStories.objects.all(), fields, allowed, allowed)
+
+
+async def aget_short_story(request, shortstory_id: int):
+    return await aget_object_or_404(ShortStories, id=shortstory_id)
+
+
+@shortstories_router.get("/{shortstory_id}", response=ShortStoryOut)
+@cached('shortstories', lookup='shortstory_id')
+@conditional(ShortStories, lookup={'pk': 'shortstory_id'})
+@async_variant(aget_short_story)
+def get_short_story(request, shortstory_id: int):
+    """Get a specific short story by ID"""
+    return get_object_or_404(ShortStories, id=shortstory_id)
+
+
+# Work experience endpoints
+work_experience_router = CrudRouter(
+    WorkExperience, WorkExperienceIn, WorkExperienceOut, 'experience_id', 'work_experience',
+    plural='work_experience',
+)
+api.add_router("/work-experience", work_experience_router)
+
+
+@work_experience_router.get("", response=List[WorkExperienceListOut], exclude_unset=True)
+@cached('work-experience')
+@conditional(WorkExperience)
+@paginate(KeysetPagination)
+@async_variant()
+def list_work_experience(request, fields: checked_names(WorkExperienceListOut.model_fields) = None):
+    """Get all work experience entries, optionally only the given comma separated fields"""
+    allowed = list(WorkExperienceListOut.model_fields)
+    return sparse_values(WorkExperience.objects.all(), fields, allowed, allowed)
+
+
+# Homepage bootstrap: every section the React app loads on first paint, in one request
+T = TypeVar('T')
+
+
+class Page(Schema, Generic[T]):
+    items: List[T]
+    next: Optional[str]
+    previous: Optional[str]
+
+
+class BootstrapOut(Schema):
+    blog: Optional[Page[BlogPostListOut]] = None
+    projects: Optional[Page[ProjectListOut]] = None
+    work_experience: Optional[Page[WorkExperienceListOut]] = None
+    novels: Optional[Page[NovelListOut]] = None
+    shortstories: Optional[Page[ShortStoryListOut]] = None
+    health_weight: Optional[List[HealthWeightOut]] = None
+
+
+# section -> default page size; columns and page sizes match the section's own list endpoint
+BOOTSTRAP_LIMITS = {
+    'blog': 5,
+    'projects': 100,
+    'work_experience': 100,
+    'novels': 100,
+    'shortstories': 100,
+}
+BOOTSTRAP_SECTIONS = list(BOOTSTRAP_LIMITS) + ['health_weight']
+
+
+def parse_limits(limits):
+    """blog:5,projects:10 -> {'blog': 5, 'projects': 10} on top of BOOTSTRAP_LIMITS"""
+    result = dict(BOOTSTRAP_LIMITS)
+    for item in filter(None, (part.strip() for part in (limits or '').split(','))):
+        section, _, value = item.partition(':')
+        if section not in BOOTSTRAP_LIMITS or not value.isdigit() or int(value) < 1:
+            raise HttpError(400, f"Invalid limit: {item} (expected section:N for {', '.join(BOOTSTRAP_LIMITS)})")
+        result[section] = int(value)
+    return result
+
+
+# Checked as the query string is parsed, like checked_names
+BootstrapLimits = Annotated[Optional[str], AfterValidator(lambda limits: parse_limits(limits) and limits)]
+
+
+def first_page(queryset, limit):
+    """First page of a list endpoint, with the cursor to continue on that endpoint"""
+    return KeysetPagination().paginate_queryset(queryset, KeysetPagination.Input(limit=limit))
+
+
+async def afirst_page(queryset, limit):
+    return await KeysetPagination().apaginate_queryset(queryset, KeysetPagination.Input(limit=limit))
+
+
+def section_queryset(section):
+    """A bootstrap section's rows, with the default columns of its own list endpoint"""
+    if section == 'blog':
+        allowed = list(BlogPostListOut.model_fields)
+        return sparse_values(BlogPost.objects.all(), None, allowed, BLOG_LIST_FIELDS)
+    model, schema = {
+        'projects': (Projects, ProjectListOut),
+        'work_experience': (WorkExperience, WorkExperienceListOut),
+        'novels': (Novels, NovelListOut),
+        'shortstories': (ShortStories, ShortStoryListOut),
+    }[section]
+    allowed = list(schema.model_fields)
+    return sparse_values(model.objects.all(), None, allowed, allowed)
+
+
+async def aget_bootstrap(
+    request,
+    include: checked_names(BOOTSTRAP_SECTIONS) = None,
+    limits: BootstrapLimits = None,
+    days: int = 90,
+    max_points: Optional[int] = Query(300, ge=3),
+):
+    sections = parse_fields(include, BOOTSTRAP_SECTIONS, BOOTSTRAP_SECTIONS)
+    limits = parse_limits(limits)
+    result = {}
+    for section in BOOTSTRAP_LIMITS:
+        if section in sections:
+            result[section] = await afirst_page(section_queryset(section), limits[section])
+    if 'health_weight' in sections:
+        weights = recent(HealthWeight.objects.values('date', 'weight', 'unit'), days)
+        result['health_weight'] = await adownsample_weights(weights, 'day', max_points)
+    return result
+
+
+@api.get("/bootstrap", response=BootstrapOut, exclude_unset=True)
+@cached('bootstrap', per_day=True)
+@conditional(BlogPost, Projects, WorkExperience, Novels, ShortStories, HealthWeight, per_day=True)
+@async_variant(aget_bootstrap)
+def get_bootstrap(
+    request,
+    include: checked_names(BOOTSTRAP_SECTIONS) = None,
+    limits: BootstrapLimits = None,
+    days: int = 90,
+    max_points: Optional[int] = Query(300, ge=3),
+):
+    """Blog, projects, work experience, novels, short stories and recent weight in one response
+
+    include= picks sections (default: all), limits= sets page sizes, e.g.
+    limits=blog:1,projects:6. Each page's next cursor continues on that
+    section's own list endpoint.
+    """
+    sections = parse_fields(include, BOOTSTRAP_SECTIONS, BOOTSTRAP_SECTIONS)
+    limits = parse_limits(limits)
+    result = {}
+    for section in BOOTSTRAP_LIMITS:
+        if section in sections:
+            result[section] = first_page(section_queryset(section), limits[section])
+    if 'health_weight' in sections:
+        weights = recent(HealthWeight.objects.values('date', 'weight', 'unit'), days)
+        result['health_weight'] = downsample_weights(weights, 'day', max_points)
+    return result
+
+
+# Full-text search
+class SearchHitOut(Schema):
+    kind: str
+    id: int
+    title: str  # HTML-escaped, matches wrapped in <mark>
+    snippet: str
+    rank: float
+
+
+async def asearch_content(
+    request, q: str, kinds: checked_names(SEARCH_INDEXES) = None, limit: int = Query(20, ge=1, le=100),
+):
+    kinds = parse_fields(kinds, list(SEARCH_INDEXES), list(SEARCH_INDEXES))
+    return await sync_to_async(search)(q, kinds, limit)
+
+
+@api.get("/search", response=List[SearchHitOut])
+@cached('search')
+@conditional(BlogPost, Projects, WorkExperience, Novels, ShortStories)
+@async_variant(asearch_content)
+def search_content(
+    request, q: str, kinds: checked_names(SEARCH_INDEXES) = None, limit: int = Query(20, ge=1, le=100),
+):
+    """Ranked hits with highlighted snippets across blog posts, projects, novels, short stories and work experience"""
+    kinds = parse_fields(kinds, list(SEARCH_INDEXES), list(SEARCH_INDEXES))
+    return search(q, kinds, limit)
+
+
+@api.get("/cache/stats")
+@operator_only
+def get_cache_stats(request):
+    """Response cache hit/miss/invalidation counters for this worker"""
+    return cache_stats()
+
+
+@api.get("/metrics")
+@operator_only
+def get_metrics(request):
+    """Per-route latency, query and response size metrics of this worker, in Prometheus text format"""
+    return HttpResponse(render_metrics(), content_type=PROMETHEUS_CONTENT_TYPE)
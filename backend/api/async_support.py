@@ -0,0 +1,28 @@
+from functools import update_wrapper, wraps
+
+from django.conf import settings
+
+
+def async_variant(async_view=None):
+    """Serve an async twin of the decorated view when settings.API_ASYNC is on
+
+    Meant for ASGI deployments, where sync views all share one thread. The
+    twin keeps the view's name and docstring, so the OpenAPI schema doesn't
+    change. Without a twin the view itself is wrapped as a coroutine, which
+    suits list views that only build a lazy QuerySet: async pagination runs
+    the queries. Goes innermost, directly above the def, so paginate,
+    conditional and cached see a coroutine function.
+    """
+    def decorator(view):
+        if not settings.API_ASYNC:
+            return view
+        if async_view is not None:
+            return update_wrapper(async_view, view)
+
+        @wraps(view)
+        async def inner(*args, **kwargs):
+            return view(*args, **kwargs)
+
+        return inner
+
+    return decorator
@@ -0,0 +1,193 @@
+"""
+Bulk writes for the content endpoints: one validation pass, one transaction
+
+Batches are all or nothing. If any item is invalid, names a missing row or
+repeats an id, nothing is written and every failing item is reported by its
+index in the request.
+"""
+
+from typing import List, Optional
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from ninja import Schema
+from pydantic import TypeAdapter, ValidationError, create_model
+
+from .caching import invalidate_model, invalidation_batch
+from .images import IMAGE_FIELDS, queue_variants
+from .rendering import RENDERED_COLUMNS, RENDERED_FIELDS, render_instance
+
+
+# Request bodies are capped at this many items (or ids)
+MAX_BULK_ITEMS = 1000
+
+# Optional fields of the schemas may still be NOT NULL columns ('' when blank)
+NULL_MESSAGE = "Field may not be null"
+
+
+class BulkItemError(Schema):
+    index: int
+    id: Optional[int] = None
+    errors: List[str]
+
+
+class BulkErrorOut(Schema):
+    detail: str
+    errors: List[BulkItemError]
+
+
+class BulkOut(Schema):
+    ids: List[int]
+
+
+def with_id(schema):
+    """The schema plus the id of the row an item replaces"""
+    return create_model(f"{schema.__name__}WithId", __base__=schema, id=(int, ...))
+
+
+def validate_items(schema, items):
+    """(validated items, []) or (None, per-item errors) for a list of dicts"""
+    try:
+        return TypeAdapter(List[schema]).validate_python(items), []
+    except ValidationError as exc:
+        by_index = {}
+        for error in exc.errors():
+            index, *loc = error['loc']
+            field = '.'.join(map(str, loc))
+            by_index.setdefault(index, []).append(f"{field}: {error['msg']}" if field else error['msg'])
+        return None, [BulkItemError(index=index, errors=messages) for index, messages in sorted(by_index.items())]
+
+
+def rejected(errors, status=422, detail="No items were written"):
+    return status, BulkErrorOut(detail=detail, errors=errors)
+
+
+def missing_ids(ids, found):
+    return [BulkItemError(index=index, id=pk, errors=["not found"]) for index, pk in enumerate(ids) if pk not in found]
+
+
+def duplicate_ids(ids):
+    seen = set()
+    errors = []
+    for index, pk in enumerate(ids):
+        if pk in seen:
+            errors.append(BulkItemError(index=index, id=pk, errors=["duplicate id"]))
+        seen.add(pk)
+    return errors
+
+
+def replacement_values(model, payload, exclude=None):
+    """payload's values for a PUT; omitted optional fields take the model's default, as on create"""
+    values = payload.dict(exclude=exclude)
+    for name in values.keys() - payload.model_fields_set:
+        if values[name] is None:
+            values[name] = model._meta.get_field(name).get_default()
+    return values
+
+
+def null_fields(model, values):
+    """The fields values would set to null on a column that can't hold it"""
+    return [name for name, value in values.items() if value is None and not model._meta.get_field(name).null]
+
+
+def null_errors(model, ids, values):
+    errors = []
+    for index, (pk, item) in enumerate(zip(ids, values)):
+        if names := null_fields(model, item):
+            errors.append(BulkItemError(index=index, id=pk, errors=[f"{name}: {NULL_MESSAGE}" for name in names]))
+    return errors
+
+
+def written(model, objs, instances=()):
+    """What post_save would have done for each row: invalidate responses, render images"""
+    invalidate_model(model, *instances)
+    field = IMAGE_FIELDS.get(model._meta.label)
+    if field and settings.IMAGE_VARIANT_WORKERS:
+        pending = [obj for obj in objs if getattr(obj, field) and getattr(obj, f"{field}_width") is None]
+        if pending:
+            transaction.on_commit(lambda: [queue_variants(obj) for obj in pending])
+
+
+def bulk_create(model, schema, items):
+    """Insert every item in one transaction, in as few INSERTs as SQLite allows"""
+    payloads, errors = validate_items(schema, items)
+    if errors:
+        return rejected(errors)
+    try:
+        with transaction.atomic():
+            objs = [model(**payload.dict(exclude_none=True)) for payload in payloads]
+            for obj in objs:
+                render_instance(obj)  # bulk_create() sends no pre_save
+            objs = model.objects.bulk_create(objs)
+            written(model, objs)
+    except IntegrityError as exc:
+        return rejected([], detail=f"No items were written: {exc}")
+    return 200, {"ids": [obj.pk for obj in objs]}
+
+
+def bulk_update(model, schema, items):
+    """Replace the rows named by each item's id, like PUT does one at a time"""
+    payloads, errors = validate_items(with_id(schema), items)
+    if errors:
+        return rejected(errors)
+    ids = [payload.id for payload in payloads]
+    if errors := duplicate_ids(ids):
+        return rejected(errors)
+    values = [replacement_values(model, payload, exclude={'id'}) for payload in payloads]
+    if errors := null_errors(model, ids, values):
+        return rejected(errors)
+
+    fields = list(schema.model_fields)
+    image_field = IMAGE_FIELDS.get(model._meta.label)
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            existing = model.objects.in_bulk(ids)
+            if errors := missing_ids(ids, existing):
+                return rejected(errors, status=404)
+            objs = []
+            for pk, item in zip(ids, values):
+                obj = existing[pk]
+                image = getattr(obj, image_field).name if image_field else None
+                for attr, value in item.items():
+                    setattr(obj, attr, value)
+                if image_field and getattr(obj, image_field).name != image:
+                    # A new image has no variants yet (see signals.reset_image_width)
+                    setattr(obj, f"{image_field}_width", None)
+                # bulk_update() leaves auto_now alone and sends no pre_save
+                obj.updated_at = now
+                render_instance(obj)
+                objs.append(obj)
+            update_fields = fields + ['updated_at'] + ([f"{image_field}_width"] if image_field else [])
+            if model._meta.label in RENDERED_FIELDS:
+                update_fields += RENDERED_COLUMNS
+            model.objects.bulk_update(objs, update_fields)
+            written(model, objs, objs)
+    except IntegrityError as exc:
+        return rejected([], detail=f"No items were written: {exc}")
+    return 200, {"ids": ids}
+
+
+def bulk_delete(model, ids):
+    """Delete every listed row, or none if any is missing"""
+    if errors := duplicate_ids(ids):
+        return rejected(errors)
+    with transaction.atomic():
+        found = set(model.objects.filter(pk__in=ids).values_list('pk', flat=True))
+        if errors := missing_ids(ids, found):
+            return rejected(errors, status=404)
+        delete_rows(model, ids)
+    return 200, {"ids": ids}
+
+
+def delete_rows(model, pks):
+    """Delete the rows, returning how many there were
+
+    QuerySet.delete() runs cascades and sends post_delete, which invalidates
+    the cached responses (see signals.INVALIDATING_MODELS); the list and
+    aggregate groups are dropped once, not once per row.
+    """
+    with invalidation_batch():
+        _, deleted = model.objects.filter(pk__in=pks).delete()
+    return deleted.get(model._meta.label, 0)
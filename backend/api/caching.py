@@ -0,0 +1,219 @@
+import hashlib
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from ninja.decorators import decorate_view
+
+
+# model label -> (cache namespace, attribute that names its detail group)
+CACHE_NAMESPACES = {
+    'api.BlogPost': ('blog', 'pk'),
+    'api.Projects': ('projects', 'pk'),
+    'api.Novels': ('novels', 'pk'),
+    'api.ShortStories': ('shortstories', 'pk'),
+    'api.WorkExperience': ('work-experience', 'pk'),
+    'api.HealthWeight': ('health-weight', None),
+    'api.HealthWeightStats': ('health-weight-stats', None),
+    'api.HealthMetric': ('health-metrics', 'metric'),
+}
+
+# Groups built from every model (e.g. /bootstrap, /search), dropped on any invalidation
+AGGREGATE_GROUPS = ['bootstrap:list', 'search:list']
+
+CACHED_HEADERS = ['Content-Type', 'ETag', 'Last-Modified']
+
+_lock = threading.Lock()
+_stats = {'hits': Counter(), 'misses': Counter(), 'invalidations': Counter()}
+
+# Groups invalidated inside invalidation_batch(), dropped when it ends
+_batch = ContextVar('api_cache_batch', default=None)
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def _record(kind, namespace):
+    with _lock:
+        _stats[kind][namespace] += 1
+
+
+def cache_stats():
+    """Hit/miss/invalidation counters of this process, per namespace and in total"""
+    with _lock:
+        return {
+            kind: {'total': sum(counts.values()), **dict(counts)}
+            for kind, counts in _stats.items()
+        }
+
+
+def _version_key(group):
+    return f"api-cache:version:{group}"
+
+
+def group_version(group):
+    """Current version of a key group; new (or evicted) groups start from the clock,
+    so entries from before an eviction can never be picked up again"""
+    cache = get_cache()
+    version = cache.get(_version_key(group))
+    if version is None:
+        cache.add(_version_key(group), time.time_ns(), timeout=None)
+        version = cache.get(_version_key(group))
+    return version
+
+
+def invalidate(*groups):
+    """Drop every cached response in the given groups, e.g. 'blog:list', 'blog:42'
+
+    Inside a transaction the groups are dropped once it commits: a read
+    between the two would otherwise cache the old rows under the new version.
+    """
+    batch = _batch.get()
+    if batch is not None:
+        batch.update(groups)
+        return
+    transaction.on_commit(lambda: _bump(groups))
+
+
+def _bump(groups):
+    cache = get_cache()
+    for group in groups:
+        cache.set(_version_key(group), time.time_ns(), timeout=None)
+        _record('invalidations', group.split(':')[0])
+
+
+@contextmanager
+def invalidation_batch():
+    """Invalidate each group once, when the block ends, however often it's invalidated inside
+
+    For signal-driven writes of many rows, e.g. a QuerySet.delete() sending
+    post_delete per row.
+    """
+    if _batch.get() is not None:
+        yield
+        return
+    groups = set()
+    token = _batch.set(groups)
+    try:
+        yield
+    finally:
+        _batch.reset(token)
+        invalidate(*sorted(groups))
+
+
+def invalidate_model(model, *instances):
+    """Invalidate the list group of a model and the detail groups of the given instances
+
+    With SNAPSHOT_ON_WRITE the same namespace and instances are queued for
+    republishing in the static snapshot.
+    """
+    namespace, key_attr = CACHE_NAMESPACES.get(model._meta.label, (None, None))
+    if namespace is None:
+        return
+    groups = [f"{namespace}:list", *AGGREGATE_GROUPS]
+    if key_attr:
+        groups += {f"{namespace}:{getattr(instance, key_attr)}" for instance in instances}
+    invalidate(*groups)
+
+    if settings.SNAPSHOT_ON_WRITE:
+        from .snapshot import queue_publish
+
+        keys = [getattr(instance, key_attr) for instance in instances] if key_attr and instances else None
+        queue_publish(namespace, keys)
+
+
+def response_key(group, request, per_day=False):
+    path = request.get_full_path()
+    if per_day:
+        path = f"{path}|{timezone.localdate().isoformat()}"
+    digest = hashlib.sha256(path.encode()).hexdigest()[:32]
+    return f"api-cache:{group}:{group_version(group)}:{digest}"
+
+
+def cached_response(entry, request):
+    """Rebuild a stored response, or a 304/412 if the request's validators match it"""
+    headers = entry['headers']
+    last_modified = parse_http_date_safe(headers.get('Last-Modified', ''))
+    response = get_conditional_response(request, etag=headers.get('ETag'), last_modified=last_modified)
+    if response is None:
+        response = HttpResponse(entry['content'], status=entry['status'])
+        for name, value in headers.items():
+            response[name] = value
+    else:
+        for name in ('ETag', 'Last-Modified'):
+            if name in headers:
+                response[name] = headers[name]
+    return response
+
+
+def store_response(key, response):
+    if response.status_code == 200 and not response.streaming:
+        get_cache().set(key, {
+            'status': response.status_code,
+            'content': response.content,
+            'headers': {name: response[name] for name in CACHED_HEADERS if response.has_header(name)},
+        })
+
+
+def cached(namespace, lookup=None, per_day=False):
+    """Cache a GET endpoint's rendered response per route and query params
+
+    lookup names the path parameter of detail endpoints, so writes to one
+    object only drop that object's entries plus the lists. Hits still honour
+    If-None-Match/If-Modified-Since against the cached validators. Async views
+    use the same (sync) cache calls: the cache backends don't touch the DB.
+    """
+    def cache_key(request, kwargs):
+        if not settings.API_CACHE_ENABLED or request.method not in ('GET', 'HEAD'):
+            return None
+        group = f"{namespace}:{kwargs[lookup]}" if lookup else f"{namespace}:list"
+        return response_key(group, request, per_day)
+
+    def lookup_entry(key):
+        entry = get_cache().get(key)
+        _record('hits' if entry is not None else 'misses', namespace)
+        return entry
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def ainner(request, *args, **kwargs):
+                key = cache_key(request, kwargs)
+                if key is None:
+                    return await view(request, *args, **kwargs)
+                entry = lookup_entry(key)
+                if entry is not None:
+                    return cached_response(entry, request)
+                response = await view(request, *args, **kwargs)
+                store_response(key, response)
+                return response
+
+            return ainner
+
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            key = cache_key(request, kwargs)
+            if key is None:
+                return view(request, *args, **kwargs)
+            entry = lookup_entry(key)
+            if entry is not None:
+                return cached_response(entry, request)
+            response = view(request, *args, **kwargs)
+            store_response(key, response)
+            return response
+
+        return inner
+
+    return decorate_view(decorator)
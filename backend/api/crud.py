@@ -0,0 +1,174 @@
+"""
+CrudRouter: the write routes every content model shares
+
+Updates are one UPDATE followed by a SELECT of the updated row; they send
+no model signals and do the signals' work (rendering, cache invalidation,
+image variants) themselves. Deletes go through QuerySet.delete(), so
+cascades and post_delete receivers run as for any other delete.
+"""
+
+import inspect
+from copy import copy
+from typing import Annotated, Any, Dict, List
+
+from django.db.models import Case, F, When
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from ninja import Body, Router
+from ninja.errors import ValidationError
+from pydantic import create_model
+
+from .bulk import (
+    MAX_BULK_ITEMS, NULL_MESSAGE, BulkErrorOut, BulkOut, bulk_create, bulk_delete, bulk_update, delete_rows,
+    null_fields, replacement_values, written,
+)
+from .images import IMAGE_FIELDS
+from .rendering import rendered_values
+
+
+# Bulk routes take a bare JSON array: of items to create, of items with an id to
+# replace, or of ids to delete
+BulkItems = Annotated[List[Dict[str, Any]], Body(min_length=1, max_length=MAX_BULK_ITEMS)]
+BulkIds = Annotated[List[int], Body(min_length=1, max_length=MAX_BULK_ITEMS)]
+BULK_RESPONSES = {200: BulkOut, 404: BulkErrorOut, 422: BulkErrorOut}
+
+
+def partial_schema(schema):
+    """A subclass of schema with every field optional, for PATCH
+
+    Fields keep their types, constraints and validators, so a required field
+    still can't be set to null. An optional field can, and check_nulls turns
+    that away if the column is NOT NULL.
+    """
+    fields = {}
+    for name, info in schema.model_fields.items():
+        info = copy(info)
+        info.default = None
+        fields[name] = (info.annotation, info)
+    return create_model(f"{schema.__name__}Patch", __base__=schema, **fields)
+
+
+def check_nulls(model, values):
+    """Raise a 422 like Ninja's own for each value that would null a NOT NULL column"""
+    if names := null_fields(model, values):
+        raise ValidationError([{'type': 'null', 'loc': ('body', 'payload', name), 'msg': NULL_MESSAGE}
+                               for name in names])
+
+
+def update_row(model, pk, values):
+    """Apply values to one row and return it, or None if there's no such row"""
+    # update() leaves auto_now alone and sends no pre_save to render the text
+    values = {**values, **rendered_values(model, values), 'updated_at': timezone.now()}
+    field = IMAGE_FIELDS.get(model._meta.label)
+    if field in values:
+        # Only the same image keeps its variants (see signals.reset_image_width)
+        values[f"{field}_width"] = Case(When(**{field: values[field]}, then=F(f"{field}_width")), default=None)
+    queryset = model.objects.filter(pk=pk)
+    rows = list(queryset) if queryset.update(**values) else []
+    if not rows:
+        return None
+    written(model, rows, rows)
+    return rows[0]
+
+
+class CrudRouter(Router):
+    """A model's write routes, plus whatever reads the caller adds with @router.get
+
+        blog = CrudRouter(BlogPost, BlogPostIn, BlogPostOut, 'post_id', 'blog_post')
+        api.add_router('/blog', blog)
+
+    gives POST /blog, PUT/PATCH/DELETE /blog/{post_id} and
+    POST/PUT/DELETE /blog/bulk. Views are named as they would be written by
+    hand (create_blog_post, bulk_delete_blog_posts, ...).
+    """
+
+    def __init__(self, model, schema_in, schema_out, id_param, name, plural=None, **kwargs):
+        super().__init__(**kwargs)
+        self.model = model
+        self.schema_in = schema_in
+        self.schema_patch = partial_schema(schema_in)
+        self.id_param = id_param
+        self.name = name
+        self.plural = plural or f"{name}s"
+        self.add_write_routes(schema_out)
+
+    def add_write_routes(self, schema_out):
+        one, many = self.name.replace('_', ' '), self.plural.replace('_', ' ')
+        detail = f"/{{{self.id_param}}}"
+        self.post("", response=schema_out)(
+            self.view(f"create_{self.name}", f"Create a new {one}", self.create, payload=self.schema_in))
+        # Before the detail routes, whose untyped {id} would match 'bulk'
+        self.post("/bulk", response=BULK_RESPONSES)(
+            self.view(f"bulk_create_{self.plural}", f"Create many {many} in one transaction",
+                      self.bulk_create, items=BulkItems))
+        self.put("/bulk", response=BULK_RESPONSES)(
+            self.view(f"bulk_update_{self.plural}", f"Replace many {many}, each item naming its id",
+                      self.bulk_update, items=BulkItems))
+        self.delete("/bulk", response=BULK_RESPONSES)(
+            self.view(f"bulk_delete_{self.plural}", f"Delete many {many} by id", self.bulk_delete, ids=BulkIds))
+        self.put(detail, response=schema_out)(
+            self.view(f"update_{self.name}", f"Replace a {one}", self.update,
+                      **{self.id_param: int, 'payload': self.schema_in}))
+        self.patch(detail, response=schema_out)(
+            self.view(f"patch_{self.name}", f"Update the given fields of a {one}", self.patch_fields,
+                      **{self.id_param: int, 'payload': self.schema_patch}))
+        self.delete(detail)(
+            self.view(f"delete_{self.name}", f"Delete a {one}", self.delete_one, **{self.id_param: int}))
+
+    def view(self, name, doc, method, **params):
+        """A view for Ninja named name, whose signature declares params; the id param reaches method as pk"""
+        id_param = self.id_param
+
+        def inner(request, **kwargs):
+            if id_param in kwargs:
+                kwargs['pk'] = kwargs.pop(id_param)
+            return method(request, **kwargs)
+
+        inner.__name__ = inner.__qualname__ = name
+        inner.__doc__ = doc
+        inner.__signature__ = inspect.Signature([
+            inspect.Parameter('request', inspect.Parameter.POSITIONAL_OR_KEYWORD),
+            *(inspect.Parameter(param, inspect.Parameter.KEYWORD_ONLY, annotation=annotation)
+              for param, annotation in params.items()),
+        ])
+        return inner
+
+    def not_found(self):
+        return Http404(f"No {self.model._meta.object_name} matches the given query.")
+
+    def create(self, request, payload):
+        # Omitted optional fields take the model's default ('' for blank text)
+        return self.model.objects.create(**payload.dict(exclude_none=True))
+
+    def update(self, request, pk, payload):
+        values = replacement_values(self.model, payload)
+        check_nulls(self.model, values)
+        obj = update_row(self.model, pk, values)
+        if obj is None:
+            raise self.not_found()
+        return obj
+
+    def patch_fields(self, request, pk, payload):
+        values = payload.dict(exclude_unset=True)
+        check_nulls(self.model, values)
+        if not values:
+            return get_object_or_404(self.model, pk=pk)
+        obj = update_row(self.model, pk, values)
+        if obj is None:
+            raise self.not_found()
+        return obj
+
+    def delete_one(self, request, pk):
+        if not delete_rows(self.model, [pk]):
+            raise self.not_found()
+        return {"success": True}
+
+    def bulk_create(self, request, items):
+        return bulk_create(self.model, self.schema_in, items)
+
+    def bulk_update(self, request, items):
+        return bulk_update(self.model, self.schema_in, items)
+
+    def bulk_delete(self, request, ids):
+        return bulk_delete(self.model, ids)
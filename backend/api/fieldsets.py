@@ -0,0 +1,65 @@
+from typing import Annotated, Optional
+
+from django.core.files.storage import default_storage
+from ninja.errors import HttpError
+from pydantic import AfterValidator
+
+
+VARIANTS_SUFFIX = '_variants'
+
+
+def media_url(name):
+    """Storage path from .values() -> the /media/... URL Ninja returns for file fields"""
+    return default_storage.url(name) if name else None
+
+
+MediaUrl = Annotated[Optional[str], AfterValidator(media_url)]
+
+
+def parse_fields(fields, allowed, default):
+    """Split a fields= parameter, rejecting names the schema doesn't know"""
+    if not fields:
+        return list(default)
+
+    requested = [name.strip() for name in fields.split(',') if name.strip()]
+    unknown = [name for name in requested if name not in allowed]
+    if unknown:
+        raise HttpError(400, f"Unknown fields: {', '.join(unknown)} (allowed: {', '.join(allowed)})")
+    return requested
+
+
+def checked_names(allowed):
+    """An optional comma separated parameter of names out of allowed (fields=, include=, ...)
+
+    Checked while Ninja parses the query string, so an unknown name is a 400
+    before the handler's decorators (conditional's version queries) run. The
+    handler still gets the string, for parse_fields.
+    """
+    def check(names):
+        parse_fields(names, allowed, ())
+        return names
+
+    return Annotated[Optional[str], AfterValidator(check)]
+
+
+def source_columns(name):
+    """Columns a field is read from; <image>_variants is resolved from <image> and <image>_width"""
+    if name.endswith(VARIANTS_SUFFIX):
+        field = name[:-len(VARIANTS_SUFFIX)]
+        return [field, f"{field}_width"]
+    return [name]
+
+
+def sparse_values(queryset, fields, allowed, default):
+    """Only the requested columns as dicts, via .values()
+
+    id and the model's ordering fields are always selected so keyset
+    pagination can build its cursors.
+    """
+    requested = parse_fields(fields, allowed, default)
+
+    keys = ['id'] + [name.lstrip('-') for name in queryset.model._meta.ordering]
+    selected = [column for name in requested for column in source_columns(name)]
+    columns = list(dict.fromkeys(keys + selected))
+
+    return queryset.values(*columns)
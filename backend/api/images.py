@@ -0,0 +1,172 @@
+import logging
+import os
+import posixpath
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.utils import timezone
+
+from .caching import invalidate_model
+
+
+logger = logging.getLogger(__name__)
+
+# model label -> image field; each has a <field>_width column, set once its variants exist
+IMAGE_FIELDS = {
+    'api.BlogPost': 'image',
+    'api.Projects': 'image',
+    'api.Novels': 'cover_image',
+    'api.ShortStories': 'cover_image',
+    'api.WorkExperience': 'logo',
+}
+
+FORMAT_OPTIONS = {
+    'avif': {'format': 'AVIF', 'quality': 60, 'speed': 6},
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+    'jpeg': {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True},
+}
+
+VARIANTS_DIR = 'variants'
+
+
+def variant_widths(width, widths=None):
+    """Widths rendered for an original `width` px wide: the configured ones below it, plus its own"""
+    widths = widths or settings.IMAGE_VARIANT_WIDTHS
+    return [w for w in sorted(widths) if w < width] + [width]
+
+
+def variant_name(name, width, fmt):
+    """blog_images/photo.jpg -> variants/blog_images/photo-640w.webp"""
+    stem = posixpath.splitext(name)[0]
+    return posixpath.join(VARIANTS_DIR, f"{stem}-{width}w.{fmt}")
+
+
+def render_variants(root, name, widths, formats):
+    """Resize one upload into every width/format; runs in a worker process
+
+    Pillow only, no Django, so it pickles cleanly into the pool. Outputs newer
+    than the original are kept, so backfills can be re-run cheaply. Returns the
+    original width, or None if the file is missing or not an image.
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    source = os.path.join(root, name)
+    try:
+        image = Image.open(source)
+        image = ImageOps.exif_transpose(image)
+    except (FileNotFoundError, UnidentifiedImageError):
+        return None
+
+    source_mtime = os.path.getmtime(source)
+    original_width, original_height = image.size
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'P') else 'RGB')
+
+    for width in sorted(variant_widths(original_width, widths), reverse=True):
+        height = max(1, round(original_height * width / original_width))
+        resized = None
+        for fmt in formats:
+            target = os.path.join(root, variant_name(name, width, fmt))
+            if os.path.exists(target) and os.path.getmtime(target) >= source_mtime:
+                continue
+            if resized is None:
+                resized = image if width == original_width else image.resize((width, height), Image.LANCZOS)
+            output = resized
+            if fmt == 'jpeg' and output.mode == 'RGBA':
+                # No alpha in JPEG: flatten onto white
+                background = Image.new('RGB', output.size, (255, 255, 255))
+                background.paste(output, mask=output.getchannel('A'))
+                output = background
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            output.save(target, **FORMAT_OPTIONS[fmt])
+    return original_width
+
+
+def available_formats():
+    """Configured formats this Pillow build can write"""
+    from PIL import features
+
+    return [fmt for fmt in settings.IMAGE_VARIANT_FORMATS if fmt != 'avif' or features.check('avif')]
+
+
+def srcsets(name, width):
+    """{'width': ..., 'webp': 'url 320w, url 640w', ...} for an image whose variants exist"""
+    if not name or not width:
+        return None
+    result = {'width': width}
+    for fmt in available_formats():
+        result[fmt] = ', '.join(
+            f"{default_storage.url(variant_name(name, w, fmt))} {w}w" for w in variant_widths(width)
+        )
+    return result
+
+
+def image_variants(obj, field):
+    """Schema resolver: srcsets for obj's image field, from a model instance or .values() row
+
+    Raises AttributeError when a sparse row lacks the columns, which leaves the
+    field unset so exclude_unset drops it.
+    """
+    if isinstance(obj, dict):
+        if field not in obj or f"{field}_width" not in obj:
+            raise AttributeError(f"{field}_variants")
+        return srcsets(obj[field], obj[f"{field}_width"])
+    return srcsets(getattr(obj, field).name, getattr(obj, f"{field}_width"))
+
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.IMAGE_VARIANT_WORKERS)
+    return _executor
+
+
+def store_width(model, pk, field, name, width):
+    """Mark the variants of `name` as ready, unless the object moved on to another image"""
+    if width is None:
+        return 0
+    # updated_at moves too, so ETags change and clients pick up the srcsets
+    updated = (
+        model.objects.filter(pk=pk, **{field: name})
+        .exclude(**{f"{field}_width": width})
+        .update(**{f"{field}_width": width, 'updated_at': timezone.now()})
+    )
+    if updated:
+        # update() sends no signals
+        invalidate_model(model, model(pk=pk))
+    return updated
+
+
+def _finished(model, pk, field, name, future):
+    # Runs on the pool's management thread, which has its own DB connection
+    try:
+        store_width(model, pk, field, name, future.result())
+    except Exception:
+        logger.exception("Rendering variants of %s failed", name)
+    finally:
+        connection.close()
+
+
+def queue_variants(instance):
+    """Render the variants of instance's image in the process pool, then record its width"""
+    model = type(instance)
+    field = IMAGE_FIELDS[model._meta.label]
+    name = getattr(instance, field).name
+    if not name:
+        return None
+    future = get_executor().submit(
+        render_variants, str(settings.MEDIA_ROOT), name, settings.IMAGE_VARIANT_WIDTHS, available_formats()
+    )
+    future.add_done_callback(partial(_finished, model, instance.pk, field, name))
+    return future
+
+
+def image_models():
+    return [(apps.get_model(label), field) for label, field in IMAGE_FIELDS.items()]
@@ -0,0 +1,238 @@
+import json
+import re
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+
+from api.query_guard import FULL_SCAN_RE, IGNORED, pattern, tracking
+
+
+# "USE TEMP B-TREE FOR ORDER BY" (or GROUP BY, DISTINCT, RIGHT PART OF ORDER BY)
+TEMP_SORT_RE = re.compile(r'^USE TEMP B-TREE FOR (.+)$')
+
+COLUMN_RE = re.compile(r'"(\w+)"\."(\w+)"')
+EQUALS_RE = re.compile(r'"(\w+)"\."(\w+)" = %s')
+ORDER_ITEM_RE = re.compile(r'^(.+?)(?: (ASC|DESC))?$')
+ALIAS_RE = re.compile(r' AS "\w+"$')
+
+
+def plan(sql, params):
+    """EXPLAIN QUERY PLAN rows as (depth, detail)"""
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        rows = cursor.fetchall()
+    depths = {0: -1}
+    lines = []
+    for node, parent, _, detail in rows:
+        depths[node] = depths.get(parent, -1) + 1
+        lines.append((depths[node], detail))
+    return lines
+
+
+def problems(lines):
+    found = []
+    for _, detail in lines:
+        if match := FULL_SCAN_RE.match(detail):
+            found.append(f"full scan of {match.group(1)}")
+        elif match := TEMP_SORT_RE.match(detail):
+            found.append(f"temp B-tree for {match.group(1).lower()}")
+    return found
+
+
+def split_top_level(sql, separator=', ', keywords=()):
+    """Split on separator outside parentheses and quotes, stopping at the first keyword at that level"""
+    parts, depth, quote, start = [], 0, None, 0
+    for i, char in enumerate(sql):
+        if quote:
+            quote = None if char == quote else quote
+        elif char in '"\'':
+            quote = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif depth == 0 and i >= start and sql.startswith(separator, i):
+            parts.append(sql[start:i])
+            start = i + len(separator)
+        elif depth == 0 and any(sql.startswith(keyword, i) for keyword in keywords):
+            return parts + [sql[start:i]], sql[i:]
+    return parts + [sql[start:]], ''
+
+
+def outer_clauses(sql):
+    """(select list, table, WHERE text, ORDER BY items) of the outermost single-table SELECT, or None"""
+    if not sql.startswith('SELECT ') or ' JOIN ' in sql:
+        return None
+    select, rest = split_top_level(sql[len('SELECT '):], keywords=[' FROM '])
+    match = re.match(r' FROM "(\w+)"', rest)
+    if not match:
+        return None
+    table = match.group(1)
+    rest = rest[match.end():]
+    where, order_by = rest.partition(' ORDER BY ')[::2]
+    items, _ = split_top_level(order_by, keywords=[' LIMIT ', ' OFFSET ']) if order_by else ([], '')
+    return select, table, where, items
+
+
+def unwrap(sql):
+    """sql without parentheses around the whole of it"""
+    while sql.startswith('(') and sql.endswith(')'):
+        depth = 0
+        for i, char in enumerate(sql):
+            depth += {'(': 1, ')': -1}.get(char, 0)
+            if depth == 0:
+                break
+        if i != len(sql) - 1:
+            break
+        sql = sql[1:-1]
+    return sql
+
+
+def equality_filters(where):
+    """(table, column) pairs the WHERE clause requires equal to a parameter
+
+    Only terms ANDed at the top level count; a = %s inside an OR filters nothing.
+    """
+    where = unwrap(where.removeprefix(' WHERE ').strip())
+    terms, _ = split_top_level(where, ' AND ')
+    if len(terms) > 1:
+        return [pair for term in terms for pair in equality_filters(term)]
+    match = EQUALS_RE.fullmatch(where)
+    return [match.groups()] if match else []
+
+
+def proposed_index(sql):
+    """(model, fields) for an index serving the statement's equality filters, then its ORDER BY
+
+    Only for single-table SELECTs ordered by plain columns; fields are in
+    Meta.indexes syntax ('-created_at' for descending). An ORDER BY that is
+    all descending gets an ascending index, which SQLite reads backwards.
+    """
+    clauses = outer_clauses(sql)
+    if not clauses or not clauses[3]:
+        return None
+    select, table, where, items = clauses
+    model = next((model for model in apps.get_models() if model._meta.db_table == table), None)
+    if model is None:
+        return None
+    columns = {field.column: field.name for field in model._meta.concrete_fields}
+
+    fields = [columns[column] for column_table, column in equality_filters(where)
+              if column_table == table and column in columns]
+    ordered = []
+    for item in items:
+        expression, direction = ORDER_ITEM_RE.match(item).groups()
+        if expression.isdigit():
+            expression = ALIAS_RE.sub('', select[int(expression) - 1])
+        match = COLUMN_RE.fullmatch(expression)
+        if not match or match.group(1) != table or match.group(2) not in columns:
+            return None
+        ordered.append((columns[match.group(2)], direction == 'DESC'))
+    if all(descending for _, descending in ordered):
+        ordered = [(name, False) for name, _ in ordered]
+    for name, descending in ordered:
+        if name not in fields:
+            fields.append(f"-{name}" if descending else name)
+    return model, list(dict.fromkeys(fields))
+
+
+def index_name(model, fields):
+    """<model>_<fields>_idx, shortening the model then the fields to fit Django's 30 characters"""
+    suffix = f"_{'_'.join(field.lstrip('-') for field in fields)}_idx"
+    if len(suffix) > 22:
+        suffix = suffix[:18] + '_idx'
+    return model._meta.model_name[:30 - len(suffix)] + suffix
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN QUERY PLAN every query the read endpoints run, flagging scans and sorts and proposing indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=10,
+                            help='Size of the synthetic test database, as in python -m benchmarks.suite')
+        parser.add_argument('--current', action='store_true',
+                            help='Explain against the configured database instead of a seeded test database')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("EXPLAIN QUERY PLAN is SQLite's; the configured database is " + connection.vendor)
+
+        if options['current']:
+            self.explain_all()
+            return
+
+        from benchmarks.synthetic import seed_database
+
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            counts = seed_database(options['scale'])
+            self.stdout.write(f"🛠  Seeded a test database at scale {options['scale']:g}: {counts}\n")
+            self.explain_all()
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def explain_all(self):
+        statements = self.collect()
+        flagged = 0
+        proposals = {}
+        for name, (sql, params) in statements.items():
+            lines = plan(sql, params)
+            found = problems(lines)
+            if found:
+                flagged += 1
+                status = self.style.WARNING('⚠️  ' + ', '.join(found))
+            else:
+                status = self.style.SUCCESS('✅ indexed')
+            self.stdout.write(f"{name}  {status}\n  {sql}")
+            if params:
+                self.stdout.write(f"  params: {list(params)}")
+            for depth, detail in lines:
+                self.stdout.write(f"    {'  ' * depth}{detail}")
+            self.stdout.write('')
+            if found and (proposal := proposed_index(sql)):
+                model, fields = proposal
+                if fields not in proposals.setdefault(model, []):
+                    proposals[model].append(fields)
+
+        self.stdout.write(f"📊 {len(statements)} distinct queries, {flagged} with full scans or temp B-trees")
+        if not proposals:
+            self.stdout.write(self.style.SUCCESS("✅ No indexes to propose"))
+            return
+        self.stdout.write("\n💡 Proposed indexes: add them to each model's Meta, then run makemigrations")
+        for model, indexes in proposals.items():
+            self.stdout.write(f"\n  {model.__name__}.Meta:\n    indexes = [")
+            for fields in indexes:
+                self.stdout.write(f"        models.Index(fields={fields!r}, name={index_name(model, fields)!r}),")
+            self.stdout.write("    ]")
+
+    def collect(self):
+        """{'GET url #n': (sql, params)} for the first run of each distinct statement
+
+        Requests every GET scenario of the benchmark suite, plus the second
+        page of each paginated list so keyset cursors are explained too.
+        """
+        from benchmarks.suite import api_scenarios
+
+        client = Client()
+        statements, seen = {}, set()
+        urls = [scenario.url for scenario in api_scenarios() if scenario.method == 'GET' and not scenario.headers]
+        with override_settings(API_CACHE_ENABLED=False, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            while urls:
+                url = urls.pop(0)
+                with tracking() as tracker:
+                    response = client.get(url)
+                if response.status_code != 200:
+                    raise CommandError(f"GET {url} returned {response.status_code}")
+                if response['Content-Type'].startswith('application/json') and 'cursor=' not in url:
+                    body = json.loads(response.content)
+                    if isinstance(body, dict) and body.get('next'):
+                        urls.insert(0, f"{url}{'&' if '?' in url else '?'}cursor={body['next']}")
+                for number, (sql, params, many, _) in enumerate(tracker.queries, 1):
+                    if many or sql.startswith(IGNORED) or pattern(sql) in seen:
+                        continue
+                    seen.add(pattern(sql))
+                    statements[f"GET {url} #{number}"] = (sql, params)
+        return statements
@@ -0,0 +1,75 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from api.caching import invalidation_batch
+from api.models import HealthMetric
+import json
+from datetime import datetime
+
+
+class Command(BaseCommand):
+    help = 'Load multi-metric data from health_metrics.json (parse_health_data.py --metrics)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('json_file', type=str, help='Path to health_metrics.json file')
+        parser.add_argument('--metrics', type=str, default=None,
+                            help='Comma separated metrics to load (default: all in the file)')
+
+    def handle(self, *args, **options):
+        json_file = options['json_file']
+        
+        self.stdout.write(f"📂 Loading data from {json_file}...")
+        
+        try:
+            with open(json_file, 'r') as f:
+                data = json.load(f)
+            
+            if options['metrics']:
+                wanted = options['metrics'].split(',')
+                data = {metric: rows for metric, rows in data.items() if metric in wanted}
+            
+            for metric, rows in data.items():
+                created_count = 0
+                updated_count = 0
+                
+                # Each save invalidates the metric's cached responses; once per metric is enough
+                with invalidation_batch(), transaction.atomic():
+                    for record in rows:
+                        date_obj = datetime.strptime(record['date'], '%Y-%m-%d').date()
+                        
+                        obj, created = HealthMetric.objects.update_or_create(
+                            metric=metric,
+                            date=date_obj,
+                            defaults={
+                                'value': record['value'],
+                                'unit': record.get('unit', '')
+                            }
+                        )
+                        
+                        if created:
+                            created_count += 1
+                        else:
+                            updated_count += 1
+                
+                self.stdout.write(
+                    f"   {metric}: {created_count} created, {updated_count} updated"
+                )
+            
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"\n✅ Successfully imported {len(data)} metrics!\n"
+                    f"   Total: {HealthMetric.objects.count()} records in database"
+                )
+            )
+            
+        except FileNotFoundError:
+            self.stdout.write(
+                self.style.ERROR(f"❌ Error: File not found: {json_file}")
+            )
+        except json.JSONDecodeError as e:
+            self.stdout.write(
+                self.style.ERROR(f"❌ Error: Invalid JSON file: {e}")
+            )
+        except Exception as e:
+            self.stdout.write(
+                self.style.ERROR(f"❌ Error: {e}")
+            )
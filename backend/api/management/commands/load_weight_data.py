@@ -1,14 +1,30 @@
 from django.core.management.base import BaseCommand
-from api.models import HealthWeight
+from django.db import transaction
+from api.caching import invalidate_model, invalidation_batch
+from api.models import HealthWeight, ImportWatermark
+from api.timeseries import refresh_weight_stats
+import hashlib
 import json
 from datetime import datetime
 
 
+WATERMARK_SOURCE = 'health_weight'
+
+
 class Command(BaseCommand):
     help = 'Load weight data from JSON file exported from Apple Health'
 
     def add_arguments(self, parser):
         parser.add_argument('json_file', type=str, help='Path to weight_data.json file')
+        parser.add_argument('--bulk', action='store_true',
+                            help='Upsert in batches with bulk_create inside a single transaction')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Rows per bulk upsert statement (default: 1000)')
+        parser.add_argument('--incremental', action='store_true',
+                            help='Skip files already imported and days before the watermark; '
+                                 'commits per batch so an interrupted run resumes where it stopped')
+        parser.add_argument('--full', action='store_true',
+                            help='With --incremental, ignore and reset the stored watermark')
 
     def handle(self, *args, **options):
         json_file = options['json_file']
@@ -16,35 +32,29 @@ class Command(BaseCommand):
         self.stdout.write(f"📂 Loading data from {json_file}...")
         
         try:
-            with open(json_file, 'r') as f:
-                data = json.load(f)
+            with open(json_file, 'rb') as f:
+                raw = f.read()
+            data = json.loads(raw)
             
             self.stdout.write(f"✅ Found {len(data)} records")
             
-            created_count = 0
-            updated_count = 0
-            
-            for record in data:
-                date_str = record['date']
-                weight = record['weight']
-                unit = record.get('unit', 'kg')
-                
-                # Parse date
-                date_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
-                
-                # Create or update
-                obj, created = HealthWeight.objects.update_or_create(
-                    date=date_obj,
-                    defaults={
-                        'weight': weight,
-                        'unit': unit
-                    }
+            if options['incremental']:
+                fingerprint = hashlib.sha256(raw).hexdigest()
+                created_count, updated_count, earliest_date = self.incremental_upsert(
+                    data, options['batch_size'], fingerprint, options['full']
                 )
-                
-                if created:
-                    created_count += 1
-                else:
-                    updated_count += 1
+            elif options['bulk']:
+                created_count, updated_count, earliest_date = self.bulk_upsert(data, options['batch_size'])
+            else:
+                # Every save invalidates the weight responses; once for the whole file is enough
+                with invalidation_batch():
+                    created_count, updated_count, earliest_date = self.upsert(data)
+            
+            if earliest_date is not None:
+                # bulk_create sends no signals, so drop cached weight responses here
+                invalidate_model(HealthWeight)
+                refreshed = refresh_weight_stats(since=earliest_date)
+                self.stdout.write(f"📈 Refreshed rolling stats for {refreshed} days from {earliest_date}")
             
             self.stdout.write(
                 self.style.SUCCESS(
@@ -67,3 +77,116 @@ class Command(BaseCommand):
             self.stdout.write(
                 self.style.ERROR(f"❌ Error: {e}")
             )
+
+    def upsert(self, data):
+        """Create or update one record at a time"""
+        created_count = 0
+        updated_count = 0
+        earliest_date = None
+        
+        for record in data:
+            date_str = record['date']
+            weight = record['weight']
+            unit = record.get('unit', 'kg')
+            
+            # Parse date
+            date_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
+            if earliest_date is None or date_obj < earliest_date:
+                earliest_date = date_obj
+            
+            # Create or update
+            obj, created = HealthWeight.objects.update_or_create(
+                date=date_obj,
+                defaults={
+                    'weight': weight,
+                    'unit': unit
+                }
+            )
+            
+            if created:
+                created_count += 1
+            else:
+                updated_count += 1
+        
+        return created_count, updated_count, earliest_date
+
+    def build_records(self, data):
+        """Parse records into unsaved HealthWeight objects sorted by date"""
+        # Last record wins when a date appears twice, as with update_or_create
+        records = {}
+        for record in data:
+            date_obj = datetime.strptime(record['date'], '%Y-%m-%d').date()
+            records[date_obj] = HealthWeight(
+                date=date_obj,
+                weight=record['weight'],
+                unit=record.get('unit', 'kg')
+            )
+        return [records[date_obj] for date_obj in sorted(records)]
+
+    def upsert_batch(self, batch):
+        """INSERT ... ON CONFLICT(date) DO UPDATE one batch, returning (created, updated)"""
+        # Only needed for the created/updated report
+        existing = HealthWeight.objects.filter(
+            date__in=[obj.date for obj in batch]
+        ).count()
+        
+        HealthWeight.objects.bulk_create(
+            batch,
+            update_conflicts=True,
+            unique_fields=['date'],
+            update_fields=['weight', 'unit', 'updated_at'],
+        )
+        
+        return len(batch) - existing, existing
+
+    def bulk_upsert(self, data, batch_size):
+        """Upsert in batches, all in one transaction"""
+        records = self.build_records(data)
+        
+        created_count = 0
+        updated_count = 0
+        
+        with transaction.atomic():
+            for start in range(0, len(records), batch_size):
+                created, updated = self.upsert_batch(records[start:start + batch_size])
+                created_count += created
+                updated_count += updated
+        
+        return created_count, updated_count, records[0].date if records else None
+
+    def incremental_upsert(self, data, batch_size, fingerprint, full=False):
+        """Upsert only days at or after the watermark, advancing it with every batch
+
+        The watermark day itself is re-applied because its daily average can change.
+        """
+        watermark, _ = ImportWatermark.objects.get_or_create(source=WATERMARK_SOURCE)
+        
+        if full:
+            watermark.fingerprint = ''
+            watermark.last_date = None
+        elif watermark.fingerprint == fingerprint:
+            self.stdout.write(f"⏭  File already imported (watermark: {watermark.last_date})")
+            return 0, 0, None
+        
+        records = self.build_records(data)
+        if watermark.last_date:
+            records = [obj for obj in records if obj.date >= watermark.last_date]
+            self.stdout.write(f"🔖 Resuming from {watermark.last_date}: {len(records)} records to apply")
+        
+        created_count = 0
+        updated_count = 0
+        
+        for start in range(0, len(records), batch_size):
+            batch = records[start:start + batch_size]
+            with transaction.atomic():
+                created, updated = self.upsert_batch(batch)
+                watermark.last_date = batch[-1].date
+                watermark.save(update_fields=['last_date', 'updated_at'])
+            created_count += created
+            updated_count += updated
+        
+        # The file only counts as imported once every batch is committed
+        watermark.fingerprint = fingerprint
+        watermark.save()
+        
+        return created_count, updated_count, records[0].date if records else None
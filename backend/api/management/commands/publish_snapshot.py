@@ -0,0 +1,36 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from api.snapshot import SNAPSHOT_URLS, encodings, publish
+
+
+class Command(BaseCommand):
+    help = 'Publish the read endpoints as static JSON files with .gz/.br copies and a manifest'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', type=str, default=None,
+                            help=f"Directory to publish into (default: SNAPSHOT_ROOT, {settings.SNAPSHOT_ROOT})")
+        parser.add_argument('--only', type=str, default=None,
+                            help=f"Comma separated namespaces to republish, keeping the rest of the manifest "
+                                 f"({', '.join(SNAPSHOT_URLS)})")
+
+    def handle(self, *args, **options):
+        changes = None
+        if options['only']:
+            namespaces = [name.strip() for name in options['only'].split(',') if name.strip()]
+            unknown = [name for name in namespaces if name not in SNAPSHOT_URLS]
+            if unknown:
+                raise CommandError(f"Unknown namespaces: {', '.join(unknown)} (expected {', '.join(SNAPSHOT_URLS)})")
+            changes = dict.fromkeys(namespaces)
+
+        root = options['output'] or settings.SNAPSHOT_ROOT
+        started = time.perf_counter()
+        counts = publish(root, changes)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Published {counts['urls']} URLs to {root} in {time.perf_counter() - started:.1f} s\n"
+                f"   Written: {counts['written']} new files (json, {', '.join(encodings())})\n"
+                f"   Pruned: {counts['pruned']} unreferenced files"
+            )
+        )
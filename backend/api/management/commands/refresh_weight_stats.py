@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from api.models import HealthWeightStats
+from api.timeseries import refresh_weight_stats
+from datetime import datetime
+
+
+class Command(BaseCommand):
+    help = 'Recompute the rolling weight statistics table from HealthWeight'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', type=str, default=None,
+                            help='Only recompute from this date (YYYY-MM-DD), e.g. after editing a record in admin')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = datetime.strptime(options['since'], '%Y-%m-%d').date()
+        
+        refreshed = refresh_weight_stats(since=since)
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Refreshed {refreshed} days of rolling stats\n"
+                f"   Total: {HealthWeightStats.objects.count()} records in database"
+            )
+        )
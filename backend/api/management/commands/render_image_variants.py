@@ -0,0 +1,52 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from api.images import available_formats, image_models, render_variants, store_width
+
+
+class Command(BaseCommand):
+    help = 'Render resized WebP/AVIF/JPEG variants of uploaded images in parallel'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Worker processes (default: one per CPU)')
+        parser.add_argument('--all', action='store_true',
+                            help='Also re-check images whose variants are already recorded '
+                                 '(only missing or outdated files are re-rendered)')
+
+    def handle(self, *args, **options):
+        jobs = []
+        for model, field in image_models():
+            queryset = model.objects.exclude(**{field: ''}).exclude(**{f"{field}__isnull": True})
+            if not options['all']:
+                queryset = queryset.filter(**{f"{field}_width__isnull": True})
+            jobs += [(model, pk, field, name) for pk, name in queryset.values_list('pk', field)]
+
+        self.stdout.write(f"🖼️  Rendering variants for {len(jobs)} images...")
+
+        root = str(settings.MEDIA_ROOT)
+        widths = settings.IMAGE_VARIANT_WIDTHS
+        formats = available_formats()
+        rendered = missing = 0
+
+        with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+            futures = {
+                executor.submit(render_variants, root, name, widths, formats): (model, pk, field, name)
+                for model, pk, field, name in jobs
+            }
+            for future in as_completed(futures):
+                model, pk, field, name = futures[future]
+                width = future.result()
+                if width is None:
+                    missing += 1
+                    self.stdout.write(self.style.WARNING(f"   ⚠️  {name}: missing or not an image"))
+                    continue
+                store_width(model, pk, field, name, width)
+                rendered += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Rendered variants for {rendered} images ({', '.join(formats)} at {widths} px)\n"
+                f"   Skipped: {missing} missing files"
+            )
+        )
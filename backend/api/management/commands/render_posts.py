@@ -0,0 +1,44 @@
+from concurrent.futures import ProcessPoolExecutor
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from api.caching import invalidate_model
+from api.rendering import RENDER_VERSION, RENDERED_COLUMNS, render_batch, rendered_models
+
+
+class Command(BaseCommand):
+    help = 'Re-render stored HTML, excerpts and reading times in parallel, e.g. after the renderer changes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Worker processes (default: one per CPU)')
+        parser.add_argument('--batch-size', type=int, default=200,
+                            help='Posts per worker task and per UPDATE batch')
+        parser.add_argument('--all', action='store_true',
+                            help=f"Re-render every post, not only those rendered before version {RENDER_VERSION}")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        total = 0
+
+        with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+            for model, field in rendered_models():
+                queryset = model.objects.order_by('pk')
+                if not options['all']:
+                    queryset = queryset.filter(render_version__lt=RENDER_VERSION)
+                rows = list(queryset.values_list('pk', field))
+                batches = [rows[start:start + batch_size] for start in range(0, len(rows), batch_size)]
+
+                self.stdout.write(f"📝 Rendering {len(rows)} {model._meta.verbose_name_plural}...")
+                for results in executor.map(render_batch, batches):
+                    # Responses change with the HTML, so their ETags must too
+                    now = timezone.now()
+                    objs = [model(pk=pk, updated_at=now, **values) for pk, values in results]
+                    with transaction.atomic():
+                        model.objects.bulk_update(objs, RENDERED_COLUMNS + ['updated_at'])
+                    invalidate_model(model, *objs)
+                    total += len(objs)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"✅ Rendered {total} posts with renderer version {RENDER_VERSION}")
+        )
@@ -0,0 +1,122 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+from .storage import is_content_hashed
+
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+CHUNK_SIZE = 64 * 1024
+
+
+def file_etag(stat):
+    """Strong validator from size and mtime: changes whenever the file is rewritten"""
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def parse_range(header, size):
+    """(start, end) inclusive for a single 'bytes=a-b' range, None to send the whole file
+
+    Raises ValueError for a range that starts past the end (416). Multiple
+    ranges are answered with the whole file, which RFC 9110 allows.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        # bytes=-N: the last N bytes
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if start > end and last:
+            return None
+    if start >= size:
+        raise ValueError(header)
+    return start, end
+
+
+def iter_range(path, start, length):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def sendfile_response(name, path, content_type):
+    """Empty response telling the front server to send the file itself"""
+    response = HttpResponse(content_type=content_type)
+    if settings.MEDIA_SENDFILE == 'x-accel-redirect':
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX.rstrip('/') + '/' + name
+    else:
+        response['X-Sendfile'] = path
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """MEDIA_ROOT files with validators, byte ranges and long-lived caching
+
+    Content-hashed names (see HashedFileSystemStorage) are immutable. Other
+    files are cached for MEDIA_MAX_AGE and revalidated with their ETag. With
+    MEDIA_SENDFILE set, the front server streams the bytes and applies any
+    Range itself.
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        stat = os.stat(full_path)
+    except (OSError, ValueError):
+        raise Http404(path)
+    if not os.path.isfile(full_path):
+        raise Http404(path)
+
+    etag = file_etag(stat)
+    last_modified = int(stat.st_mtime)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+    if response is None:
+        content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+        byte_range = None
+        # If-Range: only honour Range when the client still has this version
+        if request.headers.get('Range') and request.headers.get('If-Range', etag) in (etag, http_date(last_modified)):
+            try:
+                byte_range = parse_range(request.headers['Range'], stat.st_size)
+            except ValueError:
+                response = HttpResponse(status=416)
+                response['Content-Range'] = f"bytes */{stat.st_size}"
+                return response
+
+        if settings.MEDIA_SENDFILE:
+            response = sendfile_response(path, full_path, content_type)
+        elif byte_range:
+            start, end = byte_range
+            length = end - start + 1
+            response = StreamingHttpResponse(iter_range(full_path, start, length), status=206, content_type=content_type)
+            response['Content-Range'] = f"bytes {start}-{end}/{stat.st_size}"
+            response['Content-Length'] = str(length)
+        else:
+            response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+        response['Accept-Ranges'] = 'bytes'
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    if is_content_hashed(path):
+        response['Cache-Control'] = IMMUTABLE
+    else:
+        response['Cache-Control'] = f"public, max-age={settings.MEDIA_MAX_AGE}"
+    return response
@@ -0,0 +1,180 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.crypto import constant_time_compare
+from ninja.errors import HttpError
+
+
+# Latency histogram bucket bounds, in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_lock = threading.Lock()
+_requests = Counter()  # (route, method, status) -> requests
+_buckets = {}  # (route, method) -> per-bucket counts, the last one +Inf
+_durations = Counter()  # (route, method) -> seconds
+_queries = Counter()  # (route, method) -> queries
+_query_seconds = Counter()
+_response_bytes = Counter()
+
+# [queries, seconds] of the request being handled; shared with the async ORM's
+# thread, since sync_to_async copies the context
+_current = ContextVar('api_metrics_current', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper counting and timing queries made while a request is measured"""
+    current = _current.get()
+    if current is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        current[0] += 1
+        current[1] += time.perf_counter() - started
+
+
+def instrument_connection(sender, connection, **kwargs):
+    """connection_created: time every query on the connection with record_query"""
+    connection.execute_wrappers.append(record_query)
+
+
+def observe(route, method, status, seconds, queries, query_seconds, size):
+    key = (route, method)
+    with _lock:
+        _requests[(route, method, status)] += 1
+        counts = _buckets.setdefault(key, [0] * (len(BUCKETS) + 1))
+        counts[bisect_left(BUCKETS, seconds)] += 1
+        _durations[key] += seconds
+        _queries[key] += queries
+        _query_seconds[key] += query_seconds
+        if size is not None:
+            _response_bytes[key] += size
+
+
+def _labels(**labels):
+    return ','.join(f'{name}="{value}"' for name, value in labels.items())
+
+
+def render_metrics():
+    """This process's counters in the Prometheus text exposition format"""
+    lines = []
+
+    def metric(name, kind, help_text):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    with _lock:
+        metric('api_requests_total', 'counter', 'Requests by route, method and status.')
+        for (route, method, status), count in sorted(_requests.items()):
+            lines.append(f"api_requests_total{{{_labels(route=route, method=method, status=status)}}} {count}")
+
+        metric('api_request_duration_seconds', 'histogram', 'Time from middleware entry to response.')
+        for (route, method), counts in sorted(_buckets.items()):
+            labels = _labels(route=route, method=method)
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ('+Inf',), counts):
+                cumulative += count
+                lines.append(f'api_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"api_request_duration_seconds_sum{{{labels}}} {_durations[(route, method)]:.6f}")
+            lines.append(f"api_request_duration_seconds_count{{{labels}}} {cumulative}")
+
+        for name, counter, help_text in (
+            ('api_db_queries_total', _queries, 'Database queries run while handling requests.'),
+            ('api_db_query_seconds_total', _query_seconds, 'Time spent in database queries.'),
+            ('api_response_bytes_total', _response_bytes, 'Response body bytes, except streamed responses.'),
+        ):
+            metric(name, 'counter', help_text)
+            for (route, method), value in sorted(counter.items()):
+                value = f"{value:.6f}" if isinstance(value, float) else value
+                lines.append(f"{name}{{{_labels(route=route, method=method)}}} {value}")
+
+    return '\n'.join(lines) + '\n'
+
+
+def reset_metrics():
+    with _lock:
+        for counter in (_requests, _buckets, _durations, _queries, _query_seconds, _response_bytes):
+            counter.clear()
+
+
+def operator_only(view):
+    """Serve view to staff users and to requests sending API_METRICS_TOKEN
+
+    Scrapers send the token as `Authorization: Bearer <token>`. Without a
+    token configured, only logged-in staff get through.
+    """
+    @wraps(view)
+    def inner(request, *args, **kwargs):
+        token = settings.API_METRICS_TOKEN
+        scheme, _, sent = request.headers.get('Authorization', '').partition(' ')
+        user = getattr(request, 'user', None)
+        if not (token and scheme == 'Bearer' and constant_time_compare(sent, token)) and not (user and user.is_staff):
+            raise HttpError(403, "Metrics are for staff or requests with the metrics token")
+        return view(request, *args, **kwargs)
+
+    return inner
+
+
+class RequestMetricsMiddleware:
+    """Per-route latency, query count/time, response size and status, plus a Server-Timing header
+
+    Routes are labelled by their URL pattern (api/blog/<int:post_id>), so
+    label cardinality stays fixed. Costs a few microseconds per request and
+    per query. Counters are per process: scrape each worker, or sum them.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if not settings.API_METRICS_ENABLED:
+            return self.get_response(request)
+        if self.is_async:
+            return self.__acall__(request)
+        current, token, started = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, current, started)
+
+    async def __acall__(self, request):
+        current, token, started = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, current, started)
+
+    @staticmethod
+    def start():
+        current = [0, 0.0]
+        return current, _current.set(current), time.perf_counter()
+
+    @staticmethod
+    def finish(request, response, current, started):
+        elapsed = time.perf_counter() - started
+        queries, query_seconds = current
+        match = request.resolver_match
+        route = match.route if match is not None else 'unmatched'
+        size = None if response.streaming else len(response.content)
+        observe(route, request.method, response.status_code, elapsed, queries, query_seconds, size)
+        response['Server-Timing'] = (
+            f'app;dur={elapsed * 1000:.1f}, db;dur={query_seconds * 1000:.1f};desc="{queries} queries"'
+        )
+        return response
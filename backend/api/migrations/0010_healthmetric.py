@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_workexperience_logo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HealthMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=50)),
+                ('date', models.DateField()),
+                ('value', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('unit', models.CharField(blank=True, max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Health Metric Record',
+                'verbose_name_plural': 'Health Metric Records',
+                'ordering': ['metric', 'date'],
+                'unique_together': {('metric', 'date')},
+            },
+        ),
+    ]
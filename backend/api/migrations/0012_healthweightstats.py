@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_importwatermark'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HealthWeightStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('weight', models.FloatField()),
+                ('ma_7', models.FloatField()),
+                ('ma_30', models.FloatField()),
+                ('rate_of_change', models.FloatField(blank=True, null=True)),
+                ('running_min', models.FloatField()),
+                ('running_max', models.FloatField()),
+                ('unit', models.CharField(default='kg', max_length=10)),
+            ],
+            options={
+                'verbose_name': 'Health Weight Stats',
+                'verbose_name_plural': 'Health Weight Stats',
+                'ordering': ['date'],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+from django.db import migrations
+
+
+# table -> indexed columns; kept here rather than imported so the migration stays frozen
+INDEXES = {
+    'api_blogpost': ['title', 'content'],
+    'api_projects': ['name', 'description', 'languages'],
+    'api_novels': ['title', 'author', 'description'],
+    'api_shortstories': ['title', 'author', 'description'],
+    'api_workexperience': ['company', 'position', 'description'],
+}
+
+
+def create_sql(table, columns):
+    fts = f"{table}_fts"
+    names = ', '.join(columns)
+    new = ', '.join(f"new.{column}" for column in columns)
+    old = ', '.join(f"old.{column}" for column in columns)
+    delete = f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old});"
+    insert = f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new});"
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({names}, content='{table}', content_rowid='id', "
+        f"tokenize='porter unicode61 remove_diacritics 2');",
+        f"CREATE TRIGGER {fts}_insert AFTER INSERT ON {table} BEGIN {insert} END;",
+        f"CREATE TRIGGER {fts}_delete AFTER DELETE ON {table} BEGIN {delete} END;",
+        f"CREATE TRIGGER {fts}_update AFTER UPDATE OF {names} ON {table} BEGIN {delete} {insert} END;",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild');",
+    ]
+
+
+def drop_sql(table):
+    fts = f"{table}_fts"
+    return [f"DROP TRIGGER IF EXISTS {fts}_{event};" for event in ('insert', 'delete', 'update')] + [
+        f"DROP TABLE IF EXISTS {fts};",
+    ]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunSQL(create_sql(table, columns), reverse_sql=drop_sql(table))
+        for table, columns in INDEXES.items()
+    ]
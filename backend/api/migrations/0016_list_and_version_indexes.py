@@ -0,0 +1,69 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_image_widths'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['-created_at', 'id'], name='blogpost_created_at_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['updated_at'], name='blogpost_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='healthmetric',
+            index=models.Index(fields=['updated_at'], name='healthmetric_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='healthmetric',
+            index=models.Index(fields=['metric', 'updated_at'], name='healthme_metric_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='healthweight',
+            index=models.Index(fields=['updated_at'], name='healthweight_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='healthweightstats',
+            index=models.Index(fields=['updated_at'], name='healthweightsta_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='novels',
+            index=models.Index(fields=['title', 'id'], name='novels_title_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='novels',
+            index=models.Index(fields=['updated_at'], name='novels_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projects',
+            index=models.Index(fields=['-created_at', 'id'], name='projects_created_at_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projects',
+            index=models.Index(fields=['updated_at'], name='projects_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shortstories',
+            index=models.Index(fields=['title', 'id'], name='shortstories_title_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shortstories',
+            index=models.Index(fields=['updated_at'], name='shortstories_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workexperience',
+            index=models.Index(fields=['-start_date', 'id'], name='workexperien_start_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workexperience',
+            index=models.Index(fields=['updated_at'], name='workexperience_updated_at_idx'),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:26
+
+import math
+import re
+
+from django.db import migrations, models
+from django.utils.html import linebreaks, urlize
+
+
+def excerpt(text, length=280):
+    text = ' '.join(text.split())
+    if len(text) <= length:
+        return text
+    cut = text[:length].rsplit(' ', 1)[0] if ' ' in text[:length] else text[:length - 1]
+    return cut.rstrip('.,;:!?-–— ') + '…'
+
+
+def render(text):
+    """A frozen copy of api.rendering.render at RENDER_VERSION 1; later versions
+    are picked up by manage.py render_posts through render_version"""
+    text = re.sub(r'\r\n?', '\n', text or '').strip()
+    words = len(text.split())
+    return {
+        'content_html': linebreaks(urlize(text, nofollow=True, autoescape=True)),
+        'excerpt': excerpt(text),
+        'word_count': words,
+        'reading_time': math.ceil(words / 200),
+        'render_version': 1,
+    }
+
+
+def render_posts(apps, schema_editor):
+    BlogPost = apps.get_model('api', 'BlogPost')
+    posts = list(BlogPost.objects.only('pk', 'content'))
+    for post in posts:
+        for name, value in render(post.content).items():
+            setattr(post, name, value)
+    BlogPost.objects.bulk_update(posts, ['content_html', 'excerpt', 'word_count', 'reading_time', 'render_version'],
+                                 batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_list_and_version_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='content_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='reading_time',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='render_version',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(render_posts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+from collections import deque
+from datetime import timedelta
+
+from django.db import migrations
+
+
+def mean_of_last(days):
+    """Rolling mean of the readings within the last `days` calendar days; a frozen
+    copy of api.timeseries.RollingWindow as of this migration"""
+    readings = deque()
+    total = 0.0
+
+    def push(day, weight):
+        nonlocal total
+        readings.append((day, weight))
+        total += weight
+        while readings[0][0] <= day - timedelta(days=days):
+            total -= readings.popleft()[1]
+        return total / len(readings)
+
+    return push
+
+
+def backfill_weight_stats(apps, schema_editor):
+    # Databases that already had weights before 0012 have an empty stats table
+    HealthWeight = apps.get_model('api', 'HealthWeight')
+    HealthWeightStats = apps.get_model('api', 'HealthWeightStats')
+    if HealthWeightStats.objects.exists():
+        return
+
+    week, month = mean_of_last(7), mean_of_last(30)
+    running_min = running_max = last_date = last_weight = None
+    rows = []
+    for day, weight, unit in HealthWeight.objects.order_by('date').values_list('date', 'weight', 'unit').iterator():
+        weight = float(weight)
+        running_min = weight if running_min is None else min(running_min, weight)
+        running_max = weight if running_max is None else max(running_max, weight)
+        rate = None if last_date is None else round((weight - last_weight) / (day - last_date).days, 4)
+        last_date, last_weight = day, weight
+        rows.append(HealthWeightStats(
+            date=day,
+            weight=weight,
+            ma_7=round(week(day, weight), 3),
+            ma_30=round(month(day, weight), 3),
+            rate_of_change=rate,
+            running_min=running_min,
+            running_max=running_max,
+            unit=unit,
+        ))
+    HealthWeightStats.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_blogpost_rendered_content'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_weight_stats, migrations.RunPython.noop),
+    ]
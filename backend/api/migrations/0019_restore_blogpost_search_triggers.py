@@ -0,0 +1,39 @@
+from django.db import migrations
+
+
+# 0017's AddFields rebuilt api_blogpost, and SQLite drops a table's triggers
+# with it. Same SQL as 0014, kept here so the migration stays frozen.
+TABLE = 'api_blogpost'
+COLUMNS = ['title', 'content']
+
+
+def create_sql(table, columns):
+    fts = f"{table}_fts"
+    names = ', '.join(columns)
+    new = ', '.join(f"new.{column}" for column in columns)
+    old = ', '.join(f"old.{column}" for column in columns)
+    delete = f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old});"
+    insert = f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new});"
+    return drop_sql(table) + [
+        f"CREATE TRIGGER {fts}_insert AFTER INSERT ON {table} BEGIN {insert} END;",
+        f"CREATE TRIGGER {fts}_delete AFTER DELETE ON {table} BEGIN {delete} END;",
+        f"CREATE TRIGGER {fts}_update AFTER UPDATE OF {names} ON {table} BEGIN {delete} {insert} END;",
+        # Posts written since the rebuild aren't in the index yet
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild');",
+    ]
+
+
+def drop_sql(table):
+    fts = f"{table}_fts"
+    return [f"DROP TRIGGER IF EXISTS {fts}_{event};" for event in ('insert', 'delete', 'update')]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_backfill_weight_stats'),
+    ]
+
+    operations = [
+        migrations.RunSQL(create_sql(TABLE, COLUMNS), reverse_sql=migrations.RunSQL.noop),
+    ]
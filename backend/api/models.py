@@ -1,18 +1,39 @@
 from django.db import models
 from django.conf import settings
 
+from .rendering import RENDERED_COLUMNS
+
 
 class BlogPost(models.Model):
     title = models.CharField(max_length=200) 
     content = models.TextField()
     image = models.ImageField(upload_to='blog_images/', blank=True, null=True)
+    image_width = models.PositiveIntegerField(blank=True, null=True, editable=False)  # set once variants exist
+    # Rendered from content on every write (see api.rendering)
+    content_html = models.TextField(blank=True, editable=False)
+    excerpt = models.TextField(blank=True, editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_time = models.PositiveIntegerField(default=0, editable=False)  # minutes
+    render_version = models.PositiveSmallIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        # render_text (pre_save) re-renders content; a save limited to it must write the rendering too
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'content' in update_fields:
+            kwargs['update_fields'] = {*update_fields, *RENDERED_COLUMNS}
+        super().save(*args, **kwargs)
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', 'id'], name='blogpost_created_at_id_idx'),
+            models.Index(fields=['updated_at'], name='blogpost_updated_at_idx'),
+        ]
 
 
 class HealthWeight(models.Model):
@@ -20,66 +41,144 @@ class HealthWeight(models.Model):
     weight = models.DecimalField(max_digits=5, decimal_places=2)  # e.g., 123.45 kg
     unit = models.CharField(max_length=10, default='kg')  # kg or lb
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"{self.date}: {self.weight} {self.unit}"
     
     class Meta:
         ordering = ['date']
+        indexes = [models.Index(fields=['updated_at'], name='healthweight_updated_at_idx')]
         verbose_name = "Health Weight Record"
         verbose_name_plural = "Health Weight Records"
 
+
+class HealthWeightStats(models.Model):
+    date = models.DateField(unique=True)
+    weight = models.FloatField()
+    ma_7 = models.FloatField()  # mean of readings in the 7 days ending on date
+    ma_30 = models.FloatField()  # mean of readings in the 30 days ending on date
+    rate_of_change = models.FloatField(blank=True, null=True)  # per day since the previous reading
+    running_min = models.FloatField()
+    running_max = models.FloatField()
+    unit = models.CharField(max_length=10, default='kg')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.date}: {self.ma_7:.2f} (7d) {self.ma_30:.2f} (30d) {self.unit}"
+
+    class Meta:
+        ordering = ['date']
+        indexes = [models.Index(fields=['updated_at'], name='healthweightsta_updated_at_idx')]
+        verbose_name = "Health Weight Stats"
+        verbose_name_plural = "Health Weight Stats"
+
+
+class HealthMetric(models.Model):
+    metric = models.CharField(max_length=50)  # extractor name, e.g. steps, resting_heart_rate
+    date = models.DateField()
+    value = models.DecimalField(max_digits=10, decimal_places=2)
+    unit = models.CharField(max_length=20, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.metric} {self.date}: {self.value} {self.unit}"
+
+    class Meta:
+        ordering = ['metric', 'date']
+        unique_together = ['metric', 'date']
+        indexes = [
+            models.Index(fields=['updated_at'], name='healthmetric_updated_at_idx'),
+            models.Index(fields=['metric', 'updated_at'], name='healthme_metric_updated_at_idx'),
+        ]
+        verbose_name = "Health Metric Record"
+        verbose_name_plural = "Health Metric Records"
+
+class ImportWatermark(models.Model):
+    source = models.CharField(max_length=50, unique=True)  # e.g. health_weight
+    fingerprint = models.CharField(max_length=64, blank=True)  # last fully imported file
+    last_date = models.DateField(blank=True, null=True)  # newest date committed so far
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.source}: {self.last_date}"
+
 class Projects(models.Model):
     name = models.CharField(max_length=200)
     description = models.TextField()
     languages = models.CharField(max_length=200, blank=True)
     link = models.URLField(blank=True, null=True)
     image = models.ImageField(upload_to='project_images/', blank=True, null=True)
+    image_width = models.PositiveIntegerField(blank=True, null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', 'id'], name='projects_created_at_id_idx'),
+            models.Index(fields=['updated_at'], name='projects_updated_at_idx'),
+        ]
 
 class Novels(models.Model):
     title = models.CharField(max_length=200)
     author = models.CharField(max_length=100)
     description = models.TextField(blank=True)
     cover_image = models.ImageField(upload_to='novel_covers/', blank=True, null=True)
+    cover_image_width = models.PositiveIntegerField(blank=True, null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.title
 
     class Meta:
-        ordering = ['title']    
+        ordering = ['title']
+        indexes = [
+            models.Index(fields=['title', 'id'], name='novels_title_id_idx'),
+            models.Index(fields=['updated_at'], name='novels_updated_at_idx'),
+        ]
 
 class ShortStories(models.Model):
     title = models.CharField(max_length=200)
     author = models.CharField(max_length=100)
     description = models.TextField(blank=True)
     cover_image = models.ImageField(upload_to='short_story_covers/', blank=True, null=True)
+    cover_image_width = models.PositiveIntegerField(blank=True, null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.title
 
     class Meta:
-        ordering = ['title']    
+        ordering = ['title']
+        indexes = [
+            models.Index(fields=['title', 'id'], name='shortstories_title_id_idx'),
+            models.Index(fields=['updated_at'], name='shortstories_updated_at_idx'),
+        ]
 
 class WorkExperience(models.Model):
     company = models.CharField(max_length=200)
     logo = models.ImageField(upload_to='company_logos/', blank=True, null=True)
+    logo_width = models.PositiveIntegerField(blank=True, null=True, editable=False)
     position = models.CharField(max_length=100)
     start_date = models.DateField()
     end_date = models.DateField(blank=True, null=True)  # null means currently working
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.position} at {self.company}"
 
     class Meta:
-        ordering = ['-start_date']
\ No newline at end of file
+        ordering = ['-start_date']
+        indexes = [
+            models.Index(fields=['-start_date', 'id'], name='workexperien_start_date_id_idx'),
+            models.Index(fields=['updated_at'], name='workexperience_updated_at_idx'),
+        ]
\ No newline at end of file
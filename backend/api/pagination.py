@@ -0,0 +1,140 @@
+import base64
+import json
+from typing import Any, List, Optional
+
+from django.db.models import Q, QuerySet
+from ninja import Field, Schema
+from ninja.errors import HttpError
+from ninja.pagination import AsyncPaginationBase
+from pydantic import field_validator
+
+
+def encode_cursor(values, direction):
+    """Opaque, URL-safe cursor holding the ordering values of a boundary row"""
+    payload = json.dumps({'v': values, 'd': direction}, separators=(',', ':'), default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values, direction = payload['v'], payload['d']
+    except (ValueError, KeyError, TypeError):
+        raise HttpError(400, "Invalid cursor")
+    if not isinstance(values, list) or direction not in ('next', 'prev'):
+        raise HttpError(400, "Invalid cursor")
+    return values, direction
+
+
+def keyset_ordering(queryset):
+    """(field, descending) pairs from the queryset/Meta ordering, ending on a unique field"""
+    model = queryset.model
+    ordering = list(queryset.query.order_by or model._meta.ordering or [])
+    keys = [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+
+    last_field = model._meta.get_field(keys[-1][0]) if keys else None
+    if last_field is None or not (last_field.primary_key or last_field.unique):
+        keys.append(('id', False))
+    return keys
+
+
+def keyset_filter(keys, values, reverse=False):
+    """Rows strictly after values in (field, descending) order, or before them if reverse
+
+    (a, b) > (x, y) expands to a >= x AND (a > x OR (a = x AND b > y)), with < for
+    descending fields. The redundant a >= x lets SQLite seek an index on the
+    ordering; with only the OR it walks the index from the first row.
+    """
+    condition = Q()
+    equal = Q()
+    for (field, descending), value in zip(keys, values):
+        after = descending == reverse
+        condition |= equal & Q(**{f"{field}__{'gt' if after else 'lt'}": value})
+        equal &= Q(**{field: value})
+    if len(keys) > 1:
+        (field, descending), value = keys[0], values[0]
+        condition &= Q(**{f"{field}__{'gte' if descending == reverse else 'lte'}": value})
+    return condition
+
+
+class KeysetPagination(AsyncPaginationBase):
+    """Cursor pagination on each model's ordering; deep pages cost O(limit), not O(offset)"""
+
+    class Input(Schema):
+        limit: Optional[int] = Field(None, ge=1)
+        cursor: Optional[str] = None
+
+        @field_validator('cursor')
+        @classmethod
+        def check_cursor(cls, cursor):
+            # With the other parameters, so a bad cursor is a 400 before any query
+            if cursor is not None:
+                decode_cursor(cursor)
+            return cursor
+
+    class Output(Schema):
+        items: List[Any]
+        next: Optional[str]
+        previous: Optional[str]
+
+    def __init__(self, default_limit=100, max_limit=1000, **kwargs):
+        self.default_limit = default_limit
+        self.max_limit = max_limit
+        super().__init__(**kwargs)
+
+    def paginate_queryset(self, queryset, pagination, **params):
+        if not isinstance(queryset, QuerySet):
+            # Already reduced (e.g. downsampled) results come back as a single page
+            return {'items': queryset, 'next': None, 'previous': None}
+
+        page_query, keys, reverse, limit = self._page_query(queryset, pagination)
+        return self._page(list(page_query), keys, reverse, limit, pagination)
+
+    async def apaginate_queryset(self, queryset, pagination, **params):
+        if not isinstance(queryset, QuerySet):
+            return {'items': queryset, 'next': None, 'previous': None}
+
+        page_query, keys, reverse, limit = self._page_query(queryset, pagination)
+        return self._page([row async for row in page_query], keys, reverse, limit, pagination)
+
+    def _page_query(self, queryset, pagination):
+        """The slice holding the page plus one row (to tell if there is more), and how to read it"""
+        limit = min(pagination.limit or self.default_limit, self.max_limit)
+        keys = keyset_ordering(queryset)
+        order_by = [f"{'-' if descending else ''}{field}" for field, descending in keys]
+        reverse = False
+
+        if pagination.cursor:
+            values, direction = decode_cursor(pagination.cursor)
+            if len(values) != len(keys):
+                raise HttpError(400, "Invalid cursor")
+            reverse = direction == 'prev'
+            queryset = queryset.filter(keyset_filter(keys, values, reverse))
+
+        if reverse:
+            order_by = [name[1:] if name.startswith('-') else f"-{name}" for name in order_by]
+
+        return queryset.order_by(*order_by)[:limit + 1], keys, reverse, limit
+
+    def _page(self, rows, keys, reverse, limit, pagination):
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if reverse:
+            rows.reverse()
+
+        def cursor_for(row, direction):
+            return encode_cursor([self._value(row, field) for field, _ in keys], direction)
+
+        has_next = has_more if not reverse else True
+        has_previous = bool(pagination.cursor) if not reverse else has_more
+
+        return {
+            'items': rows,
+            'next': cursor_for(rows[-1], 'next') if rows and has_next else None,
+            'previous': cursor_for(rows[0], 'prev') if rows and has_previous else None,
+        }
+
+    @staticmethod
+    def _value(row, field):
+        return row[field] if isinstance(row, dict) else getattr(row, field)
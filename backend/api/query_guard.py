@@ -0,0 +1,198 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connection
+
+
+logger = logging.getLogger(__name__)
+
+# IN (%s, %s, %s) -> IN (...), so batches of different sizes count as one pattern
+PLACEHOLDER_LIST_RE = re.compile(r'\((?:%s, )+%s\)')
+
+# "SCAN api_blogpost", "SCAN TABLE api_blogpost" (SQLite before 3.36) and
+# "SCAN api_blogpost USING INDEX ...", which reads every row in index order
+FULL_SCAN_RE = re.compile(r'^SCAN (?:TABLE )?(\w+)(?:\s|$)')
+
+# ...except a covering index, which never reads the table, a virtual table
+# (the search index answers MATCH itself) and scans of things that aren't tables
+NOT_FULL_SCAN_RE = re.compile(r'USING COVERING INDEX|VIRTUAL TABLE|^SCAN (?:CONSTANT ROW|SUBQUERY)')
+
+# A statement ending in LIMIT stops an index-order scan after that many rows
+# (the first keyset page); a plain SCAN may still sort every row first
+LIMIT_RE = re.compile(r'\sLIMIT \d+(?: OFFSET \d+)?$')
+
+EXPLAINABLE = ('SELECT', 'UPDATE', 'DELETE')
+
+# Transaction and connection housekeeping, never an access pattern
+IGNORED = ('SAVEPOINT', 'RELEASE', 'ROLLBACK', 'BEGIN', 'COMMIT', 'PRAGMA', 'EXPLAIN')
+
+_tracker = ContextVar('api_query_guard_tracker', default=None)
+
+# pattern -> tables it scans; plans don't change while the process runs
+_plans = {}
+
+
+def pattern(sql):
+    return PLACEHOLDER_LIST_RE.sub('(...)', sql)
+
+
+def shorten(sql, length=200):
+    return sql if len(sql) <= length else sql[:length] + '…'
+
+
+class QueryTracker:
+    """The queries run while it is current, with their timings"""
+
+    def __init__(self):
+        self.queries = []  # (sql, params, many, seconds)
+
+    def __len__(self):
+        return len(self.queries)
+
+    def repeated(self, threshold):
+        """(pattern, count) for statements run at least threshold times: an N+1 loop"""
+        counts = Counter(pattern(sql) for sql, _, _, _ in self.queries if not sql.startswith(IGNORED))
+        return [(sql, count) for sql, count in counts.most_common() if count >= threshold]
+
+    def slow(self, threshold_ms):
+        return [(sql, seconds * 1000) for sql, _, _, seconds in self.queries if seconds * 1000 >= threshold_ms]
+
+    def full_scans(self):
+        """(table, sql) for each distinct statement whose plan scans a whole table"""
+        found, seen = [], set()
+        for sql, params, many, _ in self.queries:
+            key = pattern(sql)
+            if many or key in seen or not sql.lstrip().upper().startswith(EXPLAINABLE):
+                continue
+            seen.add(key)
+            if key not in _plans:
+                _plans[key] = explain_scans(sql, params)
+            found += [(table, sql) for table in _plans[key]]
+        return found
+
+    def problems(self, repeats=None, slow_ms=None, scans=True):
+        repeats = repeats or settings.API_QUERY_GUARD_REPEATS
+        slow_ms = slow_ms or settings.API_QUERY_GUARD_SLOW_MS
+        problems = [f"N+1: {count}x {shorten(sql)}" for sql, count in self.repeated(repeats)]
+        problems += [f"slow query ({ms:.0f} ms): {shorten(sql)}" for sql, ms in self.slow(slow_ms)]
+        if scans:
+            problems += [f"full scan of {table}: {shorten(sql)}" for table, sql in self.full_scans()]
+        return problems
+
+
+def explain_scans(sql, params):
+    """Tables EXPLAIN QUERY PLAN says the statement reads in full (SQLite only)"""
+    if connection.vendor != 'sqlite':
+        return []
+    token = _tracker.set(None)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            details = [row[-1] for row in cursor.fetchall()]
+    except Exception:
+        logger.debug("Could not explain %s", sql, exc_info=True)
+        return []
+    finally:
+        _tracker.reset(token)
+    limited = LIMIT_RE.search(sql.rstrip()) is not None
+    return [table for table in (scanned_table(detail, limited) for detail in details) if table]
+
+
+def scanned_table(detail, limited=False):
+    """The table an EXPLAIN QUERY PLAN line reads in full, or None; limited if the statement has a LIMIT"""
+    match = FULL_SCAN_RE.match(detail)
+    if match is None or NOT_FULL_SCAN_RE.search(detail) or (limited and ' USING INDEX ' in detail):
+        return None
+    return match.group(1)
+
+
+def track_query(execute, sql, params, many, context):
+    """Execute wrapper recording into the current QueryTracker, if any"""
+    tracker = _tracker.get()
+    if tracker is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        tracker.queries.append((sql, params, many, time.perf_counter() - started))
+
+
+def instrument_connection(sender, connection, **kwargs):
+    """connection_created: route the connection's queries through track_query"""
+    connection.execute_wrappers.append(track_query)
+
+
+@contextmanager
+def tracking():
+    """A QueryTracker for the block, whether or not the guard is on for requests"""
+    tracker = QueryTracker()
+    token = _tracker.set(tracker)
+    try:
+        if track_query in connection.execute_wrappers:
+            yield tracker
+        else:
+            with connection.execute_wrapper(track_query):
+                yield tracker
+    finally:
+        _tracker.reset(token)
+
+
+class QueryGuardMiddleware:
+    """Development aid: logs N+1 patterns, slow queries and full table scans of API requests
+
+    On with settings.API_QUERY_GUARD (default: DEBUG). Each distinct
+    statement is explained once per process; problems are logged as
+    warnings on the api.query_guard logger.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        from .api import api
+
+        self.namespace = api.urls_namespace
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        # Off, or inside tracking(), whose owner does the checking
+        if not settings.API_QUERY_GUARD or _tracker.get() is not None:
+            return self.get_response(request)
+        if self.is_async:
+            return self.__acall__(request)
+        tracker = QueryTracker()
+        token = _tracker.set(tracker)
+        try:
+            response = self.get_response(request)
+        finally:
+            _tracker.reset(token)
+        self.report(request, tracker)
+        return response
+
+    async def __acall__(self, request):
+        tracker = QueryTracker()
+        token = _tracker.set(tracker)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _tracker.reset(token)
+        # EXPLAIN goes through the sync ORM: leave it to the sync middleware
+        self.report(request, tracker, scans=False)
+        return response
+
+    def report(self, request, tracker, scans=True):
+        match = request.resolver_match
+        if match is None or self.namespace not in match.namespaces:
+            return
+        for problem in tracker.problems(scans=scans):
+            logger.warning("%s %s: %s", request.method, request.path, problem)
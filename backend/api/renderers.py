@@ -0,0 +1,72 @@
+import json
+from decimal import Decimal
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db.models import QuerySet
+from django.http import HttpResponse
+from ninja.renderers import JSONRenderer
+from ninja.responses import NinjaJSONEncoder
+
+try:
+    import orjson
+except ImportError:  # optional: without it responses use the stdlib encoder
+    orjson = None
+
+
+_encoder = NinjaJSONEncoder()
+
+
+def dumps(data, default=_encoder.default):
+    """JSON bytes via orjson when installed, else json.dumps with the same fallbacks
+
+    orjson writes dates, datetimes (UTC as Z, with microseconds), UUIDs and
+    dataclasses itself and hands everything else to default.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=default, option=orjson.OPT_UTC_Z)
+    return json.dumps(data, cls=NinjaJSONEncoder, default=default).encode()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """Ninja's JSON renderer on orjson, which encodes large lists several times faster"""
+
+    def render(self, request, data, *, response_status):
+        return dumps(data)
+
+
+def trusted_default(value):
+    # Decimal columns come out as floats, as the schemas' float fields would
+    if isinstance(value, Decimal):
+        return float(value)
+    return _encoder.default(value)
+
+
+def trusted_response(result):
+    if isinstance(result, QuerySet):
+        result = list(result)
+    return HttpResponse(dumps(result, default=trusted_default), content_type='application/json')
+
+
+def trusted_output(view):
+    """Render the view's .values() rows as they are, skipping response schema validation
+
+    Only on with settings.API_TRUSTED_OUTPUT, and only for views whose rows
+    already have the schema's shape: plain columns, no resolvers, aliases or
+    excluded fields. Goes above @paginate so whole pages are rendered.
+    """
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def ainner(request, *args, **kwargs):
+            result = await view(request, *args, **kwargs)
+            return trusted_response(result) if settings.API_TRUSTED_OUTPUT else result
+
+        return ainner
+
+    @wraps(view)
+    def inner(request, *args, **kwargs):
+        result = view(request, *args, **kwargs)
+        return trusted_response(result) if settings.API_TRUSTED_OUTPUT else result
+
+    return inner
@@ -0,0 +1,81 @@
+"""
+Render-on-write: blog text is formatted once, when it's saved
+
+Posts keep the author's plain text in content. Every write also stores its
+HTML (paragraphs, line breaks, links), a plain-text excerpt for list pages,
+the word count and the reading time. Saves render through a pre_save
+signal; API writes that skip save() call rendered_values/render_instance.
+"""
+
+import math
+import re
+
+from django.utils.html import linebreaks, urlize
+
+
+# Bump when render()'s output changes; render_posts re-renders rows stored by older versions
+RENDER_VERSION = 1
+
+# model label -> text field rendered into RENDERED_COLUMNS
+RENDERED_FIELDS = {
+    'api.BlogPost': 'content',
+}
+
+RENDERED_COLUMNS = ['content_html', 'excerpt', 'word_count', 'reading_time', 'render_version']
+
+EXCERPT_LENGTH = 280
+
+WORDS_PER_MINUTE = 200
+
+
+def excerpt(text, length=EXCERPT_LENGTH):
+    """The opening of text on one line, cut at a word and ending in … when shortened"""
+    text = ' '.join(text.split())
+    if len(text) <= length:
+        return text
+    cut = text[:length].rsplit(' ', 1)[0] if ' ' in text[:length] else text[:length - 1]
+    return cut.rstrip('.,;:!?-–— ') + '…'
+
+
+def render(text):
+    """The RENDERED_COLUMNS values for text
+
+    Blank lines separate paragraphs, single newlines become <br>, URLs become
+    links and everything else is escaped. No Django settings are needed, so
+    it runs in render_posts' worker processes.
+    """
+    text = re.sub(r'\r\n?', '\n', text or '').strip()
+    words = len(text.split())
+    return {
+        'content_html': linebreaks(urlize(text, nofollow=True, autoescape=True)),
+        'excerpt': excerpt(text),
+        'word_count': words,
+        'reading_time': math.ceil(words / WORDS_PER_MINUTE),
+        'render_version': RENDER_VERSION,
+    }
+
+
+def render_batch(rows):
+    """[(pk, render(text))] for (pk, text) rows; runs in a worker process"""
+    return [(pk, render(text)) for pk, text in rows]
+
+
+def rendered_models():
+    """(model, text field) for each model that stores a rendering"""
+    from django.apps import apps
+
+    return [(apps.get_model(label), field) for label, field in RENDERED_FIELDS.items()]
+
+
+def rendered_values(model, values):
+    """The rendered columns to write alongside values, if they set the model's text field"""
+    field = RENDERED_FIELDS.get(model._meta.label)
+    return render(values[field]) if field in values else {}
+
+
+def render_instance(instance):
+    """Render an unsaved or changed instance in place, for bulk_create/bulk_update"""
+    field = RENDERED_FIELDS.get(instance._meta.label)
+    if field:
+        for name, value in render(getattr(instance, field)).items():
+            setattr(instance, name, value)
@@ -0,0 +1,118 @@
+import html
+import re
+from dataclasses import dataclass
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+from .models import BlogPost, Novels, Projects, ShortStories, WorkExperience
+
+
+@dataclass(frozen=True)
+class SearchIndex:
+    """An external-content FTS5 table over some text columns of a model
+
+    The table and its sync triggers are created in migration 0014; the
+    first column is the one shown as the hit's title.
+    """
+    kind: str
+    model: type
+    columns: tuple
+
+    @property
+    def table(self):
+        return f"{self.model._meta.db_table}_fts"
+
+
+SEARCH_INDEXES = {
+    index.kind: index for index in [
+        SearchIndex('blog', BlogPost, ('title', 'content')),
+        SearchIndex('projects', Projects, ('name', 'description', 'languages')),
+        SearchIndex('novels', Novels, ('title', 'author', 'description')),
+        SearchIndex('shortstories', ShortStories, ('title', 'author', 'description')),
+        SearchIndex('work-experience', WorkExperience, ('company', 'position', 'description')),
+    ]
+}
+
+# bm25 weight of the title column relative to the others
+TITLE_WEIGHT = 10.0
+SNIPPET_TOKENS = 24
+
+# Highlight markers FTS5 puts around matches; swapped for <mark> after escaping
+MARK_START, MARK_END = '\x02', '\x03'
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def fts_query(text):
+    """Free text -> a safe FTS5 query: every word must match, the last as a prefix
+
+    Quoting each token keeps user input from being parsed as FTS5 syntax
+    (AND/OR/NEAR, column filters, unbalanced quotes).
+    """
+    tokens = TOKEN_RE.findall(text)
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def highlighted(text):
+    """Escape an FTS5 snippet/highlight and turn its markers into <mark> tags"""
+    escaped = html.escape(text or '')
+    return escaped.replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+
+
+def _index_select(index):
+    weights = ', '.join([str(TITLE_WEIGHT)] + ['1.0'] * (len(index.columns) - 1))
+    return (
+        f"SELECT '{index.kind}' AS kind, rowid AS id, "
+        f"highlight({index.table}, 0, '{MARK_START}', '{MARK_END}') AS title, "
+        f"snippet({index.table}, -1, '{MARK_START}', '{MARK_END}', '…', {SNIPPET_TOKENS}) AS snippet, "
+        f"bm25({index.table}, {weights}) AS rank "
+        f"FROM {index.table} WHERE {index.table} MATCH %s"
+    )
+
+
+def search(text, kinds=None, limit=20):
+    """Ranked hits across the content models, best first
+
+    One UNION ALL over the FTS5 tables; bm25 is computed per table, so the
+    ranks of different kinds are comparable but not identical in scale.
+    """
+    query = fts_query(text)
+    if query is None:
+        return []
+
+    indexes = [SEARCH_INDEXES[kind] for kind in (kinds or SEARCH_INDEXES)]
+    sql = ' UNION ALL '.join(_index_select(index) for index in indexes) + ' ORDER BY rank LIMIT %s'
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [query] * len(indexes) + [limit])
+        rows = cursor.fetchall()
+
+    return [
+        {
+            'kind': kind,
+            'id': object_id,
+            'title': highlighted(title),
+            'snippet': highlighted(snippet),
+            'rank': rank,
+        }
+        for kind, object_id, title, snippet, rank in rows
+    ]
+
+
+def matching_pks(model, text):
+    """Subquery of the model's pks whose indexed text matches, for pk__in filters"""
+    index = next(index for index in SEARCH_INDEXES.values() if index.model is model)
+    return RawSQL(f"SELECT rowid FROM {index.table} WHERE {index.table} MATCH %s", [fts_query(text)])
+
+
+class FullTextSearchMixin:
+    """ModelAdmin search through the model's FTS5 index instead of icontains scans"""
+
+    def get_search_results(self, request, queryset, search_term):
+        if not fts_query(search_term):
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(pk__in=matching_pks(queryset.model, search_term)), False
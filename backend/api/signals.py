@@ -0,0 +1,80 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from .caching import invalidate_model
+from .images import IMAGE_FIELDS, image_models, queue_variants
+from .metrics import instrument_connection
+from . import query_guard
+from .rendering import RENDERED_FIELDS, render_instance, rendered_models
+from .sqlite import apply_pragmas
+from .models import BlogPost, HealthMetric, HealthWeight, Novels, Projects, ShortStories, WorkExperience
+
+
+# Models edited one row at a time (API handlers, admin, shell). Derived tables
+# such as HealthWeightStats are rewritten in bulk and invalidate explicitly;
+# leaving them out also keeps their QuerySet.delete() a single fast DELETE.
+INVALIDATING_MODELS = [BlogPost, Projects, Novels, ShortStories, WorkExperience, HealthWeight, HealthMetric]
+
+
+def invalidate_cached_responses(sender, instance, **kwargs):
+    """Write-through invalidation for saves and deletes
+
+    Bulk writes (bulk_create, update(), ...) send no signals and call
+    invalidate_model() themselves.
+    """
+    invalidate_model(sender, instance)
+
+
+for model in INVALIDATING_MODELS:
+    post_save.connect(invalidate_cached_responses, sender=model, dispatch_uid=f"cache-save-{model._meta.label}")
+    post_delete.connect(invalidate_cached_responses, sender=model, dispatch_uid=f"cache-delete-{model._meta.label}")
+
+
+def reset_image_width(sender, instance, **kwargs):
+    """A new or replaced image (or a cleared one) has no variants until they're rendered"""
+    field = IMAGE_FIELDS[sender._meta.label]
+    image = getattr(instance, field)
+    if getattr(instance, f"{field}_width") is None:
+        return
+    if not image or not image._committed:
+        setattr(instance, f"{field}_width", None)
+    elif sender.objects.filter(pk=instance.pk).values_list(field, flat=True).first() != image.name:
+        # Another stored file assigned by name, e.g. through the API
+        setattr(instance, f"{field}_width", None)
+
+
+def render_image_variants(sender, instance, **kwargs):
+    field = IMAGE_FIELDS[sender._meta.label]
+    if settings.IMAGE_VARIANT_WORKERS and getattr(instance, field) and getattr(instance, f"{field}_width") is None:
+        transaction.on_commit(lambda: queue_variants(instance))
+
+
+for model, _ in image_models():
+    pre_save.connect(reset_image_width, sender=model, dispatch_uid=f"image-width-{model._meta.label}")
+    post_save.connect(render_image_variants, sender=model, dispatch_uid=f"image-variants-{model._meta.label}")
+
+
+def render_text(sender, instance, update_fields=None, **kwargs):
+    """Store the rendering with the text; a save limited to other fields leaves both alone
+
+    A save limited to the text writes the rendering too: BlogPost.save() adds
+    RENDERED_COLUMNS to its update_fields.
+    """
+    if update_fields is None or RENDERED_FIELDS[sender._meta.label] in update_fields:
+        render_instance(instance)
+
+
+for model, _ in rendered_models():
+    pre_save.connect(render_text, sender=model, dispatch_uid=f"render-{model._meta.label}")
+
+
+if settings.SQLITE_PRAGMAS:
+    connection_created.connect(apply_pragmas, dispatch_uid='sqlite-pragmas')
+
+if settings.API_METRICS_ENABLED:
+    connection_created.connect(instrument_connection, dispatch_uid='api-metrics')
+
+if settings.API_QUERY_GUARD:
+    connection_created.connect(query_guard.instrument_connection, dispatch_uid='api-query-guard')
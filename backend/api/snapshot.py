@@ -0,0 +1,297 @@
+"""
+Static snapshots: the read endpoints published as JSON files for static hosting
+
+publish() requests every URL in SNAPSHOT_URLS in-process and stores each
+response as <path>.<content hash>.json under SNAPSHOT_ROOT, with .gz and .br
+copies for servers and CDNs that serve precompressed files. manifest.json maps
+each URL, query string included, to its current file. Files are named by their
+content, so unchanged responses are never rewritten and can be cached forever;
+only the manifest changes in place, and it is written last.
+
+Publishing is incremental: a run re-renders the namespaces it is given (plus
+the aggregate bootstrap) and keeps the rest of the manifest. With
+SNAPSHOT_ON_WRITE, invalidate_model() queues the written namespace and a
+background thread republishes it shortly after the transaction commits.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from urllib.parse import quote, urlsplit
+
+from asgiref.sync import async_to_sync
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.urls import Resolver404, resolve
+from django.utils import timezone
+
+from .caching import CACHE_NAMESPACES
+from .storage import HASH_LENGTH
+
+try:
+    import brotli
+except ImportError:  # optional: without it only .gz copies are written
+    brotli = None
+
+try:
+    import fcntl
+except ImportError:  # Windows: publishes from several processes may interleave
+    fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+# cache namespace -> URLs published for it. Lists are followed through every
+# next cursor; {pk}/{metric} (the namespace's detail key) expand to one URL per
+# row. The query strings match what the frontend requests, byte for byte.
+SNAPSHOT_URLS = {
+    'bootstrap': [
+        '/api/bootstrap',
+        '/api/bootstrap?limits=blog:1&days=90&max_points=300',
+    ],
+    'blog': [
+        '/api/blog',
+        '/api/blog?fields=title,content_html,created_at',
+        '/api/blog/{pk}',
+    ],
+    'projects': ['/api/projects', '/api/projects/{pk}'],
+    'novels': ['/api/novels', '/api/novels/{pk}'],
+    'shortstories': ['/api/shortstories', '/api/shortstories/{pk}'],
+    'work-experience': ['/api/work-experience'],
+    'health-weight': [
+        '/api/health/weight',
+        *(f'/api/health/weight?days={days}&max_points=300' for days in (30, 90, 180, 365)),
+        '/api/health/weight/all',
+        '/api/health/weight/all?resolution=week',
+        '/api/health/weight/all?resolution=month',
+        '/api/health/weight/all?max_points=300',
+    ],
+    'health-weight-stats': ['/api/health/weight/stats', '/api/health/weight/stats?days=365'],
+    'health-metrics': [
+        '/api/health/metrics',
+        '/api/health/metrics/{metric}',
+        '/api/health/metrics/{metric}?days=365',
+    ],
+}
+
+MANIFEST = 'manifest.json'
+
+COMPRESSED_SUFFIXES = ('.gz', '.br')
+
+_publish_lock = threading.Lock()
+_queue_lock = threading.Lock()
+_pending = {}
+_timer = None
+
+
+def namespace_models():
+    """namespace -> (model, detail key attribute) for the namespaces backed by one model"""
+    return {
+        namespace: (apps.get_model(label), key_attr)
+        for label, (namespace, key_attr) in CACHE_NAMESPACES.items()
+    }
+
+
+def encodings():
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+async def awaited(awaitable):
+    return await awaitable
+
+
+def fetch(url):
+    """The response body of a GET to url, run through the view without middleware; None unless 200"""
+    path = urlsplit(url).path
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return None
+    response = match.func(RequestFactory().get(url), *match.args, **match.kwargs)
+    if asyncio.iscoroutine(response):
+        # API_ASYNC views; this runs in a command or a background thread, outside any event loop
+        response = async_to_sync(awaited)(response)
+    if response.status_code != 200:
+        return None
+    return response.content
+
+
+def pages(url):
+    """(url, body) for url and, when it's a paginated list, every page after it"""
+    base = url
+    while url:
+        content = fetch(url)
+        if content is None:
+            return
+        yield url, content
+        body = json.loads(content)
+        cursor = body.get('next') if isinstance(body, dict) else None
+        url = cursor and f"{base}{'&' if '?' in base else '?'}cursor={cursor}"
+
+
+def snapshot_name(url, content):
+    """/api/blog/42 -> blog/42.<hash>.json; a query string adds its own digest: blog-<digest>.<hash>.json"""
+    parts = urlsplit(url)
+    stem = parts.path.removeprefix('/api/').strip('/') or 'index'
+    if parts.query:
+        stem += '-' + hashlib.sha256(parts.query.encode()).hexdigest()[:8]
+    return f"{stem}.{hashlib.sha256(content).hexdigest()[:HASH_LENGTH]}.json"
+
+
+def write_atomic(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.tmp{os.getpid()}"
+    with open(temporary, 'wb') as f:
+        f.write(content)
+    os.replace(temporary, path)
+
+
+def write_file(root, name, content, overwrite=False):
+    """Write name and its precompressed copies; returns False if it was already there"""
+    path = os.path.join(root, *name.split('/'))
+    if not overwrite and os.path.exists(path):
+        return False
+    # Compressed copies first, so a server never finds the file without them
+    write_atomic(f"{path}.gz", gzip.compress(content, compresslevel=9, mtime=0))
+    if brotli is not None:
+        write_atomic(f"{path}.br", brotli.compress(content, quality=11))
+    write_atomic(path, content)
+    return True
+
+
+def load_manifest(root):
+    try:
+        with open(os.path.join(root, MANIFEST), 'rb') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'files': {}}
+
+
+def prune(root, keep):
+    """Delete snapshot files (and their compressed copies) not named in keep; returns how many"""
+    removed = 0
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            relative = os.path.relpath(path, root).replace(os.sep, '/')
+            base = relative[:-3] if relative.endswith(COMPRESSED_SUFFIXES) else relative
+            if base.endswith('.json') and base != MANIFEST and base not in keep:
+                os.remove(path)
+                removed += base == relative
+    return removed
+
+
+def render_namespace(namespace, keys):
+    """[(url, detail key or None, body)] of a namespace; keys=None renders every row's details"""
+    model, key_attr = namespace_models().get(namespace, (None, None))
+    if keys is None and key_attr:
+        keys = [str(key) for key in model.objects.order_by(key_attr).values_list(key_attr, flat=True).distinct()]
+    results = []
+    for template in SNAPSHOT_URLS[namespace]:
+        if key_attr and f"{{{key_attr}}}" in template:
+            for key in keys:
+                url = template.format(**{key_attr: quote(key, safe='')})
+                content = fetch(url)
+                if content is not None:
+                    results.append((url, key, content))
+        else:
+            results += [(url, None, content) for url, content in pages(template)]
+    return results
+
+
+def publish(root=None, changes=None):
+    """Render changed namespaces into root and rewrite the manifest
+
+    changes maps namespaces to the detail keys that changed, or to None when
+    every row may have; without it everything is republished and entries for
+    rows that no longer exist are dropped. Returns counts of URLs rendered,
+    files written and files pruned.
+    """
+    root = str(root or settings.SNAPSHOT_ROOT)
+    os.makedirs(root, exist_ok=True)
+    with _publish_lock, open(os.path.join(root, '.publish.lock'), 'w') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+
+        old = load_manifest(root)
+        if changes is None:
+            changes = dict.fromkeys(SNAPSHOT_URLS)
+            files = {}
+        else:
+            # Aggregates (bootstrap) are built from every namespace
+            aggregates = [namespace for namespace in SNAPSHOT_URLS if namespace not in namespace_models()]
+            changes = {**changes, **dict.fromkeys(aggregates)}
+            files = dict(old['files'])
+
+        rendered = written = 0
+        for namespace, keys in changes.items():
+            if namespace not in SNAPSHOT_URLS:
+                continue
+            keys = None if keys is None else {str(key) for key in keys}
+            # What this run replaces: the namespace's lists and the changed details
+            files = {
+                url: entry for url, entry in files.items()
+                if entry['namespace'] != namespace
+                or (keys is not None and entry['key'] is not None and entry['key'] not in keys)
+            }
+            for url, key, content in render_namespace(namespace, keys):
+                name = snapshot_name(url, content)
+                written += write_file(root, name, content)
+                rendered += 1
+                files[url] = {'file': name, 'bytes': len(content), 'namespace': namespace, 'key': key}
+
+        files = dict(sorted(files.items()))
+        manifest = {
+            'version': hashlib.sha256(' '.join(entry['file'] for entry in files.values()).encode()).hexdigest()[:HASH_LENGTH],
+            'generated_at': timezone.now().isoformat(),
+            'encodings': encodings(),
+            'files': files,
+        }
+        write_file(root, MANIFEST, json.dumps(manifest, indent=1).encode(), overwrite=True)
+
+        # Files of the previous manifest stay one more run, for clients that loaded it
+        keep = {entry['file'] for entry in files.values()} | {entry['file'] for entry in old['files'].values()}
+        pruned = prune(root, keep)
+
+    return {'urls': rendered, 'written': written, 'pruned': pruned}
+
+
+def queue_publish(namespace, keys=None):
+    """Republish a namespace after the current transaction commits
+
+    Writes arriving within SNAPSHOT_DELAY seconds of each other are published
+    together, by one background thread.
+    """
+    if namespace in SNAPSHOT_URLS:
+        transaction.on_commit(lambda: _schedule(namespace, keys))
+
+
+def _schedule(namespace, keys):
+    global _timer
+    with _queue_lock:
+        pending = _pending.get(namespace, set())
+        _pending[namespace] = None if keys is None or pending is None else pending | {str(key) for key in keys}
+        if _timer is None:
+            # Not a daemon: a management command finishes its publish before exiting
+            _timer = threading.Timer(settings.SNAPSHOT_DELAY, _publish_pending)
+            _timer.start()
+
+
+def _publish_pending():
+    global _timer
+    with _queue_lock:
+        changes = dict(_pending)
+        _pending.clear()
+        _timer = None
+    try:
+        publish(changes=changes)
+    except Exception:
+        logger.exception("Publishing the snapshot of %s failed", ', '.join(changes))
+    finally:
+        connection.close()
@@ -0,0 +1,20 @@
+from django.conf import settings
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    """Run settings.SQLITE_PRAGMAS on every new SQLite connection (connection_created)"""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+def current_pragmas(connection):
+    """The live values of the profile's PRAGMAs, e.g. to check the profile took effect"""
+    with connection.cursor() as cursor:
+        result = {}
+        for name in settings.SQLITE_PRAGMAS:
+            cursor.execute(f"PRAGMA {name}")
+            result[name] = cursor.fetchone()[0]
+    return result
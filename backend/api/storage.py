@@ -0,0 +1,34 @@
+import hashlib
+import posixpath
+import re
+
+from django.core.files.storage import FileSystemStorage
+
+
+HASH_LENGTH = 12
+
+# photo.3f2a1b9c0d4e.jpg, and its variants photo.3f2a1b9c0d4e-640w.webp
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{%d}(?:-\d+w)?\.[^./]+$' % HASH_LENGTH)
+
+
+def is_content_hashed(name):
+    """True if the name changes whenever the bytes do, so it can be cached forever"""
+    return bool(HASHED_NAME_RE.search(name))
+
+
+class HashedFileSystemStorage(FileSystemStorage):
+    """Stores uploads as <name>.<content hash>.<ext>
+
+    A new upload always gets a new URL, which lets media responses be served
+    with Cache-Control: immutable. Files saved before this storage keep their
+    names and their ordinary caching.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name and not is_content_hashed(name):
+            digest = hashlib.sha256()
+            for chunk in content.chunks():
+                digest.update(chunk)
+            root, ext = posixpath.splitext(name)
+            name = f"{root}.{digest.hexdigest()[:HASH_LENGTH]}{ext}"
+        return super().save(name, content, max_length=max_length)
@@ -0,0 +1,34 @@
+from contextlib import contextmanager
+
+from .query_guard import shorten, tracking
+
+
+@contextmanager
+def query_budget(max_queries, *, max_repeats=None, allow_scans=True):
+    """Fail the block if it runs more than max_queries queries
+
+    Also fails on any statement repeated max_repeats times (default
+    settings.API_QUERY_GUARD_REPEATS), and with allow_scans=False on
+    statements that read a whole table.
+    """
+    with tracking() as tracker:
+        yield tracker
+    problems = tracker.problems(repeats=max_repeats, slow_ms=float('inf'), scans=not allow_scans)
+    if len(tracker) > max_queries:
+        queries = '\n'.join(f"  {shorten(sql)}" for sql, _, _, _ in tracker.queries)
+        problems.insert(0, f"{len(tracker)} queries, budget {max_queries}:\n{queries}")
+    if problems:
+        raise AssertionError('\n'.join(problems))
+
+
+class QueryBudgetMixin:
+    """For TestCase: pin an endpoint's query count so ORM regressions fail CI
+
+        def test_blog_list(self):
+            self.assertQueryBudget(2, 'get', '/api/blog')
+    """
+
+    def assertQueryBudget(self, max_queries, method, path, *args, max_repeats=None, allow_scans=True, **kwargs):
+        with query_budget(max_queries, max_repeats=max_repeats, allow_scans=allow_scans):
+            response = getattr(self.client, method)(path, *args, **kwargs)
+        return response
@@ -1,3 +1,598 @@
-from django.test import TestCase
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from unittest import skipIf, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.test import SimpleTestCase, TestCase, override_settings
+from ninja import Field, Schema
+from pydantic import ValidationError, field_validator
+
+import parse_health_data
+from benchmarks.synthetic import write_synthetic_export
+
+from .caching import cache_stats, get_cache
+from .crud import partial_schema
+from .models import (
+    BlogPost, HealthMetric, HealthWeight, HealthWeightStats, ImportWatermark, Novels, Projects, ShortStories,
+    WorkExperience,
+)
+from .query_guard import scanned_table
+from .rendering import EXCERPT_LENGTH
+from .testing import QueryBudgetMixin, query_budget
+from .timeseries import refresh_weight_stats
+
+
+# The response cache of the tests: per process and never the site's shared one
+TEST_CACHES = {
+    **settings.CACHES,
+    settings.API_CACHE_ALIAS: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'api-tests'},
+}
+
+
+def create_content():
+    """A few rows of every content type, plus 60 days of weights and steps; returns the first blog post"""
+    post = BlogPost.objects.create(title='Running in the rain', content='Today I went running.\n\nSee https://example.com')
+    BlogPost.objects.create(title='Second post', content='More words here')
+    Projects.objects.create(name='Site', description='This site', languages='Python')
+    Novels.objects.create(title='A Novel', author='Someone', description='Long')
+    ShortStories.objects.create(title='A Story', author='Someone', description='Short')
+    WorkExperience.objects.create(company='Acme', position='Engineer', start_date=date(2020, 1, 1))
+    today = date.today()
+    HealthWeight.objects.bulk_create(
+        HealthWeight(date=today - timedelta(days=n), weight=80 + n % 5) for n in range(60)
+    )
+    HealthMetric.objects.bulk_create(
+        HealthMetric(metric='steps', date=today - timedelta(days=n), value=5000 + n, unit='count') for n in range(60)
+    )
+    refresh_weight_stats()
+    return post
+
+
+def read_urls(post):
+    """A GET of every read endpoint, and the variants that take other code paths"""
+    return [
+        '/api/blog',
+        '/api/blog?fields=title,content_html',
+        f'/api/blog/{post.pk}',
+        '/api/projects',
+        f'/api/projects/{Projects.objects.get().pk}',
+        '/api/novels',
+        f'/api/novels/{Novels.objects.get().pk}',
+        '/api/shortstories',
+        f'/api/shortstories/{ShortStories.objects.get().pk}',
+        '/api/work-experience',
+        '/api/health/weight',
+        '/api/health/weight?max_points=10',
+        '/api/health/weight?resolution=week',
+        '/api/health/weight/all',
+        '/api/health/weight/all?resolution=month',
+        '/api/health/weight/all?max_points=10',
+        '/api/health/weight/stats',
+        '/api/health/metrics',
+        '/api/health/metrics/steps',
+        '/api/bootstrap',
+        '/api/search?q=run',
+    ]
+
+
+@skipUnless(settings.API_ASYNC, 'API_ASYNC is read at import; AsyncModeTests runs these in a subprocess')
+@override_settings(CACHES=TEST_CACHES, API_CACHE_ENABLED=False)
+class AsyncReadEndpointTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.post = create_content()
+
+    async def test_read_endpoints(self):
+        from asgiref.sync import sync_to_async
+
+        for url in await sync_to_async(read_urls)(self.post):
+            with self.subTest(url=url):
+                response = await self.async_client.get(url)
+                self.assertEqual(response.status_code, 200, response.content[:500])
+
+
+@skipIf(settings.API_ASYNC, 'already running with API_ASYNC=True')
+class AsyncModeTests(SimpleTestCase):
+    def test_read_endpoints_with_api_async(self):
+        result = subprocess.run(
+            [sys.executable, 'manage.py', 'test', 'api.tests.AsyncReadEndpointTests', '--noinput'],
+            cwd=settings.BASE_DIR, env={**os.environ, 'API_ASYNC': 'True'}, capture_output=True, text=True,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr[-3000:])
+        self.assertIn('Ran 1 test', result.stderr)
+
+
+@override_settings(CACHES=TEST_CACHES, API_CACHE_ENABLED=False)
+class ApiTestCase(TestCase):
+    """Uncached unless a test turns API_CACHE_ENABLED on; the test cache starts empty"""
+
+    def setUp(self):
+        get_cache().clear()
+
+    def send(self, method, path, data=None):
+        return getattr(self.client, method)(path, json.dumps(data), content_type='application/json')
+
+
+class PaginationTests(ApiTestCase):
+    def test_cursors_walk_every_row_once_in_order(self):
+        # Many equal created_at values, so the id tie-breaker decides the order
+        BlogPost.objects.bulk_create(BlogPost(title=f"Post {n}", content='text') for n in range(25))
+        BlogPost.objects.update(created_at=datetime(2025, 1, 1, tzinfo=dt_timezone.utc))
+        BlogPost.objects.filter(title__in=['Post 3', 'Post 17']).update(
+            created_at=datetime(2025, 6, 1, tzinfo=dt_timezone.utc))
+        expected = list(BlogPost.objects.order_by('-created_at', 'id').values_list('id', flat=True))
+
+        pages, url = [], '/api/blog?limit=10'
+        while url:
+            body = self.client.get(url).json()
+            pages.append([item['id'] for item in body['items']])
+            url = body['next'] and f"/api/blog?limit=10&cursor={body['next']}"
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertEqual(sum(pages, []), expected)
+
+        second = self.client.get(f"/api/blog?limit=10&cursor={self.client.get('/api/blog?limit=10').json()['next']}")
+        previous = self.client.get(f"/api/blog?limit=10&cursor={second.json()['previous']}").json()
+        self.assertEqual([item['id'] for item in previous['items']], pages[0])
+        self.assertIsNone(previous['previous'])
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get('/api/blog?cursor=not-a-cursor').status_code, 400)
+
+    def test_sparse_fields(self):
+        BlogPost.objects.create(title='Post', content='text')
+        item = self.client.get('/api/blog?fields=title').json()['items'][0]
+        self.assertEqual(set(item), {'id', 'title', 'created_at'})
+
+
+class ConditionalRequestTests(ApiTestCase):
+    def test_not_modified_until_a_write(self):
+        post = BlogPost.objects.create(title='Post', content='text')
+        for url in ['/api/blog', f'/api/blog/{post.pk}']:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                etag = response['ETag']
+                self.assertTrue(response.has_header('Last-Modified'))
+
+                not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(not_modified.status_code, 304)
+                self.assertEqual(not_modified.content, b'')
+
+                self.send('patch', f'/api/blog/{post.pk}', {'title': f'Post {url}'})
+                changed = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(changed.status_code, 200)
+                self.assertNotEqual(changed['ETag'], etag)
+
+    def test_delete_changes_the_list_etag(self):
+        posts = [BlogPost.objects.create(title=f'Post {n}', content='text') for n in range(2)]
+        etag = self.client.get('/api/blog')['ETag']
+        self.client.delete(f'/api/blog/{posts[0].pk}')
+        self.assertEqual(self.client.get('/api/blog', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_invalid_requests_skip_the_version_queries(self):
+        invalid = {
+            '/api/blog?cursor=not-a-cursor': 400,
+            '/api/blog?fields=title,nope': 400,
+            '/api/blog?limit=0': 422,
+            '/api/bootstrap?limits=blog:x': 400,
+            '/api/bootstrap?include=nope': 400,
+            '/api/search?q=run&kinds=nope': 400,
+            '/api/health/weight?max_points=1': 422,
+        }
+        for url, status in invalid.items():
+            with self.subTest(url=url), self.assertNumQueries(0):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status)
+                self.assertFalse(response.has_header('ETag'))
+
+
+@override_settings(API_CACHE_ENABLED=True)
+class ResponseCacheTests(ApiTestCase):
+    """Invalidations run when the write commits; TestCase's transaction never does, so writes run their callbacks"""
+
+    def send(self, method, path, data=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return super().send(method, path, data)
+
+    def test_writes_invalidate_the_lists_and_only_their_own_detail(self):
+        first = BlogPost.objects.create(title='First', content='text')
+        second = BlogPost.objects.create(title='Second', content='text')
+        for url in ['/api/blog', f'/api/blog/{first.pk}', f'/api/blog/{second.pk}', '/api/bootstrap']:
+            self.client.get(url)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(f'/api/blog/{first.pk}').json()['title'], 'First')
+
+        self.send('patch', f'/api/blog/{first.pk}', {'title': 'Changed'})
+        self.assertEqual(self.client.get(f'/api/blog/{first.pk}').json()['title'], 'Changed')
+        self.assertEqual(self.client.get('/api/blog').json()['items'][-1]['title'], 'Changed')
+        self.assertEqual(self.client.get('/api/bootstrap').json()['blog']['items'][0]['title'], 'Second')
+        with self.assertNumQueries(0):
+            self.client.get(f'/api/blog/{second.pk}')
+
+    def test_bulk_writes_and_imports_invalidate(self):
+        self.client.get('/api/projects')
+        self.send('post', '/api/projects/bulk', [{'name': 'New', 'description': 'text'}])
+        self.assertEqual([item['name'] for item in self.client.get('/api/projects').json()['items']], ['New'])
+
+        self.client.get('/api/health/weight')
+        HealthWeight.objects.bulk_create([HealthWeight(date=date.today(), weight=80)])
+        with self.captureOnCommitCallbacks(execute=True):
+            refresh_weight_stats()
+        self.assertEqual(self.client.get('/api/health/weight/stats').json()[0]['weight'], 80)
+
+    def test_bulk_delete_invalidates_each_group_once(self):
+        posts = [BlogPost.objects.create(title=f'Post {n}', content='text') for n in range(3)]
+        self.client.get(f'/api/blog/{posts[0].pk}')
+        before = cache_stats()['invalidations']
+        self.send('delete', '/api/blog/bulk', [post.pk for post in posts])
+        after = cache_stats()['invalidations']
+        # blog:list and one detail group per post; bootstrap and search once each
+        self.assertEqual(after['blog'] - before.get('blog', 0), 4)
+        self.assertEqual(after['bootstrap'] - before.get('bootstrap', 0), 1)
+        self.assertEqual(self.client.get(f'/api/blog/{posts[0].pk}').status_code, 404)
+
+    def test_loaders_invalidate_once_per_import(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'health_metrics.json')
+        with open(path, 'w') as f:
+            json.dump({'steps': [{'date': f'2025-01-{day:02}', 'value': day, 'unit': 'count'} for day in range(1, 21)]}, f)
+        before = cache_stats()['invalidations'].get('health-metrics', 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('load_health_metrics', path, stdout=StringIO())
+        # health-metrics:list and health-metrics:steps
+        self.assertEqual(cache_stats()['invalidations']['health-metrics'] - before, 2)
+        self.assertEqual(self.client.get('/api/health/metrics/steps?days=10000').json()[-1]['value'], 20)
+
+    def test_reads_before_the_commit_keep_the_old_version(self):
+        post = BlogPost.objects.create(title='Old', content='text')
+        self.client.get(f'/api/blog/{post.pk}')
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                post.title = 'New'
+                post.save()
+                # Another worker can't see the write yet: it must not cache its old rows under a new version
+                with self.assertNumQueries(0):
+                    self.assertEqual(self.client.get(f'/api/blog/{post.pk}').json()['title'], 'Old')
+        self.assertEqual(self.client.get(f'/api/blog/{post.pk}').json()['title'], 'New')
+
+
+class QueryBudgetTests(QueryBudgetMixin, ApiTestCase):
+    """Every read endpoint's query count: a conditional-request aggregate plus the rows"""
+
+    BUDGETS = {
+        'bootstrap': 12,  # the aggregate, then a list per section
+        'search': 6,  # the aggregate, then one MATCH per index
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.post = create_content()
+
+    def test_read_endpoints(self):
+        for url in read_urls(self.post):
+            with self.subTest(url=url):
+                budget = self.BUDGETS.get(url.split('/')[2].split('?')[0], 2)
+                response = self.assertQueryBudget(budget, 'get', url)
+                self.assertEqual(response.status_code, 200)
+
+    def test_lists_stay_flat_as_rows_grow(self):
+        BlogPost.objects.bulk_create(BlogPost(title=f'Post {n}', content='text') for n in range(30))
+        self.assertQueryBudget(2, 'get', '/api/blog')
+        self.assertQueryBudget(12, 'get', '/api/bootstrap')
+
+    def test_budget_catches_n_plus_one(self):
+        pks = list(BlogPost.objects.values_list('pk', flat=True))
+        with self.assertRaisesMessage(AssertionError, 'queries, budget 1'):
+            with query_budget(1, max_repeats=100):
+                [BlogPost.objects.get(pk=pk) for pk in pks]
+        with self.assertRaises(AssertionError):
+            with query_budget(100, max_repeats=2):
+                [BlogPost.objects.get(pk=pk) for pk in pks]
+        with query_budget(1):
+            list(BlogPost.objects.filter(pk__in=pks))
+
+    def test_budget_catches_full_scans(self):
+        with self.assertRaisesMessage(AssertionError, 'full scan of api_blogpost'):
+            with query_budget(1, allow_scans=False):
+                list(BlogPost.objects.filter(content='text'))
+        with query_budget(1, allow_scans=False):
+            list(BlogPost.objects.filter(pk=self.post.pk))
+        # The first keyset page walks the ordering index, but only for LIMIT rows
+        with query_budget(1, allow_scans=False):
+            list(BlogPost.objects.order_by('-created_at', 'id')[:10])
+
+    def test_scan_plan_lines(self):
+        plans = {
+            'SCAN api_blogpost': 'api_blogpost',
+            'SCAN TABLE api_blogpost': 'api_blogpost',
+            'SCAN api_blogpost USING INDEX blogpost_created_at_id_idx': 'api_blogpost',
+            'SCAN TABLE api_blogpost USING INDEX blogpost_created_at_id_idx': 'api_blogpost',
+            'SCAN api_blogpost USING COVERING INDEX blogpost_created_at_id_idx': None,
+            'SCAN api_blogpost_fts VIRTUAL TABLE INDEX 0:M2': None,
+            'SCAN CONSTANT ROW': None,
+            'SCAN SUBQUERY 1': None,
+            'SEARCH api_blogpost USING INTEGER PRIMARY KEY (rowid=?)': None,
+        }
+        for detail, table in plans.items():
+            with self.subTest(detail=detail):
+                self.assertEqual(scanned_table(detail), table)
+        self.assertIsNone(scanned_table('SCAN api_blogpost USING INDEX blogpost_created_at_id_idx', limited=True))
+        self.assertEqual(scanned_table('SCAN api_blogpost', limited=True), 'api_blogpost')
+
+
+class SearchIndexTests(ApiTestCase):
+    def search(self, q):
+        return [(hit['kind'], hit['id']) for hit in self.client.get('/api/search', {'q': q}).json()]
+
+    def test_index_follows_inserts_updates_and_deletes(self):
+        post = BlogPost.objects.create(title='Running in the rain', content='A wet afternoon')
+        self.assertEqual(self.search('running'), [('blog', post.pk)])
+        self.assertEqual(self.search('runs'), [('blog', post.pk)])  # stemmed
+        self.assertEqual(self.search('aftern'), [('blog', post.pk)])  # prefix
+
+        self.send('patch', f'/api/blog/{post.pk}', {'title': 'Cycling in the sun'})
+        self.assertEqual(self.search('running'), [])
+        self.assertEqual(self.search('cycling'), [('blog', post.pk)])
+
+        self.client.delete(f'/api/blog/{post.pk}')
+        self.assertEqual(self.search('cycling'), [])
+
+    def test_bulk_writes_are_indexed(self):
+        ids = self.send('post', '/api/novels/bulk', [{'title': 'Moby Dick', 'author': 'Melville'}]).json()['ids']
+        self.assertEqual(self.search('moby'), [('novels', ids[0])])
+
+    def test_highlights_are_escaped(self):
+        BlogPost.objects.create(title='<b>Running</b>', content='text')
+        hit = self.client.get('/api/search', {'q': 'running'}).json()[0]
+        self.assertEqual(hit['title'], '&lt;b&gt;<mark>Running</mark>&lt;/b&gt;')
+
+
+class WriteTests(ApiTestCase):
+    def test_patch_updates_only_the_fields_sent(self):
+        post = BlogPost.objects.create(title='Title', content='Old text')
+        response = self.send('patch', f'/api/blog/{post.pk}', {'content': 'New text'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['title'], 'Title')
+        post.refresh_from_db()
+        self.assertEqual((post.title, post.content, post.content_html), ('Title', 'New text', '<p>New text</p>'))
+
+    def test_patch_errors(self):
+        post = BlogPost.objects.create(title='Title', content='text')
+        self.assertEqual(self.send('patch', f'/api/blog/{post.pk}', {'title': None}).status_code, 422)
+        self.assertEqual(self.send('patch', '/api/blog/999999', {'title': 'x'}).status_code, 404)
+        self.assertEqual(self.send('put', '/api/blog/999999', {'title': 'x', 'content': 'y'}).status_code, 404)
+        self.assertEqual(self.client.delete('/api/blog/999999').status_code, 404)
+
+    def test_null_for_a_not_null_column(self):
+        project = Projects.objects.create(name='Site', description='text', languages='Python')
+        response = self.send('patch', f'/api/projects/{project.pk}', {'languages': None})
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual([error['loc'] for error in response.json()['detail']], [['body', 'payload', 'languages']])
+        put = self.send('put', f'/api/projects/{project.pk}', {'name': 'Site', 'description': 'text', 'languages': None})
+        self.assertEqual(put.status_code, 422)
+        bulk = self.send('put', '/api/projects/bulk', [{'id': project.pk, 'name': 'Site', 'description': 'text',
+                                                        'languages': None}])
+        self.assertEqual(bulk.json()['errors'], [{'index': 0, 'id': project.pk, 'errors': [
+            'languages: Field may not be null']}])
+        project.refresh_from_db()
+        self.assertEqual(project.languages, 'Python')
+
+        # Omitted, an optional field is replaced with the model's default, as on create
+        response = self.send('put', f'/api/projects/{project.pk}', {'name': 'Site', 'description': 'text'})
+        self.assertEqual(response.status_code, 200)
+        project.refresh_from_db()
+        self.assertEqual((project.languages, project.link), ('', None))
+
+    def test_bulk_create_is_all_or_nothing(self):
+        response = self.send('post', '/api/blog/bulk', [{'title': 'Good', 'content': 'text'}, {'title': 'Bad'}])
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(response.json()['errors'], [{'index': 1, 'id': None, 'errors': ['content: Field required']}])
+        self.assertFalse(BlogPost.objects.exists())
+
+    def test_bulk_update_and_delete_errors(self):
+        post = BlogPost.objects.create(title='Title', content='text')
+        missing = self.send('put', '/api/blog/bulk', [
+            {'id': post.pk, 'title': 'Changed', 'content': 'text'},
+            {'id': 999999, 'title': 'Nope', 'content': 'text'},
+        ])
+        self.assertEqual(missing.status_code, 404)
+        self.assertEqual(missing.json()['errors'], [{'index': 1, 'id': 999999, 'errors': ['not found']}])
+
+        duplicate = self.send('put', '/api/blog/bulk', [{'id': post.pk, 'title': 'A', 'content': 'a'}] * 2)
+        self.assertEqual(duplicate.status_code, 422)
+        self.assertEqual(BlogPost.objects.get().title, 'Title')
+
+        self.assertEqual(self.send('delete', '/api/blog/bulk', [post.pk, 999999]).status_code, 404)
+        self.assertTrue(BlogPost.objects.exists())
+        self.assertEqual(self.send('delete', '/api/blog/bulk', [post.pk]).json(), {'ids': [post.pk]})
+        self.assertFalse(BlogPost.objects.exists())
+
+    def test_delete_sends_post_delete(self):
+        post = BlogPost.objects.create(title='Title', content='text')
+        deleted = []
+        post_delete.connect(lambda instance, **kwargs: deleted.append(instance.pk), sender=BlogPost, weak=False,
+                            dispatch_uid='test-delete')
+        self.addCleanup(post_delete.disconnect, sender=BlogPost, dispatch_uid='test-delete')
+        self.assertEqual(self.client.delete(f'/api/blog/{post.pk}').status_code, 200)
+        self.assertEqual(deleted, [post.pk])
+
+
+class PartialSchemaTests(SimpleTestCase):
+    class ItemIn(Schema):
+        title: str = Field(max_length=5)
+        count: int
+
+        @field_validator('title')
+        @classmethod
+        def not_blank(cls, value):
+            if not value.strip():
+                raise ValueError('blank')
+            return value
+
+    def test_fields_are_optional_but_keep_their_validation(self):
+        schema = partial_schema(self.ItemIn)
+        self.assertTrue(issubclass(schema, self.ItemIn))
+        self.assertEqual(schema(count=2).dict(exclude_unset=True), {'count': 2})
+        for title in (' ', 'too long', None):
+            with self.assertRaises(ValidationError):
+                schema(title=title)
+
+
+class RenderingTests(ApiTestCase):
+    def test_content_is_escaped_linked_and_measured(self):
+        content = 'Hello <script>alert(1)</script>\nline two\n\nSee https://example.com ' + 'word ' * 400
+        post = self.send('post', '/api/blog', {'title': 'Post', 'content': content}).json()
+        self.assertNotIn('<script>', post['content_html'])
+        self.assertIn('&lt;script&gt;alert(1)&lt;/script&gt;<br>line two</p>', post['content_html'])
+        self.assertIn('<a href="https://example.com" rel="nofollow">https://example.com</a>', post['content_html'])
+        self.assertEqual((post['word_count'], post['reading_time']), (406, 3))
+        self.assertTrue(post['excerpt'].endswith('…'))
+        self.assertLessEqual(len(post['excerpt']), EXCERPT_LENGTH + 1)
+
+    def test_every_write_path_renders(self):
+        post = BlogPost.objects.create(title='Post', content='one')
+        self.assertEqual(post.content_html, '<p>one</p>')
+        self.send('put', f'/api/blog/{post.pk}', {'title': 'Post', 'content': 'two'})
+        self.send('put', '/api/blog/bulk', [{'id': post.pk, 'title': 'Post', 'content': 'three words here'}])
+        post.refresh_from_db()
+        self.assertEqual((post.content_html, post.word_count), ('<p>three words here</p>', 3))
+
+    def test_save_limited_to_content_writes_the_rendering(self):
+        post = BlogPost.objects.create(title='Post', content='one')
+        post.content = 'two words'
+        post.save(update_fields=['content'])
+        post.refresh_from_db()
+        self.assertEqual((post.content_html, post.word_count), ('<p>two words</p>', 2))
+
+
+@override_settings(API_METRICS_TOKEN='secret')
+class OperatorEndpointTests(ApiTestCase):
+    URLS = ['/api/metrics', '/api/cache/stats']
+
+    def test_anonymous_requests_are_refused(self):
+        for url in self.URLS:
+            self.assertEqual(self.client.get(url).status_code, 403)
+            self.assertEqual(self.client.get(url, headers={'Authorization': 'Bearer wrong'}).status_code, 403)
+
+    def test_token_and_staff_are_let_in(self):
+        for url in self.URLS:
+            self.assertEqual(self.client.get(url, headers={'Authorization': 'Bearer secret'}).status_code, 200)
+        self.client.force_login(User.objects.create_user('operator', is_staff=True))
+        for url in self.URLS:
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    @override_settings(API_METRICS_TOKEN='')
+    def test_no_token_configured_lets_no_token_in(self):
+        self.assertEqual(self.client.get(self.URLS[0], headers={'Authorization': 'Bearer '}).status_code, 403)
+
+
+class IncrementalImportTests(ApiTestCase):
+    def import_weights(self, records, *options):
+        path = os.path.join(self.directory, 'weight_data.json')
+        with open(path, 'w') as f:
+            json.dump(records, f)
+        call_command('load_weight_data', path, '--incremental', *options, stdout=StringIO())
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_watermark_skips_imported_days_and_files(self):
+        records = [{'date': f'2025-01-{day:02}', 'weight': 80 + day / 10} for day in range(1, 11)]
+        self.import_weights(records)
+        watermark = ImportWatermark.objects.get(source='health_weight')
+        self.assertEqual((HealthWeight.objects.count(), watermark.last_date), (10, date(2025, 1, 10)))
+        self.assertEqual(HealthWeightStats.objects.count(), 10)
+
+        # Days before the watermark are ignored; the watermark day itself is re-applied
+        records[0]['weight'] = 99
+        records[9]['weight'] = 90
+        records.append({'date': '2025-01-11', 'weight': 81})
+        self.import_weights(records)
+        self.assertEqual(HealthWeight.objects.get(date=date(2025, 1, 1)).weight, Decimal('80.10'))
+        self.assertEqual(HealthWeight.objects.get(date=date(2025, 1, 10)).weight, 90)
+        self.assertEqual(HealthWeightStats.objects.get(date=date(2025, 1, 11)).running_max, 90)
+
+        # The same file again is skipped outright, --full re-applies everything
+        updated_at = ImportWatermark.objects.get().updated_at
+        self.import_weights(records)
+        self.assertEqual(ImportWatermark.objects.get().updated_at, updated_at)
+        self.import_weights(records, '--full')
+        self.assertEqual(HealthWeight.objects.get(date=date(2025, 1, 1)).weight, 99)
+
+
+class ParseHealthDataTests(SimpleTestCase):
+    """parse_health_data.py: the chunked scanner against the single-pass parsers"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.mkdtemp()
+        cls.export = os.path.join(cls.directory, 'export.xml')
+        # 200 records a day over 20 days, six record types
+        write_synthetic_export(cls.export, 4000)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory)
+        super().tearDownClass()
+
+    def parse(self, parser, *args, **kwargs):
+        with redirect_stdout(StringIO()):
+            return parser(self.export, *args, **kwargs)
+
+    def test_chunks_start_at_records_and_cover_the_file(self):
+        # Far smaller than a record's ~250 bytes apart, so windows land mid-record
+        chunks = parse_health_data.find_chunks(self.export, 100)
+        self.assertGreater(len(chunks), 100)
+        self.assertEqual((chunks[0][0], chunks[-1][1]), (0, os.path.getsize(self.export)))
+        self.assertTrue(all(end == start for (_, end), (start, _) in zip(chunks, chunks[1:])))
+        with open(self.export, 'rb') as f:
+            for start, _ in chunks[1:]:
+                f.seek(start)
+                self.assertEqual(f.read(len(parse_health_data.RECORD_TAG)), parse_health_data.RECORD_TAG)
+
+    def test_chunking_never_changes_the_results(self):
+        single = self.parse(parse_health_data.parse_metrics, workers=1, chunk_size=1 << 30)
+        self.assertEqual(set(single), set(parse_health_data.EXTRACTORS))
+        for chunk_size in (100, 1000, 4096):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(self.parse(parse_health_data.parse_metrics, workers=1, chunk_size=chunk_size), single)
+        self.assertEqual(self.parse(parse_health_data.parse_metrics, workers=2, chunk_size=4096), single)
+
+    def test_weight_parsers_agree(self):
+        chunked = [
+            {'date': row['date'], 'weight': row['value'], 'unit': row['unit']}
+            for row in self.parse(parse_health_data.parse_metrics, ['body_mass'], workers=1, chunk_size=1000)['body_mass']
+        ]
+        self.assertEqual(len(chunked), 20)
+        self.assertEqual(self.parse(parse_health_data.parse_weight_data), chunked)
+        self.assertEqual(self.parse(parse_health_data.parse_weight_data_streaming), chunked)
+
+    def test_incremental_parse_resumes_at_the_watermark(self):
+        full = self.parse(parse_health_data.parse_weight_data_streaming)
+        data, state = self.parse(parse_health_data.parse_weight_data_incremental, {})
+        self.assertEqual(data, full)
+        self.assertEqual(state['last_start_date'][:10], full[-1]['date'])
+
+        # Unchanged export: nothing to do
+        self.assertEqual(self.parse(parse_health_data.parse_weight_data_incremental, state), ([], None))
+
+        # The watermark day itself is re-read
+        since = {'last_start_date': f"{full[10]['date']} 00:00:00 +0000"}
+        data, _ = self.parse(parse_health_data.parse_weight_data_incremental, since)
+        self.assertEqual(data, full[10:])
@@ -0,0 +1,193 @@
+from collections import deque
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Avg, Count, Max, Min
+from django.db.models.functions import TruncMonth, TruncWeek
+
+from .caching import invalidate_model
+from .models import HealthWeight, HealthWeightStats
+
+
+RESOLUTIONS = {
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+
+def bucket_rows(queryset, resolution):
+    """Weekly or monthly min/mean/max buckets, aggregated in SQL"""
+    trunc = RESOLUTIONS[resolution]
+    return (
+        queryset.order_by()
+        .annotate(period=trunc('date'))
+        .values('period')
+        .annotate(
+            mean=Avg('weight'),
+            min_weight=Min('weight'),
+            max_weight=Max('weight'),
+            count=Count('id'),
+            unit=Max('unit'),
+        )
+        .order_by('period')
+    )
+
+
+def bucket_point(row):
+    return {
+        'date': row['period'],
+        'weight': round(float(row['mean']), 2),
+        'unit': row['unit'],
+        'min_weight': float(row['min_weight']),
+        'max_weight': float(row['max_weight']),
+        'count': row['count'],
+    }
+
+
+def bucket_weights(queryset, resolution):
+    """Aggregate weights into weekly or monthly min/mean/max buckets in SQL"""
+    return [bucket_point(row) for row in bucket_rows(queryset, resolution)]
+
+
+def lttb(points, threshold, x=lambda point: point['date'].toordinal(), y=lambda point: float(point['weight'])):
+    """Largest-Triangle-Three-Buckets downsampling
+
+    Keeps the first and last points and, from each of threshold - 2 buckets in
+    between, the point forming the largest triangle with its neighbours, so
+    peaks and dips in the chart survive.
+    """
+    if threshold >= len(points) or threshold < 3:
+        return list(points)
+
+    sampled = [points[0]]
+    bucket_size = (len(points) - 2) / (threshold - 2)
+    selected = 0
+
+    for i in range(threshold - 2):
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+
+        # Average of the next bucket is the third vertex of the triangle
+        next_start = end
+        next_end = min(int((i + 2) * bucket_size) + 1, len(points))
+        next_bucket = points[next_start:next_end]
+        avg_x = sum(x(p) for p in next_bucket) / len(next_bucket)
+        avg_y = sum(y(p) for p in next_bucket) / len(next_bucket)
+
+        ax, ay = x(points[selected]), y(points[selected])
+        best_area = -1
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (y(points[j]) - ay) - (ax - x(points[j])) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                selected = j
+
+        sampled.append(points[selected])
+
+    sampled.append(points[-1])
+    return sampled
+
+
+def downsample_weights(queryset, resolution='day', max_points=None):
+    """Weights at the requested resolution, capped at max_points with LTTB"""
+    if resolution in RESOLUTIONS:
+        points = bucket_weights(queryset, resolution)
+    elif max_points:
+        points = list(queryset.values('date', 'weight', 'unit'))
+    else:
+        return queryset
+
+    if max_points:
+        points = lttb(points, max_points)
+    return points
+
+
+async def adownsample_weights(queryset, resolution='day', max_points=None):
+    """downsample_weights for async views, reading with the async ORM"""
+    if resolution in RESOLUTIONS:
+        points = [bucket_point(row) async for row in bucket_rows(queryset, resolution)]
+    elif max_points:
+        points = [point async for point in queryset.values('date', 'weight', 'unit')]
+    else:
+        return queryset
+
+    if max_points:
+        points = lttb(points, max_points)
+    return points
+
+
+class RollingWindow:
+    """Mean of the readings within the last N calendar days, updated in O(1) per reading"""
+
+    def __init__(self, days):
+        self.days = days
+        self.readings = deque()
+        self.total = 0.0
+
+    def push(self, day, weight):
+        self.readings.append((day, weight))
+        self.total += weight
+        while self.readings[0][0] <= day - timedelta(days=self.days):
+            self.total -= self.readings.popleft()[1]
+        return self.total / len(self.readings)
+
+
+def refresh_weight_stats(since=None, batch_size=1000):
+    """Recompute HealthWeightStats from since (a date) onwards, or all of it
+
+    Only the 30 days before since are re-read to warm up the windows; running
+    min/max carry on from the last stats row before since. Without such a row
+    (e.g. stats never built) but with readings before since, all of it is
+    recomputed, since there is nothing to carry on from.
+    """
+    with transaction.atomic():
+        weights = HealthWeight.objects.order_by('date')
+        previous = None
+        if since is not None:
+            previous = HealthWeightStats.objects.filter(date__lt=since).order_by('-date').first()
+            if previous is None and HealthWeight.objects.filter(date__lt=since).exists():
+                since = None
+            else:
+                weights = weights.filter(date__gte=since - timedelta(days=30))
+
+        week = RollingWindow(7)
+        month = RollingWindow(30)
+        running_min = previous.running_min if previous else None
+        running_max = previous.running_max if previous else None
+        last_date = previous.date if previous else None
+        last_weight = previous.weight if previous else None
+
+        rows = []
+        for day, weight, unit in weights.values_list('date', 'weight', 'unit').iterator():
+            weight = float(weight)
+            ma_7 = week.push(day, weight)
+            ma_30 = month.push(day, weight)
+            if since is not None and day < since:
+                continue
+
+            running_min = weight if running_min is None else min(running_min, weight)
+            running_max = weight if running_max is None else max(running_max, weight)
+            rate = None
+            if last_date is not None:
+                rate = round((weight - last_weight) / (day - last_date).days, 4)
+            last_date, last_weight = day, weight
+
+            rows.append(HealthWeightStats(
+                date=day,
+                weight=weight,
+                ma_7=round(ma_7, 3),
+                ma_30=round(ma_30, 3),
+                rate_of_change=rate,
+                running_min=running_min,
+                running_max=running_max,
+                unit=unit,
+            ))
+
+        stale = HealthWeightStats.objects.all()
+        if since is not None:
+            stale = stale.filter(date__gte=since)
+        stale.delete()
+        HealthWeightStats.objects.bulk_create(rows, batch_size=batch_size)
+
+    invalidate_model(HealthWeightStats)
+    return len(rows)
@@ -0,0 +1,162 @@
+"""
+Benchmark the API as sync views under WSGI threads against async views under one event loop
+
+Usage: python -m benchmarks.async_api [--concurrency 1,50,500] [--requests 1000] [--rows 5000]
+
+Each mode runs in a fresh subprocess, since API_ASYNC is read at import:
+wsgi (API_ASYNC=False, a thread per client through the test Client) and
+asgi (API_ASYNC=True, a task per client through the AsyncClient). Responses
+are uncached so every request reaches the database. Both clients run the
+full request/response cycle in-process, without a server in front, so the
+numbers compare the views and the ORM rather than uvicorn and gunicorn.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+from benchmarks.django_setup import setup_django
+from benchmarks.sqlite_profile import percentile
+
+
+MODES = {
+    'wsgi': {'API_ASYNC': 'False'},
+    'asgi': {'API_ASYNC': 'True'},
+}
+
+URLS = [
+    '/api/blog?limit=20',
+    '/api/blog/1',
+    '/api/health/weight?days=365&max_points=100',
+    '/api/health/weight/all?limit=200',
+    '/api/bootstrap',
+]
+
+
+def seed(rows):
+    from django.db import connection
+    from api.models import BlogPost, HealthWeight
+    from api.rendering import render_instance
+
+    posts = [BlogPost(title=f"Post {i}", content=f"Body of post {i}. " * 50) for i in range(50)]
+    for post in posts:
+        render_instance(post)  # bulk_create() sends no pre_save
+    BlogPost.objects.bulk_create(posts)
+    HealthWeight.objects.bulk_create(
+        HealthWeight(date=date.today() - timedelta(days=i), weight=70 + (i % 100) / 10, unit='kg')
+        for i in range(rows)
+    )
+    connection.close()
+
+
+def run_threads(concurrency, total):
+    """`concurrency` threads, each with its own client, sharing `total` requests"""
+    from django.db import connection
+    from django.test import Client
+
+    latencies, errors = [], []
+    counter = iter(range(total))
+    lock = threading.Lock()
+
+    def client_loop():
+        client = Client()
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                break
+            started = time.perf_counter()
+            status = client.get(URLS[i % len(URLS)]).status_code
+            (latencies if status == 200 else errors).append(time.perf_counter() - started)
+        connection.close()
+
+    threads = [threading.Thread(target=client_loop) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, time.perf_counter() - started
+
+
+def run_tasks(concurrency, total):
+    """`concurrency` tasks on one event loop, each with its own client, sharing `total` requests"""
+    from django.test import AsyncClient
+
+    latencies, errors = [], []
+    counter = iter(range(total))
+
+    async def client_loop():
+        client = AsyncClient()
+        for i in counter:
+            started = time.perf_counter()
+            status = (await client.get(URLS[i % len(URLS)])).status_code
+            (latencies if status == 200 else errors).append(time.perf_counter() - started)
+
+    async def main():
+        await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+
+    started = time.perf_counter()
+    asyncio.run(main())
+    return latencies, errors, time.perf_counter() - started
+
+
+def child(args):
+    """Run every concurrency level under the current environment's mode and print JSON"""
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(os.path.join(tmp, 'bench.sqlite3'))
+        from django.conf import settings
+
+        seed(args.rows)
+        run = run_tasks if settings.API_ASYNC else run_threads
+        run(1, len(URLS))  # warm up imports and the connection
+
+        results = {}
+        for concurrency in args.concurrency:
+            latencies, errors, elapsed = run(concurrency, args.requests)
+            results[concurrency] = {
+                'req/s': len(latencies) / elapsed,
+                'p50 ms': percentile(latencies, 50) * 1000,
+                'p95 ms': percentile(latencies, 95) * 1000,
+                'errors': len(errors),
+            }
+    print(json.dumps(results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--concurrency', default='1,50,500',
+                        type=lambda value: [int(level) for level in value.split(',')],
+                        help='Comma-separated numbers of concurrent clients')
+    parser.add_argument('--requests', type=int, default=1000, help='Requests per concurrency level')
+    parser.add_argument('--rows', type=int, default=5000, help='Weight rows to seed')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return child(args)
+
+    passthrough = [f"--concurrency={','.join(map(str, args.concurrency))}",
+                   f"--requests={args.requests}", f"--rows={args.rows}"]
+    columns = [('req/s', ',.0f'), ('p50 ms', '.1f'), ('p95 ms', '.1f'), ('errors', 'd')]
+    print(f"{'mode':<8}{'clients':>8}" + ''.join(f"{name:>12}" for name, _ in columns))
+    for mode, env in MODES.items():
+        environ = {**os.environ, **env, 'API_CACHE_ENABLED': 'False'}
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.async_api', '--child', *passthrough],
+            env=environ, check=True, capture_output=True, text=True,
+        ).stdout
+        for concurrency, result in json.loads(output.strip().splitlines()[-1]).items():
+            cells = [format(result[name], spec) for name, spec in columns]
+            print(f"{mode:<8}{concurrency:>8}" + ''.join(f"{cell:>12}" for cell in cells))
+
+
+if __name__ == '__main__':
+    main()
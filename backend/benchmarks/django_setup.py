@@ -0,0 +1,31 @@
+"""
+Point Django at a throwaway SQLite database for benchmarking
+"""
+
+import os
+import sys
+
+
+def setup_django(db_path, pragmas=None):
+    """Configure settings against db_path, run django.setup() and migrate
+
+    pragmas are added to SQLITE_PRAGMAS for every connection.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+    import django
+    from django.conf import settings
+
+    settings.DATABASES['default']['NAME'] = str(db_path)
+    # Cached responses from another database must never be served
+    settings.CACHES[settings.API_CACHE_ALIAS]['LOCATION'] = os.path.join(os.path.dirname(str(db_path)), 'api-cache')
+    if pragmas:
+        settings.SQLITE_PRAGMAS = {**settings.SQLITE_PRAGMAS, **pragmas}
+    # Development-only EXPLAINs and logging would skew the timings
+    settings.API_QUERY_GUARD = False
+    if 'testserver' not in settings.ALLOWED_HOSTS:
+        settings.ALLOWED_HOSTS.append('testserver')
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0, stdout=sys.stderr)
@@ -0,0 +1,106 @@
+"""
+Benchmark the Apple Health export parser on a synthetic export
+
+Usage: python -m benchmarks.health_parser [--records 1000000] [--mode stream|tree|metrics|all]
+                                          [--workers 1,2,4,8]
+"""
+
+import argparse
+import contextlib
+import functools
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+
+import parse_health_data
+from benchmarks.synthetic import write_synthetic_export
+
+
+MODES = {
+    'tree': parse_health_data.parse_weight_data,
+    'stream': parse_health_data.parse_weight_data_streaming,
+}
+
+
+def run(parse, xml_file, weight_count, n_records):
+    """Time one parse, then repeat it under tracemalloc for peak memory"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        data = parse(xml_file)
+        elapsed = time.perf_counter() - started
+
+        tracemalloc.start()
+        parse(xml_file)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        'seconds': elapsed,
+        'records_per_sec': n_records / elapsed,
+        'weights_per_sec': weight_count / elapsed,
+        'peak_mb': peak / 1024 / 1024,
+        'days': len(data),
+    }
+
+
+def run_metrics(xml_file, n_records, workers):
+    """Time a full multi-metric pass with the given number of worker processes"""
+    parse = functools.partial(parse_health_data.parse_metrics, workers=workers)
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        data = parse(xml_file)
+        elapsed = time.perf_counter() - started
+
+    return {
+        'seconds': elapsed,
+        'records_per_sec': n_records / elapsed,
+        'days': sum(len(rows) for rows in data.values()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--records', type=int, default=1_000_000, help='Total Record elements to generate')
+    parser.add_argument('--mode', choices=['stream', 'tree', 'metrics', 'all'], default='all')
+    parser.add_argument('--workers', default=None,
+                        help='Comma list of worker counts for the metrics mode (default: 1,2,4,... up to CPU count)')
+    args = parser.parse_args()
+
+    modes = list(MODES) if args.mode == 'all' else [args.mode] if args.mode in MODES else []
+    if args.workers:
+        worker_counts = [int(n) for n in args.workers.split(',')]
+    else:
+        cpus = os.cpu_count() or 1
+        worker_counts = sorted({min(2 ** i, cpus) for i in range(cpus.bit_length() + 1)})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        xml_file = os.path.join(tmp, 'export.xml')
+        print(f"🛠  Generating {args.records:,} records...")
+        weight_count = write_synthetic_export(xml_file, args.records)
+        size_mb = os.path.getsize(xml_file) / 1024 / 1024
+        print(f"📂 {xml_file} ({size_mb:.1f} MB, {weight_count:,} weight records)\n")
+
+        print(f"{'mode':<8}{'seconds':>10}{'records/s':>14}{'weights/s':>12}{'peak MB':>10}{'days':>8}")
+        for mode in modes:
+            result = run(MODES[mode], xml_file, weight_count, args.records)
+            print(
+                f"{mode:<8}{result['seconds']:>10.2f}{result['records_per_sec']:>14,.0f}"
+                f"{result['weights_per_sec']:>12,.0f}{result['peak_mb']:>10.1f}{result['days']:>8}"
+            )
+
+        if args.mode in ('metrics', 'all'):
+            print(f"\n{'workers':<8}{'seconds':>10}{'records/s':>14}{'speedup':>10}{'days':>8}")
+            baseline = None
+            for workers in worker_counts:
+                result = run_metrics(xml_file, args.records, workers)
+                baseline = baseline or result['seconds']
+                print(
+                    f"{workers:<8}{result['seconds']:>10.2f}{result['records_per_sec']:>14,.0f}"
+                    f"{baseline / result['seconds']:>9.2f}x{result['days']:>8}"
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""
+Benchmark the list endpoints with and without the models' Meta.indexes
+
+Usage: python -m benchmarks.indexes [--rows 1000000] [--requests 10]
+
+Seeds --rows rows into each ordered content table, then times each list's
+first page, a page from the middle (by keyset cursor) and /api/bootstrap:
+first with every Meta.indexes index dropped, then after recreating them.
+Responses are uncached, so every request reaches the database.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.django_setup import setup_django
+from benchmarks.sqlite_profile import percentile
+
+
+TEXT = 'Notes on django, sqlite and keeping list endpoints fast as tables grow. ' * 3
+
+# table -> (columns, SELECT over n = 1..rows); values are spread so no ordering follows insertion
+SEED_SQL = {
+    'api_blogpost': (
+        'title, content, content_html, excerpt, word_count, reading_time, render_version, created_at, updated_at',
+        "'Post ' || n, %s, '', '', 0, 0, 0, datetime('2015-01-01', '+' || (abs(random()) %% 315360000) || ' seconds'), "
+        "datetime('now')",
+    ),
+    'api_projects': (
+        'name, description, languages, created_at, updated_at',
+        "'Project ' || n, %s, 'Python', datetime('2015-01-01', '+' || (abs(random()) %% 315360000) || ' seconds'), "
+        "datetime('now')",
+    ),
+    'api_novels': (
+        'title, author, description, created_at, updated_at',
+        "'Novel ' || abs(random()), 'Author', %s, datetime('now'), datetime('now')",
+    ),
+    'api_shortstories': (
+        'title, author, description, created_at, updated_at',
+        "'Story ' || abs(random()), 'Author', %s, datetime('now'), datetime('now')",
+    ),
+    'api_workexperience': (
+        'company, position, start_date, description, created_at, updated_at',
+        "'Company ' || n, 'Engineer', date('1970-01-01', '+' || (abs(random()) %% 20000) || ' days'), %s, "
+        "datetime('now'), datetime('now')",
+    ),
+}
+
+LISTS = {
+    'BlogPost': '/api/blog',
+    'Projects': '/api/projects',
+    'Novels': '/api/novels',
+    'ShortStories': '/api/shortstories',
+    'WorkExperience': '/api/work-experience',
+}
+
+
+def seed(rows):
+    from django.db import connection, transaction
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        for table, (columns, select) in SEED_SQL.items():
+            cursor.execute(
+                f"WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < %s) "
+                f"INSERT INTO {table} ({columns}) SELECT {select} FROM seq",
+                [rows, TEXT],
+            )
+
+
+def middle_cursor(model, rows):
+    """The next-page cursor of the row halfway down the list's ordering"""
+    from api.pagination import encode_cursor, keyset_ordering
+
+    keys = keyset_ordering(model.objects.all())
+    order_by = [f"{'-' if descending else ''}{field}" for field, descending in keys]
+    row = model.objects.order_by(*order_by).values(*(field for field, _ in keys))[rows // 2]
+    return encode_cursor([row[field] for field, _ in keys], 'next')
+
+
+def indexed_models():
+    from django.apps import apps
+
+    return [model for model in apps.get_app_config('api').get_models() if model._meta.indexes]
+
+
+def set_indexes(add):
+    """Drop or (re)create every Meta.indexes index, returning the seconds it took"""
+    from django.db import connection
+
+    started = time.perf_counter()
+    with connection.schema_editor() as editor:
+        for model in indexed_models():
+            for index in model._meta.indexes:
+                (editor.add_index if add else editor.remove_index)(model, index)
+    return time.perf_counter() - started
+
+
+def timings(client, urls, requests):
+    """p50 ms per name of `requests` uncached GETs, after one warm-up"""
+    results = {}
+    for name, url in urls.items():
+        client.get(url)
+        latencies = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            response = client.get(url)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                raise RuntimeError(f"GET {url} returned {response.status_code}")
+        results[name] = percentile(latencies, 50) * 1000
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Rows seeded into each content table')
+    parser.add_argument('--requests', type=int, default=10, help='Timed requests per URL and phase')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(os.path.join(tmp, 'bench.sqlite3'), pragmas={'synchronous': 'OFF'})
+        from django.apps import apps
+        from django.test import Client, override_settings
+
+        started = time.perf_counter()
+        seed(args.rows)
+        print(f"🛠  Seeded {args.rows:,} rows into {len(SEED_SQL)} tables in {time.perf_counter() - started:.0f} s")
+
+        urls = {}
+        for name, url in LISTS.items():
+            model = apps.get_model('api', name)
+            urls[f"{url} first page"] = url
+            urls[f"{url} middle page"] = f"{url}?cursor={middle_cursor(model, args.rows)}"
+        urls['/api/bootstrap'] = '/api/bootstrap'
+
+        client = Client()
+        with override_settings(API_CACHE_ENABLED=False):
+            set_indexes(add=False)
+            without = timings(client, urls, args.requests)
+            built = set_indexes(add=True)
+            with_indexes = timings(client, urls, args.requests)
+
+    print(f"⏱  Built {sum(len(model._meta.indexes) for model in indexed_models())} indexes in {built:.1f} s")
+    print(f"{'request':<36}{'without ms':>12}{'with ms':>12}{'speedup':>10}")
+    for name in urls:
+        print(f"{name:<36}{without[name]:>12.1f}{with_indexes[name]:>12.1f}{without[name] / with_indexes[name]:>9.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark response rendering per endpoint: stdlib JSON vs orjson vs orjson with trusted output
+
+Usage: python -m benchmarks.json_output [--rows 20000] [--repeat 20]
+
+stdlib is Ninja's JSONRenderer, orjson is FastJSONRenderer, and trusted
+adds API_TRUSTED_OUTPUT=True (no schema validation on the health endpoints).
+Responses are uncached; each cell is the median of --repeat requests.
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+from benchmarks.django_setup import setup_django
+
+
+ENDPOINTS = [
+    '/api/health/weight/all?limit=5000',
+    '/api/health/weight?days=3650',
+    '/api/health/weight?days=3650&resolution=week',
+    '/api/health/weight/stats?days=3650',
+    '/api/health/metrics/steps?days=3650',
+    '/api/blog?limit=100',
+    '/api/bootstrap',
+]
+
+
+def seed(rows):
+    from api.models import BlogPost, HealthMetric, HealthWeight
+    from api.rendering import render_instance
+    from api.timeseries import refresh_weight_stats
+
+    today = date.today()
+    HealthWeight.objects.bulk_create(
+        HealthWeight(date=today - timedelta(days=i), weight=f"{70 + (i % 100) / 10:.2f}", unit='kg')
+        for i in range(rows)
+    )
+    HealthMetric.objects.bulk_create(
+        HealthMetric(metric='steps', date=today - timedelta(days=i), value=5000 + i % 3000, unit='count')
+        for i in range(rows)
+    )
+    posts = [BlogPost(title=f"Post {i}", content=f"Body of post {i}. " * 200) for i in range(100)]
+    for post in posts:
+        render_instance(post)  # bulk_create() sends no pre_save
+    BlogPost.objects.bulk_create(posts)
+    refresh_weight_stats()
+
+
+def time_endpoint(client, url, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(url)
+        samples.append(time.perf_counter() - started)
+        assert response.status_code == 200, (url, response.status_code)
+    return statistics.median(samples) * 1000, len(response.content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20_000, help='Weight and metric rows to seed')
+    parser.add_argument('--repeat', type=int, default=20, help='Requests per endpoint and mode')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(os.path.join(tmp, 'bench.sqlite3'))
+        from django.test import Client, override_settings
+        from ninja.renderers import JSONRenderer
+        from api.api import api
+        from api.renderers import FastJSONRenderer, orjson
+
+        seed(args.rows)
+        modes = [
+            ('stdlib', JSONRenderer(), False),
+            ('orjson', FastJSONRenderer(), False),
+            ('trusted', FastJSONRenderer(), True),
+        ]
+        if orjson is None:
+            print("orjson is not installed: the orjson and trusted columns use the stdlib encoder")
+
+        client = Client()
+        print(f"{'endpoint':<46}{'KiB':>8}" + ''.join(f"{name + ' ms':>13}" for name, _, _ in modes))
+        for url in ENDPOINTS:
+            cells = []
+            for _, renderer, trusted in modes:
+                api.renderer = renderer
+                with override_settings(API_CACHE_ENABLED=False, API_TRUSTED_OUTPUT=trusted):
+                    client.get(url)  # warm up
+                    ms, size = time_endpoint(client, url, args.repeat)
+                cells.append(ms)
+            print(f"{url:<46}{size / 1024:>8,.0f}" + ''.join(f"{ms:>13.1f}" for ms in cells))
+
+
+if __name__ == '__main__':
+    main()
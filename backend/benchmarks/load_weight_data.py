@@ -0,0 +1,70 @@
+"""
+Benchmark load_weight_data: per-row update_or_create vs bulk upsert
+
+Usage: python -m benchmarks.load_weight_data [--rows 10000] [--batch-size 1000] [--skip-rowwise]
+"""
+
+import argparse
+import io
+import json
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+from benchmarks.django_setup import setup_django
+
+
+def write_weight_json(path, rows, offset=0.0):
+    """Write rows consecutive days of weight data in the parse_health_data.py format"""
+    start = date(1800, 1, 1)
+    data = [
+        {
+            'date': (start + timedelta(days=i)).isoformat(),
+            'weight': round(70 + (i % 100) / 10 + offset, 2),
+            'unit': 'kg',
+        }
+        for i in range(rows)
+    ]
+    with open(path, 'w') as f:
+        json.dump(data, f)
+
+
+def timed_load(json_file, **options):
+    from django.core.management import call_command
+
+    started = time.perf_counter()
+    call_command('load_weight_data', json_file, stdout=io.StringIO(), **options)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--skip-rowwise', action='store_true', help='Only time the bulk path')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(os.path.join(tmp, 'bench.sqlite3'))
+        from api.models import HealthWeight
+
+        insert_file = os.path.join(tmp, 'insert.json')
+        update_file = os.path.join(tmp, 'update.json')
+        write_weight_json(insert_file, args.rows)
+        write_weight_json(update_file, args.rows, offset=0.5)
+
+        paths = [('bulk', {'bulk': True, 'batch_size': args.batch_size})]
+        if not args.skip_rowwise:
+            paths.insert(0, ('rowwise', {}))
+
+        print(f"{'path':<10}{'phase':<8}{'rows':>10}{'seconds':>10}{'rows/s':>12}")
+        for name, options in paths:
+            HealthWeight.objects.all().delete()
+            for phase, json_file in (('insert', insert_file), ('update', update_file)):
+                elapsed = timed_load(json_file, **options)
+                print(f"{name:<10}{phase:<8}{args.rows:>10,}{elapsed:>10.2f}{args.rows / elapsed:>12,.0f}")
+
+
+if __name__ == '__main__':
+    main()
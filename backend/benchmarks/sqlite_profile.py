@@ -0,0 +1,158 @@
+"""
+Benchmark the SQLite performance profile: concurrent reads, and reads and writes together
+
+Usage: python -m benchmarks.sqlite_profile [--readers 8] [--seconds 5] [--rows 20000] [--writes 200]
+
+Each profile runs in a fresh subprocess, since settings are read at import:
+default (rollback journal, a connection per request) and performance
+(SQLITE_PERFORMANCE=True: WAL, mmap, CONN_MAX_AGE, ...).
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+from benchmarks.django_setup import setup_django
+
+
+PROFILES = {
+    'default': {'SQLITE_PERFORMANCE': 'False'},
+    'performance': {'SQLITE_PERFORMANCE': 'True'},
+}
+
+READ_URL = '/api/health/weight/all?limit=50'
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    return statistics.quantiles(samples, n=100, method='inclusive')[pct - 1] if len(samples) > 1 else samples[0]
+
+
+def reader(stop, latencies, errors):
+    """Hit the API through the test client until stopped; each request opens or reuses a connection"""
+    from django.db import connection
+    from django.test import Client
+
+    client = Client()
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            status = client.get(READ_URL).status_code
+        except Exception:
+            status = None
+        if status == 200:
+            latencies.append(time.perf_counter() - started)
+        else:
+            errors.append(status)
+    connection.close()
+
+
+def writer(rows, latencies, errors):
+    """Single-row upserts, like edits from admin or the row-by-row loader"""
+    from django.db import OperationalError, connection
+    from api.models import HealthWeight
+
+    start = date(1800, 1, 1)
+    for i in range(rows):
+        started = time.perf_counter()
+        try:
+            HealthWeight.objects.update_or_create(
+                date=start + timedelta(days=i), defaults={'weight': 75 + (i % 50) / 10, 'unit': 'kg'}
+            )
+            latencies.append(time.perf_counter() - started)
+        except OperationalError as exc:
+            errors.append(str(exc))
+    connection.close()
+
+
+def run_readers(count, seconds, during=None):
+    """Readers for `seconds`, or for as long as `during` (a thread) runs"""
+    stop = threading.Event()
+    latencies, errors = [], []
+    threads = [threading.Thread(target=reader, args=(stop, latencies, errors)) for _ in range(count)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    if during is not None:
+        during.start()
+        during.join()
+    else:
+        time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {
+        'reads/s': len(latencies) / elapsed,
+        'read p95 ms': percentile(latencies, 95) * 1000,
+        'read errors': len(errors),
+    }
+
+
+def child(args):
+    """Run the benchmark under the current environment's profile and print JSON"""
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(os.path.join(tmp, 'bench.sqlite3'))
+        from django.db import connection
+        from api.models import HealthWeight
+
+        HealthWeight.objects.bulk_create(
+            HealthWeight(date=date(1900, 1, 1) + timedelta(days=i), weight=70 + (i % 100) / 10, unit='kg')
+            for i in range(args.rows)
+        )
+        connection.close()
+
+        results = {'reads only': run_readers(args.readers, args.seconds)}
+
+        write_latencies, write_errors = [], []
+        write = threading.Thread(target=writer, args=(args.writes, write_latencies, write_errors))
+        mixed = run_readers(args.readers, None, during=write)
+        mixed.update({
+            'write p50 ms': percentile(write_latencies, 50) * 1000,
+            'write p95 ms': percentile(write_latencies, 95) * 1000,
+            'write errors': len(write_errors),
+        })
+        results['reads + writes'] = mixed
+
+    print(json.dumps(results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--readers', type=int, default=8, help='Concurrent reader threads')
+    parser.add_argument('--seconds', type=float, default=5, help='Duration of the read-only phase')
+    parser.add_argument('--rows', type=int, default=20_000, help='Weight rows to seed')
+    parser.add_argument('--writes', type=int, default=200, help='Single-row writes in the mixed phase')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return child(args)
+
+    passthrough = [f"--readers={args.readers}", f"--seconds={args.seconds}",
+                   f"--rows={args.rows}", f"--writes={args.writes}"]
+    columns = [('reads/s', ',.0f'), ('read p95 ms', '.1f'), ('read errors', 'd'),
+               ('write p50 ms', '.1f'), ('write p95 ms', '.1f'), ('write errors', 'd')]
+    print(f"{'profile':<13}{'phase':<16}" + ''.join(f"{name:>14}" for name, _ in columns))
+    for profile, env in PROFILES.items():
+        # Uncached responses, so every read reaches the database
+        environ = {**os.environ, **env, 'API_CACHE_ENABLED': 'False'}
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.sqlite_profile', '--child', *passthrough],
+            env=environ, check=True, capture_output=True, text=True,
+        ).stdout
+        for phase, result in json.loads(output.strip().splitlines()[-1]).items():
+            cells = [format(result[name], spec) if name in result else '-' for name, spec in columns]
+            print(f"{profile:<13}{phase:<16}" + ''.join(f"{cell:>14}" for cell in cells))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,391 @@
+"""
+Benchmark suite: every API endpoint and the import tools against stored baselines
+
+Usage: python -m benchmarks.suite [--scale 1] [--requests 30] [--only blog,health]
+                                  [--tolerance 0.5] [--update-baselines]
+
+Seeds a throwaway database with benchmarks.synthetic.seed_database, then
+reports p50/p95 latency, queries and peak traced memory per scenario.
+Responses are uncached unless a scenario says otherwise, and the database
+runs with synchronous=OFF so disk flushes don't swamp the timings. Exits 1 if any
+API route has no scenario, or if a result regresses past
+benchmarks/baselines.json: any extra query, peak memory over baseline by
+more than --memory-tolerance, or p50/p95 over baseline by more than
+--tolerance. Baselines depend on the machine; refresh them with
+--update-baselines after an intended change.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Callable, Optional
+
+from benchmarks.django_setup import setup_django
+from benchmarks.sqlite_profile import percentile
+
+
+BASELINES = os.path.join(os.path.dirname(__file__), 'baselines.json')
+
+# Timing noise below this is ignored, however large relative to the baseline
+MIN_LATENCY_SLACK_MS = 1.0
+MIN_MEMORY_SLACK_KIB = 64
+
+# Scenario options for the staff/token-only endpoints
+OPERATOR = {
+    'headers': {'Authorization': 'Bearer benchmark'},
+    'settings': {'API_METRICS_TOKEN': 'benchmark'},
+}
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: str  # the route as registered on the API, for the coverage check
+    url: Any  # str, or callable returning one; called untimed before each request
+    body: Any = None  # JSON-able, or callable returning it; called untimed before each request
+    headers: dict = field(default_factory=dict)
+    settings: dict = field(default_factory=dict)
+
+
+@dataclass
+class Tool:
+    name: str
+    run: Callable[[], Any]
+    prepare: Callable[[], Any] = lambda: None  # untimed, before each run
+
+
+def first_id(model):
+    return model.objects.order_by('pk').values_list('pk', flat=True).first()
+
+
+def fresh(model, **values):
+    """URL factory for delete scenarios: a new row per request"""
+    def url(prefix):
+        return f"{prefix}/{model.objects.create(**values).pk}"
+    return url
+
+
+def fresh_ids(model, count, **values):
+    """Body factory for bulk delete scenarios: new rows per request"""
+    def body():
+        return [obj.pk for obj in model.objects.bulk_create([model(**values) for _ in range(count)])]
+    return body
+
+
+def ids_with(model, count, **values):
+    """Bulk update body for the first count rows"""
+    return [{'id': pk, **values} for pk in model.objects.order_by('pk').values_list('pk', flat=True)[:count]]
+
+
+def api_scenarios():
+    from api.models import BlogPost, Novels, Projects, ShortStories, WorkExperience
+
+    blog, project, novel, story, job = (
+        first_id(model) for model in (BlogPost, Projects, Novels, ShortStories, WorkExperience)
+    )
+    post = {'title': 'Benchmark post', 'content': 'Body. ' * 200}
+    project_body = {'name': 'Benchmark project', 'description': 'Description', 'languages': 'Python'}
+    book = {'title': 'Benchmark title', 'author': 'Author', 'description': 'Description'}
+    experience = {'company': 'Benchmark Ltd', 'position': 'Engineer', 'start_date': '2020-01-01', 'description': 'Work'}
+    batch = 20
+
+    return [
+        Scenario('blog list', 'GET', '/blog', '/api/blog'),
+        Scenario('blog list fields', 'GET', '/blog', '/api/blog?fields=id,title&limit=100'),
+        Scenario('blog list cached', 'GET', '/blog', '/api/blog', settings={'API_CACHE_ENABLED': True}),
+        Scenario('blog list 304', 'GET', '/blog', '/api/blog', headers={'If-None-Match': None}),
+        Scenario('blog detail', 'GET', '/blog/{post_id}', f"/api/blog/{blog}"),
+        Scenario('blog create', 'POST', '/blog', '/api/blog', body=post),
+        Scenario('blog update', 'PUT', '/blog/{post_id}', f"/api/blog/{blog}", body=post),
+        Scenario('blog patch', 'PATCH', '/blog/{post_id}', f"/api/blog/{blog}", body={'title': 'Patched'}),
+        Scenario('blog delete', 'DELETE', '/blog/{post_id}', lambda: fresh(BlogPost, **post)('/api/blog')),
+        Scenario('blog bulk create', 'POST', '/blog/bulk', '/api/blog/bulk', body=[post] * batch),
+        Scenario('blog bulk update', 'PUT', '/blog/bulk', '/api/blog/bulk', body=ids_with(BlogPost, batch, **post)),
+        Scenario('blog bulk delete', 'DELETE', '/blog/bulk', '/api/blog/bulk', body=fresh_ids(BlogPost, batch, **post)),
+        Scenario('projects list', 'GET', '/projects', '/api/projects'),
+        Scenario('project detail', 'GET', '/projects/{project_id}', f"/api/projects/{project}"),
+        Scenario('project create', 'POST', '/projects', '/api/projects', body=project_body),
+        Scenario('project update', 'PUT', '/projects/{project_id}', f"/api/projects/{project}", body=project_body),
+        Scenario('project patch', 'PATCH', '/projects/{project_id}', f"/api/projects/{project}",
+                 body={'languages': 'Python, SQL'}),
+        Scenario('project delete', 'DELETE', '/projects/{project_id}',
+                 lambda: fresh(Projects, **project_body)('/api/projects')),
+        Scenario('project bulk create', 'POST', '/projects/bulk', '/api/projects/bulk', body=[project_body] * batch),
+        Scenario('project bulk update', 'PUT', '/projects/bulk', '/api/projects/bulk',
+                 body=ids_with(Projects, batch, **project_body)),
+        Scenario('project bulk delete', 'DELETE', '/projects/bulk', '/api/projects/bulk',
+                 body=fresh_ids(Projects, batch, **project_body)),
+        Scenario('novels list', 'GET', '/novels', '/api/novels'),
+        Scenario('novel detail', 'GET', '/novels/{novel_id}', f"/api/novels/{novel}"),
+        Scenario('novel create', 'POST', '/novels', '/api/novels', body=book),
+        Scenario('novel update', 'PUT', '/novels/{novel_id}', f"/api/novels/{novel}", body=book),
+        Scenario('novel patch', 'PATCH', '/novels/{novel_id}', f"/api/novels/{novel}", body={'author': 'Patched'}),
+        Scenario('novel delete', 'DELETE', '/novels/{novel_id}', lambda: fresh(Novels, **book)('/api/novels')),
+        Scenario('novel bulk create', 'POST', '/novels/bulk', '/api/novels/bulk', body=[book] * batch),
+        Scenario('novel bulk update', 'PUT', '/novels/bulk', '/api/novels/bulk', body=ids_with(Novels, batch, **book)),
+        Scenario('novel bulk delete', 'DELETE', '/novels/bulk', '/api/novels/bulk',
+                 body=fresh_ids(Novels, batch, **book)),
+        Scenario('stories list', 'GET', '/shortstories', '/api/shortstories'),
+        Scenario('story detail', 'GET', '/shortstories/{shortstory_id}', f"/api/shortstories/{story}"),
+        Scenario('story create', 'POST', '/shortstories', '/api/shortstories', body=book),
+        Scenario('story update', 'PUT', '/shortstories/{shortstory_id}', f"/api/shortstories/{story}", body=book),
+        Scenario('story patch', 'PATCH', '/shortstories/{shortstory_id}', f"/api/shortstories/{story}",
+                 body={'author': 'Patched'}),
+        Scenario('story delete', 'DELETE', '/shortstories/{shortstory_id}',
+                 lambda: fresh(ShortStories, **book)('/api/shortstories')),
+        Scenario('story bulk create', 'POST', '/shortstories/bulk', '/api/shortstories/bulk', body=[book] * batch),
+        Scenario('story bulk update', 'PUT', '/shortstories/bulk', '/api/shortstories/bulk',
+                 body=ids_with(ShortStories, batch, **book)),
+        Scenario('story bulk delete', 'DELETE', '/shortstories/bulk', '/api/shortstories/bulk',
+                 body=fresh_ids(ShortStories, batch, **book)),
+        Scenario('work experience list', 'GET', '/work-experience', '/api/work-experience'),
+        Scenario('job create', 'POST', '/work-experience', '/api/work-experience', body=experience),
+        Scenario('job update', 'PUT', '/work-experience/{experience_id}', f"/api/work-experience/{job}",
+                 body=experience),
+        Scenario('job patch', 'PATCH', '/work-experience/{experience_id}', f"/api/work-experience/{job}",
+                 body={'end_date': '2024-06-30'}),
+        Scenario('job delete', 'DELETE', '/work-experience/{experience_id}',
+                 lambda: fresh(WorkExperience, **experience)('/api/work-experience')),
+        Scenario('job bulk create', 'POST', '/work-experience/bulk', '/api/work-experience/bulk',
+                 body=[experience] * batch),
+        Scenario('job bulk update', 'PUT', '/work-experience/bulk', '/api/work-experience/bulk',
+                 body=ids_with(WorkExperience, batch, **experience)),
+        Scenario('job bulk delete', 'DELETE', '/work-experience/bulk', '/api/work-experience/bulk',
+                 body=fresh_ids(WorkExperience, batch, **experience)),
+        Scenario('weight 90 days', 'GET', '/health/weight', '/api/health/weight'),
+        Scenario('weight 5y weekly', 'GET', '/health/weight', '/api/health/weight?days=1825&resolution=week'),
+        Scenario('weight 5y lttb', 'GET', '/health/weight', '/api/health/weight?days=1825&max_points=300'),
+        Scenario('weight all page', 'GET', '/health/weight/all', '/api/health/weight/all'),
+        Scenario('weight all monthly', 'GET', '/health/weight/all', '/api/health/weight/all?resolution=month'),
+        Scenario('weight stats', 'GET', '/health/weight/stats', '/api/health/weight/stats?days=365'),
+        Scenario('metrics list', 'GET', '/health/metrics', '/api/health/metrics'),
+        Scenario('metric detail', 'GET', '/health/metrics/{metric}', '/api/health/metrics/steps?days=365'),
+        Scenario('bootstrap', 'GET', '/bootstrap', '/api/bootstrap'),
+        Scenario('search', 'GET', '/search', '/api/search?q=django+sqlite'),
+        Scenario('search prefix', 'GET', '/search', '/api/search?q=pro&kinds=blog,projects'),
+        Scenario('cache stats', 'GET', '/cache/stats', '/api/cache/stats', **OPERATOR),
+        Scenario('prometheus metrics', 'GET', '/metrics', '/api/metrics', **OPERATOR),
+    ]
+
+
+def uncovered_routes(scenarios):
+    from ninja.utils import normalize_path
+
+    from api.api import api
+
+    routes = {
+        (method, normalize_path(f"{prefix}/{path}").rstrip('/'))
+        for prefix, router in api._routers
+        for path, path_view in router.path_operations.items()
+        for operation in path_view.operations
+        for method in operation.methods
+    }
+    return sorted(routes - {(scenario.method, scenario.path) for scenario in scenarios})
+
+
+def import_tools(tmp, scale, counts):
+    """parse_health_data.py on a synthetic export, then the two loaders on its output
+
+    load_weight_data runs with --bulk only: the row-by-row path commits per row
+    and is compared separately in benchmarks.load_weight_data.
+    """
+    import parse_health_data
+    from django.core.management import call_command
+    from api.models import HealthMetric, HealthWeight
+    from benchmarks.load_weight_data import write_weight_json
+    from benchmarks.synthetic import write_synthetic_export
+
+    # Seeded history stays put: the loaders only replace rows older than it
+    weight_cutoff = date.today() - timedelta(days=counts['weight_days'])
+    metric_cutoff = date.today() - timedelta(days=counts['metric_days'])
+    xml_file = os.path.join(tmp, 'export.xml')
+    weight_file = os.path.join(tmp, 'weight_data.json')
+    metrics_file = os.path.join(tmp, 'health_metrics.json')
+    write_synthetic_export(xml_file, int(100_000 * scale))
+    write_weight_json(weight_file, int(5 * 365 * scale))
+    with contextlib.redirect_stdout(io.StringIO()):
+        parse_health_data.save_metrics_as_json(parse_health_data.parse_metrics(xml_file, workers=1), metrics_file)
+
+    def command(*args, **options):
+        return lambda: call_command(*args, stdout=io.StringIO(), **options)
+
+    return [
+        Tool('parse_health_data stream', lambda: parse_health_data.parse_weight_data_streaming(xml_file)),
+        Tool('parse_health_data metrics', lambda: parse_health_data.parse_metrics(xml_file, workers=1)),
+        Tool('load_weight_data bulk', command('load_weight_data', weight_file, bulk=True),
+             prepare=lambda: HealthWeight.objects.filter(date__lt=weight_cutoff).delete()),
+        Tool('load_health_metrics', command('load_health_metrics', metrics_file),
+             prepare=lambda: HealthMetric.objects.filter(date__lt=metric_cutoff).delete()),
+    ]
+
+
+@contextlib.contextmanager
+def profiled(stats):
+    """Count queries and trace peak memory of the block into stats"""
+    from django.db import connection
+
+    stats['queries'] = 0
+
+    def count(execute, sql, params, many, context):
+        # Not the PRAGMAs a new connection runs
+        if not sql.startswith('PRAGMA'):
+            stats['queries'] += 1
+        return execute(sql, params, many, context)
+
+    # A wrapper rather than connection.queries, which stops counting at 9000
+    tracemalloc.start()
+    try:
+        with connection.execute_wrapper(count):
+            yield
+    finally:
+        stats['peak KiB'] = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.stop()
+
+
+def measure(call, repeat):
+    """p50/p95 of `repeat` timed calls, then queries and peak memory of one more
+
+    call(around) runs one iteration: untimed setup, then the measured part
+    inside the `around` context manager. It returns the measured seconds.
+    """
+    latencies = [call(contextlib.nullcontext()) for _ in range(repeat)]
+    stats = {}
+    call(profiled(stats))
+    return {
+        'p50 ms': percentile(latencies, 50) * 1000,
+        'p95 ms': percentile(latencies, 95) * 1000,
+        **stats,
+    }
+
+
+def request_call(client, scenario):
+    from django.test import override_settings
+
+    def call(around):
+        url = scenario.url() if callable(scenario.url) else scenario.url
+        body = scenario.body() if callable(scenario.body) else scenario.body
+        headers = dict(scenario.headers)
+        overrides = {'API_CACHE_ENABLED': False, **scenario.settings}
+        with override_settings(**overrides):
+            if 'If-None-Match' in headers:
+                headers['If-None-Match'] = client.get(url).headers['ETag']
+            with around:
+                started = time.perf_counter()
+                if body is None:
+                    response = client.generic(scenario.method, url, headers=headers)
+                else:
+                    response = client.generic(scenario.method, url, json.dumps(body),
+                                              content_type='application/json', headers=headers)
+                elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            raise RuntimeError(f"{scenario.name}: {scenario.method} {url} returned {response.status_code}")
+        return elapsed
+
+    return call
+
+
+def tool_call(tool):
+    def call(around):
+        tool.prepare()
+        with contextlib.redirect_stdout(io.StringIO()), around:
+            started = time.perf_counter()
+            tool.run()
+            return time.perf_counter() - started
+
+    return call
+
+
+def regressions(result, baseline, args):
+    problems = []
+    if result['queries'] > baseline['queries']:
+        problems.append(f"queries {baseline['queries']} -> {result['queries']}")
+    memory_limit = baseline['peak KiB'] * (1 + args.memory_tolerance) + MIN_MEMORY_SLACK_KIB
+    if result['peak KiB'] > memory_limit:
+        problems.append(f"peak {baseline['peak KiB']:,.0f} -> {result['peak KiB']:,.0f} KiB")
+    for metric in ('p50 ms', 'p95 ms'):
+        if result[metric] > baseline[metric] * (1 + args.tolerance) + MIN_LATENCY_SLACK_MS:
+            problems.append(f"{metric} {baseline[metric]:.1f} -> {result[metric]:.1f}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scale', type=float, default=1, help='Dataset size multiplier (see synthetic.SCALE)')
+    parser.add_argument('--requests', type=int, default=30, help='Timed requests per API scenario')
+    parser.add_argument('--tool-runs', type=int, default=3, help='Timed runs per import tool')
+    parser.add_argument('--only', default=None, help='Comma-separated substrings of scenario names to run')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='Allowed latency growth, 0.5 = +50%%')
+    parser.add_argument('--memory-tolerance', type=float, default=0.25, help='Allowed peak memory growth')
+    parser.add_argument('--update-baselines', action='store_true', help='Store these results as the baselines')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # No fsync: commit latency on a scratch database is disk noise, not app cost
+        setup_django(os.path.join(tmp, 'bench.sqlite3'), pragmas={'synchronous': 'OFF'})
+        from django.test import Client
+        from benchmarks.synthetic import seed_database
+
+        counts = seed_database(args.scale)
+        print(f"🛠  Seeded scale {args.scale:g}: {counts}")
+        scenarios = api_scenarios()
+        missing = uncovered_routes(scenarios)
+        if missing:
+            print("❌ No scenario for: " + ', '.join(f"{method} {path}" for method, path in missing))
+            return 1
+
+        client = Client()
+        calls = [(scenario.name, request_call(client, scenario), args.requests) for scenario in scenarios]
+        calls += [(tool.name, tool_call(tool), args.tool_runs) for tool in import_tools(tmp, args.scale, counts)]
+        if args.only:
+            wanted = args.only.split(',')
+            calls = [call for call in calls if any(part in call[0] for part in wanted)]
+
+        stored = {}
+        if os.path.exists(BASELINES):
+            with open(BASELINES) as f:
+                stored = json.load(f)
+        baselines = stored.get('results', {}) if stored.get('scale') == args.scale else {}
+        if stored and not baselines:
+            print(f"⚠️  Baselines are for scale {stored.get('scale')}; not comparing")
+
+        columns = [('p50 ms', '.1f'), ('p95 ms', '.1f'), ('queries', 'd'), ('peak KiB', ',.0f')]
+        print(f"{'scenario':<28}" + ''.join(f"{name:>11}" for name, _ in columns) + '  status')
+        results, failed = {}, []
+        for name, call, repeat in calls:
+            call(contextlib.nullcontext())  # warm up
+            result = results[name] = measure(call, repeat)
+            status = 'new'
+            if name in baselines:
+                problems = regressions(result, baselines[name], args)
+                status = 'REGRESSED: ' + '; '.join(problems) if problems else 'ok'
+                if problems:
+                    failed.append(name)
+            cells = ''.join(f"{format(result[metric], spec):>11}" for metric, spec in columns)
+            print(f"{name:<28}{cells}  {status}")
+
+    if args.update_baselines:
+        merged = {**baselines, **results}
+        with open(BASELINES, 'w') as f:
+            json.dump({'scale': args.scale, 'results': merged}, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"💾 Saved {len(results)} baselines to {os.path.relpath(BASELINES)}")
+        return 0
+
+    if failed:
+        print(f"❌ {len(failed)} regressed: {', '.join(failed)}")
+        return 1
+    print("✅ No regressions")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
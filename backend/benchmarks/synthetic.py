@@ -0,0 +1,149 @@
+"""
+Synthetic data generators for the benchmarks
+"""
+
+import random
+from datetime import date, datetime, timedelta
+
+
+# Mix of record types roughly matching a real iPhone + Watch export
+RECORD_TYPES = [
+    ('HKQuantityTypeIdentifierStepCount', 'count', 50, 2000),
+    ('HKQuantityTypeIdentifierActiveEnergyBurned', 'Cal', 1, 40),
+    ('HKQuantityTypeIdentifierHeartRate', 'count/min', 50, 160),
+    ('HKQuantityTypeIdentifierRestingHeartRate', 'count/min', 48, 70),
+    ('HKQuantityTypeIdentifierBodyFatPercentage', '%', 0.15, 0.25),
+    ('HKQuantityTypeIdentifierBodyMass', 'kg', 68, 82),
+]
+
+HEADER = '''<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE HealthData [
+<!ELEMENT HealthData (ExportDate,Me,(Record|Correlation|Workout|ActivitySummary)*)>
+<!ATTLIST Record
+  type          CDATA #REQUIRED
+  unit          CDATA #IMPLIED
+  value         CDATA #IMPLIED
+  sourceName    CDATA #REQUIRED
+  startDate     CDATA #REQUIRED
+  endDate       CDATA #REQUIRED>
+]>
+<HealthData locale="en_GB">
+ <ExportDate value="2025-11-09 12:00:00 +0000"/>
+ <Me HKCharacteristicTypeIdentifierDateOfBirth="1990-01-01"/>
+'''
+
+RECORD = (
+    ' <Record type="{type}" sourceName="Shaun’s Apple Watch" unit="{unit}" '
+    'creationDate="{date}" startDate="{date}" endDate="{date}" value="{value}">\n'
+    '  <MetadataEntry key="HKTimeZone" value="Europe/London"/>\n'
+    ' </Record>\n'
+)
+
+
+def write_synthetic_export(path, n_records, start=datetime(2015, 1, 1), seed=42):
+    """Write an export.xml with n_records spread evenly over the record types
+
+    Returns the number of body mass records written.
+    """
+    rng = random.Random(seed)
+    per_day = 200
+    weight_count = 0
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(HEADER)
+        for i in range(n_records):
+            record_type, unit, low, high = RECORD_TYPES[i % len(RECORD_TYPES)]
+            when = start + timedelta(days=i // per_day, minutes=(i % per_day) * 7)
+            if record_type == 'HKQuantityTypeIdentifierBodyMass':
+                weight_count += 1
+            f.write(RECORD.format(
+                type=record_type,
+                unit=unit,
+                date=when.strftime('%Y-%m-%d %H:%M:%S +0000'),
+                value=round(rng.uniform(low, high), 2),
+            ))
+        f.write('</HealthData>\n')
+
+    return weight_count
+
+
+WORDS = (
+    'django ninja sqlite react chart weight running notes travel garden novel story chapter '
+    'search index cache query latency release deploy python export health project design'
+).split()
+
+# rows per unit of scale; weight and metric rows are days of history
+SCALE = {
+    'blog_posts': 100,
+    'projects': 30,
+    'novels': 20,
+    'short_stories': 50,
+    'work_experience': 10,
+    'weight_days': 5 * 365,
+    'metric_days': 2 * 365,
+}
+
+METRICS = [('steps', 'count', 2000, 15000), ('resting_heart_rate', 'count/min', 48, 70)]
+
+
+def sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def seed_database(scale=1, seed=42, today=None):
+    """Fill an empty database with every content type, weight history and stats
+
+    Rows grow linearly with scale (see SCALE). Returns the row counts.
+    """
+    from api.models import BlogPost, HealthMetric, HealthWeight, Novels, Projects, ShortStories, WorkExperience
+    from api.rendering import render_instance
+    from api.timeseries import refresh_weight_stats
+
+    rng = random.Random(seed)
+    today = today or date.today()
+    counts = {name: max(1, int(rows * scale)) for name, rows in SCALE.items()}
+
+    posts = [
+        BlogPost(title=sentence(rng, 6), content='\n\n'.join(sentence(rng, 40) for _ in range(12)))
+        for _ in range(counts['blog_posts'])
+    ]
+    for post in posts:
+        render_instance(post)  # bulk_create() sends no pre_save
+    BlogPost.objects.bulk_create(posts)
+    Projects.objects.bulk_create(
+        Projects(name=sentence(rng, 3), description=sentence(rng, 30), languages='Python, JavaScript',
+                 link='https://example.com/project')
+        for _ in range(counts['projects'])
+    )
+    Novels.objects.bulk_create(
+        Novels(title=sentence(rng, 4), author='Shaun Allsopp', description=sentence(rng, 60))
+        for _ in range(counts['novels'])
+    )
+    ShortStories.objects.bulk_create(
+        ShortStories(title=sentence(rng, 4), author='Shaun Allsopp', description=sentence(rng, 40))
+        for _ in range(counts['short_stories'])
+    )
+    WorkExperience.objects.bulk_create(
+        WorkExperience(company=sentence(rng, 2), position='Engineer', description=sentence(rng, 50),
+                       start_date=today - timedelta(days=400 * (i + 1)),
+                       end_date=None if i == 0 else today - timedelta(days=400 * i))
+        for i in range(counts['work_experience'])
+    )
+
+    weight = 80.0
+    readings = []
+    for i in range(counts['weight_days']):
+        weight = min(max(weight + rng.uniform(-0.4, 0.38), 60), 100)
+        readings.append(HealthWeight(date=today - timedelta(days=i), weight=f"{weight:.2f}", unit='kg'))
+    HealthWeight.objects.bulk_create(readings, batch_size=1000)
+
+    HealthMetric.objects.bulk_create(
+        (
+            HealthMetric(metric=metric, date=today - timedelta(days=i), value=round(rng.uniform(low, high), 2), unit=unit)
+            for metric, unit, low, high in METRICS
+            for i in range(counts['metric_days'])
+        ),
+        batch_size=1000,
+    )
+    refresh_weight_stats()
+    return counts
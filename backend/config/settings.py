@@ -28,6 +28,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.query_guard.QueryGuardMiddleware',
+    'api.metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -57,6 +59,31 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'config.wsgi.application'
 
+# Async API views (API_ASYNC=True) for ASGI deployments, e.g.
+# uvicorn config.asgi:application (installed separately). The read endpoints
+# switch to async twins that use the async ORM; writes stay sync. Leave off
+# under WSGI, where async views only add an event loop per request.
+API_ASYNC = os.getenv('API_ASYNC', 'False') == 'True'
+
+# Health endpoints render their .values() rows straight to JSON without
+# validating them against the response schemas (API_TRUSTED_OUTPUT=True)
+API_TRUSTED_OUTPUT = os.getenv('API_TRUSTED_OUTPUT', 'False') == 'True'
+
+# Per-route latency, query and response size metrics (Server-Timing header,
+# Prometheus text at /api/metrics). Cheap enough to leave on. /api/metrics and
+# /api/cache/stats answer staff users and requests sending
+# 'Authorization: Bearer <API_METRICS_TOKEN>', e.g. a Prometheus scraper.
+API_METRICS_ENABLED = os.getenv('API_METRICS_ENABLED', 'True') == 'True'
+API_METRICS_TOKEN = os.getenv('API_METRICS_TOKEN', '')
+
+# Query guard (default: in DEBUG): logs API requests that repeat one SQL
+# statement API_QUERY_GUARD_REPEATS times (N+1), run a query slower than
+# API_QUERY_GUARD_SLOW_MS, or scan a whole table per EXPLAIN QUERY PLAN.
+# Outermost, so its EXPLAINs stay out of the metrics.
+API_QUERY_GUARD = os.getenv('API_QUERY_GUARD', str(DEBUG)) == 'True'
+API_QUERY_GUARD_REPEATS = int(os.getenv('API_QUERY_GUARD_REPEATS', '5'))
+API_QUERY_GUARD_SLOW_MS = float(os.getenv('API_QUERY_GUARD_SLOW_MS', '100'))
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -68,6 +95,54 @@ DATABASES = {
     }
 }
 
+# SQLite performance profile (SQLITE_PERFORMANCE=True): WAL so readers never
+# wait on a writer, fsync only at checkpoints, a 256 MiB mmap window and 64 MiB
+# page cache, and connections kept for CONN_MAX_AGE seconds instead of one per
+# request. Writers take the lock up front (IMMEDIATE) and wait up to
+# busy_timeout rather than failing with "database is locked".
+SQLITE_PERFORMANCE = os.getenv('SQLITE_PERFORMANCE', 'False') == 'True'
+SQLITE_PRAGMAS = {}
+
+if SQLITE_PERFORMANCE:
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64 * 1024,  # negative: KiB
+        'busy_timeout': 5000,  # ms
+        'temp_store': 'MEMORY',
+    }
+    DATABASES['default']['CONN_MAX_AGE'] = int(os.getenv('CONN_MAX_AGE', '600'))
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+    DATABASES['default']['OPTIONS'] = {'transaction_mode': 'IMMEDIATE'}
+
+
+# Caching
+# Rendered API responses live in the 'api' cache. Hits aren't re-checked
+# against the database, so every worker must see every invalidation: the
+# default FileBasedCache in API_CACHE_LOCATION is shared by all processes on
+# the host, including management commands. A per-process backend such as
+# LocMemCache would leave other workers serving stale responses, so with one
+# the cache stays off unless API_CACHE_ENABLED=True (e.g. a single process).
+
+API_CACHE_ALIAS = 'api'
+API_CACHE_BACKEND = os.getenv('API_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache')
+API_CACHE_ENABLED = os.getenv('API_CACHE_ENABLED', str(not API_CACHE_BACKEND.endswith('LocMemCache'))) == 'True'
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    API_CACHE_ALIAS: {
+        'BACKEND': API_CACHE_BACKEND,
+        'LOCATION': os.getenv('API_CACHE_LOCATION', str(BASE_DIR / 'cache')),
+        'TIMEOUT': int(os.getenv('API_CACHE_TTL', '3600')),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('API_CACHE_MAX_ENTRIES', '1000')),
+        },
+    },
+}
+
 
 # Internationalization
 
@@ -90,6 +165,36 @@ STATIC_ROOT = BASE_DIR / 'static'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Uploads are stored under content-hashed names (photo.3f2a1b9c0d4e.jpg), which
+# the media view serves as immutable
+STORAGES = {
+    'default': {'BACKEND': 'api.storage.HashedFileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+# Media serving: Django serves MEDIA_URL when SERVE_MEDIA is on (default: in
+# DEBUG), with Range and ETag support. MEDIA_SENDFILE=x-sendfile (Apache,
+# lighttpd) or x-accel-redirect (nginx, with an internal location at
+# MEDIA_ACCEL_PREFIX aliased to MEDIA_ROOT) hands the transfer to the front server.
+SERVE_MEDIA = os.getenv('SERVE_MEDIA', str(DEBUG)) == 'True'
+MEDIA_SENDFILE = os.getenv('MEDIA_SENDFILE', '')
+MEDIA_ACCEL_PREFIX = os.getenv('MEDIA_ACCEL_PREFIX', '/protected-media/')
+MEDIA_MAX_AGE = int(os.getenv('MEDIA_MAX_AGE', '3600'))  # seconds, for names without a content hash
+
+# Resized copies of uploaded images (MEDIA_ROOT/variants/), rendered in a
+# process pool after each save. IMAGE_VARIANT_WORKERS=0 leaves them to the
+# render_image_variants command.
+IMAGE_VARIANT_WIDTHS = [320, 640, 1280]
+IMAGE_VARIANT_FORMATS = ['avif', 'webp', 'jpeg']
+IMAGE_VARIANT_WORKERS = int(os.getenv('IMAGE_VARIANT_WORKERS', '2'))
+
+# Static JSON snapshot of the read endpoints (manage.py publish_snapshot), for
+# serving from static hosting or a CDN. SNAPSHOT_ON_WRITE republishes what a
+# write changed SNAPSHOT_DELAY seconds after it commits, batching bursts.
+SNAPSHOT_ROOT = os.getenv('SNAPSHOT_ROOT', str(BASE_DIR / 'snapshot'))
+SNAPSHOT_ON_WRITE = os.getenv('SNAPSHOT_ON_WRITE', 'False') == 'True'
+SNAPSHOT_DELAY = float(os.getenv('SNAPSHOT_DELAY', '2'))
+
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
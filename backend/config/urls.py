@@ -1,8 +1,9 @@
 from django.contrib import admin
-from django.urls import path
+from django.urls import path, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 from api.api import api
+from api.media import serve_media
 
 
 
@@ -11,8 +12,11 @@ urlpatterns = [
     path('api/', api.urls),
 ]
 
-# Serve media files
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# Serve media files (with Range/ETag support, or via X-Sendfile/X-Accel-Redirect)
+if settings.SERVE_MEDIA:
+    urlpatterns += [
+        re_path(r'^%s(?P<path>.*)$' % settings.MEDIA_URL.lstrip('/'), serve_media),
+    ]
 
 # Serve static files in debug mode
 if settings.DEBUG:
@@ -1,17 +1,339 @@
 #!/usr/bin/env python3
 """
 Parse Apple Health export.xml and extract weight data
-Usage: python parse_health_data.py /path/to/export.xml
+Usage: python parse_health_data.py /path/to/export.xml [--stream | --incremental [--state FILE]]
+       python parse_health_data.py /path/to/export.xml --metrics all|steps,body_mass,... [--workers N]
 """
 
 import xml.etree.ElementTree as ET
 import json
 import csv
+import hashlib
+import math
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
 from collections import defaultdict
+import argparse
 import sys
 
 
+WEIGHT_RECORD_TYPE = 'HKQuantityTypeIdentifierBodyMass'
+
+
+@dataclass(frozen=True)
+class Extractor:
+    """How one quantity type is pulled out of the export and rolled up per day"""
+    name: str
+    record_type: str
+    aggregate: str = 'mean'  # 'mean' or 'sum' of the day's readings
+    scale: float = 1.0  # multiplier applied to each raw value
+    unit: str = None  # overrides the unit in the export (e.g. after scaling)
+
+
+EXTRACTORS = {}
+
+
+def register_extractor(name, record_type, aggregate='mean', scale=1.0, unit=None):
+    """Register an extractor so parse_metrics can pull out another quantity type"""
+    if aggregate not in ('mean', 'sum'):
+        raise ValueError(f"Unknown aggregate '{aggregate}' for {name}")
+    EXTRACTORS[name] = Extractor(name, record_type, aggregate, scale, unit)
+    return EXTRACTORS[name]
+
+
+register_extractor('body_mass', WEIGHT_RECORD_TYPE)
+register_extractor('steps', 'HKQuantityTypeIdentifierStepCount', aggregate='sum')
+register_extractor('resting_heart_rate', 'HKQuantityTypeIdentifierRestingHeartRate')
+register_extractor('body_fat', 'HKQuantityTypeIdentifierBodyFatPercentage', scale=100, unit='%')
+register_extractor('active_energy', 'HKQuantityTypeIdentifierActiveEnergyBurned', aggregate='sum')
+
+# Start tag of a Record; quoted attribute values may contain '>'
+RECORD_TAG = b'<Record '
+RECORD_RE = re.compile(rb'<Record\s((?:[^>"]|"[^"]*")*)>')
+ATTR_RE = re.compile(rb'([\w:]+)="([^"]*)"')
+
+DEFAULT_CHUNK_SIZE = 32 * 1024 * 1024
+
+DEFAULT_STATE_FILE = 'health_import_state.json'
+
+
+def iter_records(xml_file, record_type=None):
+    """Stream Record attributes from the export without building the whole tree
+
+    Every element is detached from the root as soon as it has been read, so
+    memory stays flat regardless of export size.
+    """
+    context = ET.iterparse(xml_file, events=('start', 'end'))
+    _, root = next(context)
+
+    for event, elem in context:
+        if event != 'end':
+            continue
+
+        if elem.tag == 'Record' and (record_type is None or elem.get('type') == record_type):
+            yield elem.attrib
+
+        # Drop everything parsed so far; open elements stay referenced by the parser
+        root.clear()
+
+
+def iter_weight_readings(records):
+    """Turn raw Record attributes into weight readings"""
+    for attrs in records:
+        date_str = attrs.get('startDate')
+        weight_value = attrs.get('value')
+
+        if date_str and weight_value:
+            # startDate format: 2025-01-15 08:30:00 +0000
+            yield {
+                'date': date_str[:10],
+                'weight': float(weight_value),
+                'unit': attrs.get('unit') or 'kg'
+            }
+
+
+def add_exact(partials, value):
+    """Add value to partials, non-overlapping floats whose exact sum is a running total
+
+    Shewchuk's algorithm, as in math.fsum: math.fsum(partials) is the sum of
+    every value added, correctly rounded, so neither the order of the readings
+    nor how they were split between chunks can change a day's total. A few
+    partials are kept, however many values are added.
+    """
+    i = 0
+    for partial in partials:
+        if abs(value) < abs(partial):
+            value, partial = partial, value
+        high = value + partial
+        low = partial - (high - value)
+        if low:
+            partials[i] = low
+            i += 1
+        value = high
+    partials[i:] = [value]
+
+
+def average_daily(readings):
+    """Average readings per day, keeping only an exact running sum and count per date"""
+    totals = {}
+    unit = None
+    count = 0
+
+    for reading in readings:
+        count += 1
+        if unit is None:
+            unit = reading['unit']
+        total = totals.setdefault(reading['date'], [[], 0])
+        add_exact(total[0], reading['weight'])
+        total[1] += 1
+
+    print(f"✅ Found {count} weight records")
+
+    averaged_data = [
+        {'date': date, 'weight': round(math.fsum(partials) / n, 2), 'unit': unit}
+        for date, (partials, n) in sorted(totals.items())
+    ]
+
+    print(f"📊 Averaged to {len(averaged_data)} daily records")
+    return averaged_data
+
+
+def parse_weight_data_streaming(xml_file):
+    """Extract weight data with a constant-memory iterparse pipeline"""
+    print(f"📂 Streaming {xml_file}...")
+    return average_daily(iter_weight_readings(iter_records(xml_file, WEIGHT_RECORD_TYPE)))
+
+
+def file_fingerprint(path, sample_size=1024 * 1024):
+    """Cheap identity for an export: size, mtime and a hash of its first and last MB"""
+    stat = os.stat(path)
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        digest.update(f.read(sample_size))
+        if stat.st_size > sample_size:
+            f.seek(max(sample_size, stat.st_size - sample_size))
+            digest.update(f.read(sample_size))
+    return f"{stat.st_size}-{stat.st_mtime_ns}-{digest.hexdigest()[:16]}"
+
+
+def load_state(state_file=DEFAULT_STATE_FILE):
+    """Read the import watermark, or an empty one on the first run"""
+    try:
+        with open(state_file) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_state(state, state_file=DEFAULT_STATE_FILE):
+    """Write the watermark atomically so a crash never leaves it half written"""
+    tmp_file = f"{state_file}.tmp"
+    with open(tmp_file, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_file, state_file)
+
+
+def iter_since(records, since, latest):
+    """Skip records from before the watermark day, tracking the newest startDate seen
+
+    The watermark day itself is re-read so its daily average includes late readings.
+    """
+    since_day = (since or '')[:10]
+    for attrs in records:
+        start_date = attrs.get('startDate') or ''
+        if start_date[:10] < since_day:
+            continue
+        if start_date > latest['start_date']:
+            latest['start_date'] = start_date
+        yield attrs
+
+
+def parse_weight_data_incremental(xml_file, state):
+    """Extract only the days at or after the watermark in state
+
+    Returns (data, new_state); new_state is None when the export is unchanged.
+    """
+    fingerprint = file_fingerprint(xml_file)
+    if state.get('fingerprint') == fingerprint:
+        print(f"⏭  {xml_file} is unchanged since the last import")
+        return [], None
+
+    since = state.get('last_start_date')
+    print(f"📂 Streaming {xml_file} from {since[:10] if since else 'the beginning'}...")
+
+    latest = {'start_date': since or ''}
+    records = iter_since(iter_records(xml_file, WEIGHT_RECORD_TYPE), since, latest)
+    data = average_daily(iter_weight_readings(records))
+
+    return data, {'fingerprint': fingerprint, 'last_start_date': latest['start_date'] or None}
+
+
+def find_chunks(xml_file, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Split the file into (start, end) byte ranges that each begin at a <Record tag"""
+    size = os.path.getsize(xml_file)
+    boundaries = [0]
+
+    with open(xml_file, 'rb') as f:
+        position = chunk_size
+        while position < size:
+            f.seek(position)
+            # Read a little extra so a tag straddling the window is still found
+            window = f.read(64 * 1024 + len(RECORD_TAG))
+            offset = window.find(RECORD_TAG)
+            while offset == -1 and len(window) > len(RECORD_TAG):
+                position += len(window) - len(RECORD_TAG)
+                f.seek(position)
+                window = f.read(64 * 1024 + len(RECORD_TAG))
+                offset = window.find(RECORD_TAG)
+            if offset == -1:
+                break
+            if position + offset > boundaries[-1]:
+                boundaries.append(position + offset)
+            position = boundaries[-1] + chunk_size
+
+    boundaries.append(size)
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def scan_chunk(xml_file, start, end, extractors):
+    """Collect per-day [partials, count, unit] for each extractor within one byte range
+
+    Totals are exact (see add_exact): float sums added up per chunk would
+    round differently from one pass over the file.
+    """
+    by_type = {extractor.record_type.encode(): extractor for extractor in extractors}
+    results = {extractor.name: {} for extractor in extractors}
+
+    with open(xml_file, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    for match in RECORD_RE.finditer(data):
+        attrs = dict(ATTR_RE.findall(match.group(1)))
+        extractor = by_type.get(attrs.get(b'type'))
+        if extractor is None:
+            continue
+
+        date_str = attrs.get(b'startDate')
+        value = attrs.get(b'value')
+        if not date_str or not value:
+            continue
+
+        try:
+            value = float(value) * extractor.scale
+        except ValueError:
+            continue
+
+        day = results[extractor.name].setdefault(date_str[:10].decode(), [[], 0, None])
+        add_exact(day[0], value)
+        day[1] += 1
+        if day[2] is None:
+            day[2] = extractor.unit or attrs.get(b'unit', b'').decode()
+
+    return results
+
+
+def merge_chunk_results(merged, chunk_results):
+    """Fold one chunk's per-day totals into the running totals"""
+    for name, days in chunk_results.items():
+        target = merged.setdefault(name, {})
+        for date, (partials, count, unit) in days.items():
+            day = target.get(date)
+            if day is None:
+                target[date] = [partials, count, unit]
+            else:
+                for partial in partials:
+                    add_exact(day[0], partial)
+                day[1] += count
+                day[2] = day[2] or unit
+    return merged
+
+
+def parse_metrics(xml_file, metrics=None, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Extract several quantity types in one pass, scanning chunks in a process pool
+
+    Returns {metric name: [{'date', 'value', 'unit'}, ...]} sorted by date.
+    """
+    names = metrics or list(EXTRACTORS)
+    unknown = [name for name in names if name not in EXTRACTORS]
+    if unknown:
+        raise ValueError(f"Unknown metrics: {', '.join(unknown)} (known: {', '.join(EXTRACTORS)})")
+    extractors = [EXTRACTORS[name] for name in names]
+
+    workers = workers or os.cpu_count() or 1
+    chunks = find_chunks(xml_file, chunk_size)
+    print(f"📂 Scanning {xml_file} in {len(chunks)} chunks with {workers} workers...")
+
+    merged = {}
+    if workers == 1:
+        for start, end in chunks:
+            merge_chunk_results(merged, scan_chunk(xml_file, start, end, extractors))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(scan_chunk, xml_file, start, end, extractors)
+                for start, end in chunks
+            ]
+            for future in futures:
+                merge_chunk_results(merged, future.result())
+
+    results = {}
+    for extractor in extractors:
+        days = merged.get(extractor.name, {})
+        rows = []
+        for date, (partials, count, unit) in sorted(days.items()):
+            total = math.fsum(partials)
+            value = total / count if extractor.aggregate == 'mean' else total
+            rows.append({'date': date, 'value': round(value, 2), 'unit': unit})
+        results[extractor.name] = rows
+        print(f"📊 {extractor.name}: {sum(day[1] for day in days.values())} records, {len(rows)} days")
+
+    return results
+
+
 def parse_weight_data(xml_file):
     """Extract weight data from Apple Health export XML"""
     print(f"📂 Parsing {xml_file}...")
@@ -49,7 +371,7 @@ def parse_weight_data(xml_file):
     # Calculate daily averages
     averaged_data = []
     for date, weights in sorted(daily_weights.items()):
-        avg_weight = sum(weights) / len(weights)
+        avg_weight = math.fsum(weights) / len(weights)
         averaged_data.append({
             'date': date,
             'weight': round(avg_weight, 2),
@@ -67,6 +389,13 @@ def save_as_json(data, output_file='weight_data.json'):
     print(f"💾 Saved JSON: {output_file}")
 
 
+def save_metrics_as_json(data, output_file='health_metrics.json'):
+    """Save per-metric daily data as JSON"""
+    with open(output_file, 'w') as f:
+        json.dump(data, f, indent=2)
+    print(f"💾 Saved JSON: {output_file}")
+
+
 def save_as_csv(data, output_file='weight_data.csv'):
     """Save data as CSV"""
     with open(output_file, 'w', newline='') as f:
@@ -113,23 +442,63 @@ if __name__ == '__main__':
         print("3. Run: python parse_health_data.py apple_health_export/export.xml")
         sys.exit(1)
     
-    xml_file = sys.argv[1]
+    parser = argparse.ArgumentParser(description='Parse Apple Health export.xml and extract weight data')
+    parser.add_argument('xml_file', help='Path to export.xml')
+    parser.add_argument('--stream', action='store_true',
+                        help='Parse incrementally with iterparse (constant memory, for multi-GB exports)')
+    parser.add_argument('--metrics', default=None,
+                        help=f"Extract several metrics in parallel: 'all' or a comma list of {', '.join(EXTRACTORS)}")
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes for --metrics (default: CPU count)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only output days at or after the last import watermark (implies --stream)')
+    parser.add_argument('--state', default=DEFAULT_STATE_FILE,
+                        help=f'Watermark file for --incremental (default: {DEFAULT_STATE_FILE})')
+    args = parser.parse_args()
+
+    xml_file = args.xml_file
     
     try:
-        # Parse data
-        weight_data = parse_weight_data(xml_file)
-        
-        # Save in both formats
-        save_as_json(weight_data)
-        save_as_csv(weight_data)
-        
-        # Print summary
-        print_summary(weight_data)
-        
-        print("\n✅ Done! Next steps:")
-        print("   1. Review weight_data.json or weight_data.csv")
-        print("   2. Load into Django: python manage.py load_weight_data weight_data.json")
-        
+        if args.metrics:
+            names = None if args.metrics == 'all' else args.metrics.split(',')
+            metrics_data = parse_metrics(xml_file, names, workers=args.workers)
+            save_metrics_as_json(metrics_data)
+
+            print("\n✅ Done! Next steps:")
+            print("   1. Review health_metrics.json")
+            print("   2. Load into Django: python manage.py load_health_metrics health_metrics.json")
+        elif args.incremental:
+            weight_data, new_state = parse_weight_data_incremental(xml_file, load_state(args.state))
+
+            if new_state is not None:
+                # Only move the watermark once the delta is safely on disk
+                save_as_json(weight_data)
+                save_as_csv(weight_data)
+                save_state(new_state, args.state)
+                print(f"🔖 Watermark: {new_state['last_start_date']}")
+
+                print_summary(weight_data)
+
+                print("\n✅ Done! Next steps:")
+                print("   1. Review weight_data.json or weight_data.csv (new days only)")
+                print("   2. Load into Django: python manage.py load_weight_data weight_data.json --incremental")
+        else:
+            # Parse data
+            if args.stream:
+                weight_data = parse_weight_data_streaming(xml_file)
+            else:
+                weight_data = parse_weight_data(xml_file)
+
+            # Save in both formats
+            save_as_json(weight_data)
+            save_as_csv(weight_data)
+
+            # Print summary
+            print_summary(weight_data)
+
+            print("\n✅ Done! Next steps:")
+            print("   1. Review weight_data.json or weight_data.csv")
+            print("   2. Load into Django: python manage.py load_weight_data weight_data.json")
+
     except FileNotFoundError:
         print(f"❌ Error: File not found: {xml_file}")
         sys.exit(1)
@@ -1,14 +1,14 @@
 import React from 'react';
-import axios from 'axios';
+import { getBootstrap } from '../services/bootstrap';
 import { Link } from 'react-router-dom';
 
 const Blog = () => {
     const [posts, setPosts] = React.useState([]);
 
     React.useEffect(() => {
-        axios.get(`${process.env.REACT_APP_API_URL}/api/blog`)
-            .then(response => {
-                setPosts(response.data);
+        getBootstrap()
+            .then(data => {
+                setPosts(data.blog.items);
             })
             .catch(error => {
                 console.error('Error fetching blog posts:', error);
@@ -29,7 +29,7 @@ const Blog = () => {
                         <div key={post.id} className="border border-gray-300 text-base p-4">
                             <h2 className="font-bold mb-2 text-sm text-[#556B2F]">{post.title}</h2>
                             <p className="font-bold mb-2 text-xs text-[#556B2F]">{new Date(post.created_at).toLocaleDateString()}</p>
-                            <p className="whitespace-pre-wrap text-sm text-gray-600 mb-2">{post.content}</p>
+                            <p className="whitespace-pre-wrap text-sm text-gray-600 mb-2">{post.excerpt}</p>
                         </div>
 
                     ))}
@@ -1,5 +1,6 @@
 import React, { useState, useEffect, useCallback } from 'react';
-import axios from 'axios';
+import { getBootstrap } from '../services/bootstrap';
+import { getJSON } from '../services/snapshot';
 import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer } from 'recharts';
 
 function Fitness() {
@@ -11,8 +12,12 @@ function Fitness() {
     const fetchData = useCallback(async () => {
         try {
             setLoading(true);
-            const response = await axios.get(`${process.env.REACT_APP_API_URL}/api/health/weight?days=${days}`);
-            setData(response.data);
+            if (days === 90) {
+                const bootstrap = await getBootstrap();
+                setData(bootstrap.health_weight);
+            } else {
+                setData(await getJSON(`/api/health/weight?days=${days}&max_points=300`));
+            }
             setLoading(false);
         } catch (err) {
             setError('Failed to load weight data');
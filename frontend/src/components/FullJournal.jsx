@@ -1,18 +1,32 @@
 import React from 'react';
-import axios from 'axios';
+import { getJSON } from '../services/snapshot';
 import { Link } from 'react-router-dom';
 
+const JOURNAL_PATH = '/api/blog?fields=title,content_html,created_at';
+
 const Blog = () => {
     const [posts, setPosts] = React.useState([]);
 
     React.useEffect(() => {
-        axios.get(`${process.env.REACT_APP_API_URL}/api/blog`)
-            .then(response => {
-                setPosts(response.data);
-            })
-            .catch(error => {
-                console.error('Error fetching blog posts:', error);
-            });
+        let cancelled = false;
+        // The list comes a page at a time: show each as it arrives and follow
+        // its next cursor (URL-safe, and spelled as the snapshot publishes it)
+        // until the last page
+        const loadPages = async () => {
+            let path = JOURNAL_PATH;
+            while (path) {
+                const data = await getJSON(path);
+                if (cancelled) return;
+                setPosts(loaded => [...loaded, ...data.items]);
+                path = data.next && `${JOURNAL_PATH}&cursor=${data.next}`;
+            }
+        };
+        loadPages().catch(error => {
+            console.error('Error fetching blog posts:', error);
+        });
+        return () => {
+            cancelled = true;
+        };
     }, []);
 
     return (
@@ -28,7 +42,8 @@ const Blog = () => {
                         <div key={post.id} className="border border-gray-300 text-base p-4">
                             <h2 className="font-bold mb-2 text-sm text-[#556B2F]">{post.title}</h2>
                             <p className="font-bold mb-2 text-xs text-[#556B2F]">{new Date(post.created_at).toLocaleDateString()}</p>
-                            <p className="whitespace-pre-wrap text-sm text-gray-600 mb-2">{post.content}</p>
+                            {/* Rendered and escaped by the API when the post is saved */}
+                            <div className="text-sm text-gray-600 mb-2 space-y-2" dangerouslySetInnerHTML={{ __html: post.content_html }} />
                         </div>
                     ))}
                 </div>
@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import axios from 'axios';
+import { getBootstrap } from '../services/bootstrap';
 import ProjectsHoverCard from './ProjectsHoverCard.jsx';
 
 function Projects() {
@@ -8,9 +8,9 @@ function Projects() {
     const [error, setError] = useState(null);
 
     useEffect(() => {
-        axios.get(`${process.env.REACT_APP_API_URL}/api/projects`)
-            .then(response => {
-                setProjects(response.data);
+        getBootstrap()
+            .then(data => {
+                setProjects(data.projects.items);
                 setLoading(false);
             })
             .catch(error => {
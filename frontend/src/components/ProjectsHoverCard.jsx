@@ -1,4 +1,5 @@
 import React from 'react';
+import ResponsiveImage from './ResponsiveImage.jsx';
 
 
 function ProjectsHoverCard({ project }) {
@@ -21,8 +22,10 @@ function ProjectsHoverCard({ project }) {
 
             {showPopup && project.image && (
                 <div className="absolute top-0 left-0 w-full h-full bg-white bg-opacity-80 p-4 z-10 overflow-auto">
-                    <img
-                        src={`${process.env.REACT_APP_API_URL}${project.image}`}
+                    <ResponsiveImage
+                        src={project.image}
+                        variants={project.image_variants}
+                        sizes="100vw"
                         alt={project.name}
                         className="w-full h-full object-contain"
                     />
@@ -0,0 +1,30 @@
+import React from 'react';
+
+const API_URL = process.env.REACT_APP_API_URL;
+
+// "/media/a-320w.webp 320w, ..." -> absolute URLs on the API host
+const absoluteSrcset = (srcset) => srcset.split(', ').map(candidate => `${API_URL}${candidate}`).join(', ');
+
+// Picks the smallest AVIF/WebP/JPEG variant that fits `sizes`, falling back to the original upload
+function ResponsiveImage({ src, variants, sizes, alt, className }) {
+    if (!variants) {
+        return <img src={`${API_URL}${src}`} alt={alt} className={className} loading="lazy" />;
+    }
+
+    return (
+        <picture>
+            {variants.avif && <source type="image/avif" srcSet={absoluteSrcset(variants.avif)} sizes={sizes} />}
+            {variants.webp && <source type="image/webp" srcSet={absoluteSrcset(variants.webp)} sizes={sizes} />}
+            <img
+                src={`${API_URL}${src}`}
+                srcSet={variants.jpeg ? absoluteSrcset(variants.jpeg) : undefined}
+                sizes={sizes}
+                alt={alt}
+                className={className}
+                loading="lazy"
+            />
+        </picture>
+    );
+}
+
+export default ResponsiveImage;
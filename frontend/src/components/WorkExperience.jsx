@@ -1,5 +1,6 @@
 import React from 'react';
-import axios from 'axios';
+import { getBootstrap } from '../services/bootstrap';
+import ResponsiveImage from './ResponsiveImage.jsx';
 
 class WorkExperience extends React.Component {
     constructor(props) {
@@ -16,9 +17,9 @@ class WorkExperience extends React.Component {
     }
 
     fetchWorkExperiences() {
-        axios.get(`${process.env.REACT_APP_API_URL}/api/work-experience`)
-            .then(response => {
-                const experiencesWithToggle = response.data.map(exp => ({
+        getBootstrap()
+            .then(data => {
+                const experiencesWithToggle = data.work_experience.items.map(exp => ({
                     ...exp,
                     showDescription: false,
                 }));
@@ -70,7 +71,7 @@ class WorkExperience extends React.Component {
                             <div key={exp.id} className="border border-gray-300 text-base p-4">
                                 <div className="mb-3 md:mb-0 md:flex md:items-start ">
                                     {exp.logo ? (
-                                        <img src={`${process.env.REACT_APP_API_URL}${exp.logo}`} alt={`${exp.company} logo`} className="w-10 h-10 object-contain flex-shrink-0 mr-4" />
+                                        <ResponsiveImage src={exp.logo} variants={exp.logo_variants} sizes="40px" alt={`${exp.company} logo`} className="w-10 h-10 object-contain flex-shrink-0 mr-4" />
                                     ) : (
                                         <div className="w-10 h-10 bg-gray-200 flex-shrink-0 mr-4"></div> // Fallback if no logo
                                     )}
@@ -1,5 +1,6 @@
 import React from 'react';
-import axios from 'axios';
+import { getBootstrap } from '../services/bootstrap';
+import ResponsiveImage from './ResponsiveImage.jsx';
 
 class Writing extends React.Component {
     constructor(props) {
@@ -18,9 +19,9 @@ class Writing extends React.Component {
     }
 
     fetchNovels() {
-        axios.get(`${process.env.REACT_APP_API_URL}/api/novels`)
-            .then(response => {
-                this.setState({ novels: response.data, loading: false });
+        getBootstrap()
+            .then(data => {
+                this.setState({ novels: data.novels.items, loading: false });
             })
             .catch(error => {
                 console.error('There was an error fetching the novels!', error);
@@ -29,9 +30,9 @@ class Writing extends React.Component {
     }
 
     fetchShortStories() {
-        axios.get(`${process.env.REACT_APP_API_URL}/api/shortstories`)
-            .then(response => {
-                this.setState({ shortStories: response.data });
+        getBootstrap()
+            .then(data => {
+                this.setState({ shortStories: data.shortstories.items });
             })
             .catch(error => {
                 console.error('There was an error fetching the short stories!', error);
@@ -69,8 +70,10 @@ class Writing extends React.Component {
                         <div key={novel.id} className="border border-gray-300 p-4 break-words overflow-hidden mb-2">
                             <h3 className="text-sm font-bold mb-2 text-[#556B2F]">{novel.title}</h3>
                             {novel.cover_image && (
-                                <img
-                                    src={`${process.env.REACT_APP_API_URL}${novel.cover_image}`}
+                                <ResponsiveImage
+                                    src={novel.cover_image}
+                                    variants={novel.cover_image_variants}
+                                    sizes="80px"
                                     alt={novel.title}
                                     className="w-20 h-20 object-cover mb-1"
                                 />
@@ -87,8 +90,10 @@ class Writing extends React.Component {
                     {this.state.shortStories.map(story => (
                         <div key={story.id} className="border border-gray-300 p-4 break-words overflow-hidden mb-2 flex items-start">
                             {story.cover_image && (
-                                <img
-                                    src={`${process.env.REACT_APP_API_URL}${story.cover_image}`}
+                                <ResponsiveImage
+                                    src={story.cover_image}
+                                    variants={story.cover_image_variants}
+                                    sizes="40px"
                                     alt={story.title}
                                     className="w-10 h-10 object-cover flex-shrink-0 mr-4"
                                 />
@@ -0,0 +1,18 @@
+import { getJSON } from './snapshot';
+
+// Homepage sections in one request; the weight section matches Fitness' default 90 days
+const BOOTSTRAP_PATH = '/api/bootstrap?limits=blog:1&days=90&max_points=300';
+
+let pending = null;
+
+// Every homepage component shares the same in-flight request
+export const getBootstrap = () => {
+  if (!pending) {
+    pending = getJSON(BOOTSTRAP_PATH)
+      .catch(error => {
+        pending = null;
+        throw error;
+      });
+  }
+  return pending;
+};
@@ -0,0 +1,34 @@
+import axios from 'axios';
+
+const API_URL = process.env.REACT_APP_API_URL;
+const SNAPSHOT_URL = process.env.REACT_APP_SNAPSHOT_URL;
+
+let manifest = null;
+
+// URL -> file of the published snapshot (backend: manage.py publish_snapshot)
+const getManifest = () => {
+  if (!manifest) {
+    manifest = axios.get(`${SNAPSHOT_URL}/manifest.json`)
+      .then(response => response.data.files)
+      .catch(() => ({}));
+  }
+  return manifest;
+};
+
+// GET an API path, e.g. '/api/blog', from the static snapshot when it has the
+// exact URL and from the API otherwise
+export const getJSON = async (path) => {
+  if (SNAPSHOT_URL) {
+    const entry = (await getManifest())[path];
+    if (entry) {
+      try {
+        const response = await axios.get(`${SNAPSHOT_URL}/${entry.file}`);
+        return response.data;
+      } catch (error) {
+        // Fall through to the API, e.g. a file pruned since the manifest loaded
+      }
+    }
+  }
+  const response = await axios.get(`${API_URL}${path}`);
+  return response.data;
+};